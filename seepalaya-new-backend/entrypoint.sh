@@ -11,11 +11,21 @@ then
     done
 
     echo "postgres ready to run"
+    # fails the start when the database cannot be reached or connections are not reused
+    python manage.py check --database default || exit 1
     python manage.py makemigrations
     python manage.py migrate --no-input
+    # credential sheets and the shared cache live in the database unless CACHE_BACKEND is shared
+    python manage.py createcachetable
+    # the partitions API logs are written to, kept up by the hourly housekeeping job
+    python manage.py maintain_api_log_partitions
 fi
 
+# static files are served by nginx from the shared staticfiles volume
+python manage.py collectstatic --noinput
+
 python manage.py createsuperuser --noinput --username $DJANGO_SUPERUSER_USERNAME --email $DJANGO_SUPERUSER_EMAIL 
-python es_index.py
+# index only the rows changed since the last run, without holding up startup
+python es_index.py &
 
 exec "$@"
@@ -0,0 +1,35 @@
+"""
+Gunicorn settings for serving the backend in production.
+    gunicorn config.wsgi:application -c config/gunicorn.conf.py
+
+Workers are forked after the app is imported (preload_app) so they share its memory.
+Send HUP to the master to replace the workers gracefully, in-flight requests are
+finished first. Code changes need a restart since the workers are forked from the
+preloaded master.
+"""
+import multiprocessing
+
+# gunicorn reads every module level name as a setting, and `config` is one of them
+import decouple
+
+bind = decouple.config("GUNICORN_BIND", default="0.0.0.0:8000")
+workers = decouple.config("GUNICORN_WORKERS", default=multiprocessing.cpu_count() * 2 + 1, cast=int)
+threads = decouple.config("GUNICORN_THREADS", default=1, cast=int)
+preload_app = decouple.config("GUNICORN_PRELOAD_APP", default=True, cast=bool)
+
+# seconds a worker may spend on a request, and to finish in-flight requests on reload/shutdown
+timeout = decouple.config("GUNICORN_TIMEOUT", default=60, cast=int)
+graceful_timeout = decouple.config("GUNICORN_GRACEFUL_TIMEOUT", default=30, cast=int)
+keepalive = 5
+
+# recycle workers now and then so a slow leak cannot grow forever, jittered so they do not restart together
+max_requests = decouple.config("GUNICORN_MAX_REQUESTS", default=2000, cast=int)
+max_requests_jitter = max_requests // 10
+
+# heartbeat files on tmpfs, a disk backed /tmp can stall workers inside docker
+worker_tmp_dir = "/dev/shm"
+
+accesslog = "-"
+errorlog = "-"
+loglevel = decouple.config("GUNICORN_LOG_LEVEL", default="info")
+
@@ -13,6 +13,7 @@ import os
 from datetime import timedelta
 from pathlib import Path
 
+from celery.schedules import crontab
 from decouple import config
 from django.utils.translation import gettext_lazy as _
 from django.core.exceptions import ImproperlyConfigured
@@ -28,7 +29,7 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = config('SECRET_KEY')
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = config('DEBUG', default=False, cast=bool)
 
 ALLOWED_HOSTS = ['*']
 
@@ -51,7 +52,6 @@ THIRD_PARTY_APPS = [
     "rest_framework_simplejwt.token_blacklist",
     "corsheaders",
     "drf_spectacular",
-    "drf_api_logger",
     "modeltranslation",
 ]
 
@@ -63,6 +63,8 @@ COURSES_APPS = [
     'courses_apps.teacher',
     'courses_apps.epaath',
     'courses_apps.classroom',
+    'courses_apps.api_logs',
+    'courses_apps.outbox',
 ]
 
 INSTALLED_APPS += THIRD_PARTY_APPS + COURSES_APPS
@@ -77,7 +79,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'django.middleware.locale.LocaleMiddleware',
-    'drf_api_logger.middleware.api_logger_middleware.APILoggerMiddleware',
+    'courses_apps.api_logs.middleware.APILogMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -100,6 +102,8 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'config.wsgi.application'
 
+TEST_RUNNER = 'config.test_runner.TestRunner'
+
 
 DATABASES = {
     "default": {
@@ -109,17 +113,37 @@ DATABASES = {
         "PASSWORD": config("POSTGRES_PASSWORD", "password"),
         "HOST": config("POSTGRES_HOST", "localhost"),
         "PORT": config("POSTGRES_PORT", "5432"),
+        # keep connections open between requests and celery tasks instead of reconnecting
+        # every time, 0 closes them after each request and None never closes them
+        "CONN_MAX_AGE": config(
+            "DB_CONN_MAX_AGE", default=60, cast=lambda value: None if value == "None" else int(value)
+        ),
+        # a persistent connection is pinged before it is reused by a new request
+        "CONN_HEALTH_CHECKS": config("DB_CONN_HEALTH_CHECKS", default=True, cast=bool),
     }
 }
 
 # smtp stuffs
-EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+# django.core.mail.backends.filebased.EmailBackend writes the emails to EMAIL_FILE_PATH
+# instead, e.g. for local development
+EMAIL_BACKEND = config("EMAIL_BACKEND", default="django.core.mail.backends.smtp.EmailBackend")
+EMAIL_FILE_PATH = config("EMAIL_FILE_PATH", default=str(BASE_DIR / "sent_emails"))
+EMAIL_TIMEOUT = 30
 EMAIL_HOST = "smtp.gmail.com"
 EMAIL_PORT = 587
 EMAIL_HOST_USER = config("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = config("EMAIL_HOST_PASSWORD")
 EMAIL_USE_TLS = True
 ADMINS = [("Admin", config("ADMIN_USER"))]
+# celery workers keep their SMTP connection open between tasks for this many idle seconds
+EMAIL_CONNECTION_MAX_IDLE = config("EMAIL_CONNECTION_MAX_IDLE", default=60, cast=int)
+# emails per send_email_batch_task
+EMAIL_BATCH_SIZE = 100
+# failed emails are retried after EMAIL_RETRY_BACKOFF seconds, doubled per retry up to
+# EMAIL_RETRY_BACKOFF_MAX, then stored as DeadLetterEmail
+EMAIL_MAX_RETRIES = config("EMAIL_MAX_RETRIES", default=8, cast=int)
+EMAIL_RETRY_BACKOFF = 30
+EMAIL_RETRY_BACKOFF_MAX = 3600
 
 #CELERY STUFFS
 BROKER_URL = config("CELERY_BROKER_URL")
@@ -129,6 +153,29 @@ RESULT_SERIALIZER = 'json'
 TASK_SERIALIZER = 'json'
 TIMEZONE = 'Asia/Kathmandu'
 CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
+# seconds between beat dispatches of the outbox, deduplicated tasks (e.g. confirmation
+# email resends) wait for it, so the repeats within it are published once
+OUTBOX_DISPATCH_INTERVAL = config("OUTBOX_DISPATCH_INTERVAL", default=10.0, cast=float)
+CELERY_BEAT_SCHEDULE = {
+    "run-housekeeping": {
+        "task": "run_housekeeping_task",
+        "schedule": crontab(minute=30),
+    },
+    "dispatch-outbox": {
+        "task": "dispatch_outbox_task",
+        "schedule": OUTBOX_DISPATCH_INTERVAL,
+    },
+}
+# outbox tasks published per broker connection and delete
+OUTBOX_BATCH_SIZE = 500
+# seconds the after-commit publish waits for the broker before leaving the task to
+# dispatch_outbox_task
+OUTBOX_PUBLISH_TIMEOUT = 1
+# tasks taking a single list argument whose pending rows are published as one task of up
+# to this many items, e.g. the confirmation emails left pending while the broker was down
+OUTBOX_MERGED_TASKS = {
+    "send_email_batch_task": EMAIL_BATCH_SIZE,
+}
 
 
 # Password validation
@@ -162,6 +209,11 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Number of processes used to hash passwords when users are created in bulk.
+# Set to 1 to hash on the request process.
+PASSWORD_HASHING_WORKERS = config("PASSWORD_HASHING_WORKERS", default=os.cpu_count() or 1, cast=int)
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
 
@@ -193,6 +245,8 @@ MODELTRANSLATION_LANGUAGES = ('en', 'ne')
 # https://docs.djangoproject.com/en/4.2/howto/static-files/
 
 STATIC_URL = 'static/'
+# collected by `python manage.py collectstatic` and served by nginx in production
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 MEDIA_URL = '/media/'
@@ -217,9 +271,79 @@ SIMPLE_JWT = {
 
 REFRESH_COOKIE_MAX_AGE = 31536000
 
+# The default local memory cache is per process. Point CACHE_BACKEND/CACHE_LOCATION at a
+# shared cache (e.g. django.core.cache.backends.redis.RedisCache) so that invalidations
+# reach every web and celery process.
+CACHE_BACKEND = config("CACHE_BACKEND", default="django.core.cache.backends.locmem.LocMemCache")
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKEND,
+        "LOCATION": config("CACHE_LOCATION", default="seepalaya"),
+    }
+}
+if CACHE_BACKEND.endswith("LocMemCache"):
+    CACHES["default"]["OPTIONS"] = {"MAX_ENTRIES": config("CACHE_MAX_ENTRIES", default=10000, cast=int)}
+# Credential sheets are downloaded from whichever worker serves the request, so they are
+# kept in the database (python manage.py createcachetable) unless the cache is shared.
+if CACHE_BACKEND.endswith("LocMemCache"):
+    CACHES["credentials"] = {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "credential_sheet_cache",
+    }
+else:
+    CACHES["credentials"] = dict(CACHES["default"], KEY_PREFIX="credentials")
+# State every web and celery process must agree on, e.g. the cached role names, is kept
+# in the shared cache. It is the default cache when that is shared, otherwise a table in
+# the database, a per-process cache would miss the invalidations of the other processes.
+if CACHE_BACKEND.endswith("LocMemCache"):
+    CACHES["shared"] = {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "shared_cache",
+        # entries are per user, the default of 300 would cull on nearly every set
+        "OPTIONS": {"MAX_ENTRIES": config("SHARED_CACHE_MAX_ENTRIES", default=200000, cast=int)},
+    }
+else:
+    CACHES["shared"] = dict(CACHES["default"], KEY_PREFIX="shared")
+# Per-process copies of shared state read on every request, kept for a few seconds so a
+# warm request does not reach the shared cache.
+CACHES["local"] = {
+    "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    "LOCATION": "seepalaya-local",
+    "OPTIONS": {"MAX_ENTRIES": config("LOCAL_CACHE_MAX_ENTRIES", default=10000, cast=int)},
+}
+# seconds a teacher has to download the passwords of the students they created, once
+CREDENTIAL_SHEET_TIMEOUT = 900
+# Seconds a class code resolves from the cache, saves and deletes of the classroom drop it
+CLASSROOM_CODE_CACHE_TIMEOUT = config("CLASSROOM_CODE_CACHE_TIMEOUT", default=60, cast=int)
+
+# Role names of tokens without a roles claim are cached as long as an access token lives
+USER_ROLES_CACHE_TIMEOUT = int(SIMPLE_JWT["ACCESS_TOKEN_LIFETIME"].total_seconds())
+# Seconds the active state of a user is cached for, saves and deletes of the user drop it
+USER_ACTIVE_CACHE_TIMEOUT = USER_ROLES_CACHE_TIMEOUT
+# Seconds a process reuses its own copy, a deactivation reaches the other processes within
+USER_ACTIVE_LOCAL_TIMEOUT = config("USER_ACTIVE_LOCAL_TIMEOUT", default=30, cast=int)
+
+# Cached E-Paath catalog pages are also invalidated on import and admin edits
+EPAATH_CATALOG_CACHE_TIMEOUT = config("EPAATH_CATALOG_CACHE_TIMEOUT", default=3600, cast=int)
+# Seconds a process reuses the catalog version, other processes serve a changed catalog within
+EPAATH_CATALOG_VERSION_LOCAL_TIMEOUT = config("EPAATH_CATALOG_VERSION_LOCAL_TIMEOUT", default=10, cast=int)
+
+# A token blacklisted through the API is noticed by every process on its next request.
+# One blacklisted without the signal, e.g. by a bulk insert, within this many seconds.
+TOKEN_REVOCATION_SYNC_INTERVAL = config("TOKEN_REVOCATION_SYNC_INTERVAL", default=60, cast=int)
+# blacklisted tokens the revocation filter is sized for before it is rebuilt
+TOKEN_REVOCATION_FILTER_CAPACITY = config("TOKEN_REVOCATION_FILTER_CAPACITY", default=10000, cast=int)
+
+# Housekeeping jobs (see courses_apps/core/housekeeping.py) run hourly from celery beat
+# and delete rows in batches of HOUSEKEEPING_BATCH_SIZE, one transaction per batch.
+HOUSEKEEPING_BATCH_SIZE = 1000
+HOUSEKEEPING_RUN_RETENTION_DAYS = 30
+# expired email confirmation/change tokens are kept this long to report them as expired
+EMAIL_TOKEN_PURGE_AFTER = timedelta(days=1)
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication"
+        "courses_apps.account.authentication.StatelessJWTAuthentication"
     ],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
 }
@@ -370,14 +494,33 @@ LOGGING = {
     "filters": FILTERS[0],
 }
 
-# DRF API LOGGER INTO DATABASE
-DRF_API_LOGGER_DATABASE = True
-DRF_API_LOGGER_TIMEDELTA = 345
-DRF_API_LOGGER_EXCLUDE_KEYS = ['password', 'confirm_password', 'token', 'access_token', 'refresh_token']
-DRF_API_LOGGER_SLOW_API_ABOVE = 200
-DRF_API_LOGGER_MAX_REQUEST_BODY_SIZE = 1024
-DRF_API_LOGGER_MAX_RESPONSE_BODY_SIZE = 1024
-DRF_API_LOGGER_PATH_TYPE = 'FULL_PATH'
+# api request logging, see courses_apps/api_logs/middleware.py
+# config.test_runner turns it off, the background writer would carry rows over between test cases
+API_LOG_ENABLED = config('API_LOG_ENABLED', default=True, cast=bool)
+# share of requests logged, per path prefix (the longest match wins) and for everything else
+API_LOG_SAMPLE_RATE = config('API_LOG_SAMPLE_RATE', default=1.0, cast=float)
+API_LOG_SAMPLE_RATES = {
+    '/epaath/': 0.05,
+    '/account/token/refresh/': 0.1,
+}
+# errors and slow requests are logged regardless of sampling
+API_LOG_ALWAYS_LOG_ERRORS = True
+API_LOG_SLOW_REQUEST_MS = 200
+API_LOG_SKIP_PATHS = ('/admin/', '/jet/', '/static/', '/media/', '/api/schema/')
+API_LOG_SENSITIVE_KEYS = [
+    'password', 'confirm_password', 'new_password', 'token', 'access', 'refresh', 'access_token',
+    'refresh_token', 'authorization', 'cookie', 'file_url',
+]
+# request and response bodies larger than this are not stored
+API_LOG_MAX_BODY_SIZE = 1024
+# entries are written in bulk from a background thread every interval or once a batch is full
+API_LOG_BATCH_SIZE = 500
+API_LOG_FLUSH_INTERVAL = config('API_LOG_FLUSH_INTERVAL', default=5, cast=int)
+API_LOG_BUFFER_MAX_SIZE = 10000
+# days of logs kept, older daily partitions are dropped by the housekeeping job
+API_LOG_RETENTION_DAYS = config('API_LOG_RETENTION_DAYS', default=30, cast=int)
+# days of partitions created ahead, so logs keep being written if housekeeping stalls
+API_LOG_PARTITION_DAYS_AHEAD = config('API_LOG_PARTITION_DAYS_AHEAD', default=3, cast=int)
 
 # Elasticsearch settings
 ES_CONNECTIONS = {
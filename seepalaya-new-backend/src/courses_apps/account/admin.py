@@ -1,6 +1,25 @@
 from django.contrib import admin
-from .models import PortalUser,UserRoles, ProfilePicture
+from .models import PortalUser,UserRoles, ProfilePicture, DeadLetterEmail
 
 admin.site.register(PortalUser)
 admin.site.register(UserRoles)
 admin.site.register(ProfilePicture)
+
+
+class DeadLetterEmailAdmin(admin.ModelAdmin):
+    list_display = ('email_to', 'subject', 'attempts', 'created_date')
+    search_fields = ('email_to', 'subject')
+    readonly_fields = [field.name for field in DeadLetterEmail._meta.fields]
+    actions = ['resend']
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.action(description='Queue the selected emails again')
+    def resend(self, request, queryset):
+        from .services import dead_letter_emails_resend
+
+        count = dead_letter_emails_resend(dead_letter_emails=queryset)
+        self.message_user(request, f'{count} emails queued.')
+
+admin.site.register(DeadLetterEmail, DeadLetterEmailAdmin)
@@ -0,0 +1,36 @@
+from django.db import router
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from django.utils.translation import gettext_lazy as _
+from .models import LazyPortalUser
+from .selectors import user_is_active
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that does not fetch the user on every request.
+    The user is built from the token's user id claim and the remaining fields are loaded
+    only when a view touches them. Role checks use the token's roles claim
+    (see account.selectors.get_request_user_role_names), so views that only need the
+    user's pk and roles run without a user query.
+    Whether the user still exists and is active is checked through the process and shared
+    caches (see account.selectors.user_is_active), a deactivated or deleted user is
+    rejected within USER_ACTIVE_LOCAL_TIMEOUT seconds.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        is_active = user_is_active(user_id=user_id)
+        if is_active is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if not is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return LazyPortalUser.from_db(
+            router.db_for_read(LazyPortalUser), [api_settings.USER_ID_FIELD, "is_active"], [user_id, is_active]
+        )
@@ -1,14 +1,32 @@
+import os
 import re
-import random
 import string
 import secrets
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, List, Tuple, TypeVar
 from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import BigIntegerField, Count, Max, Q, Value
+from django.db.models.functions import Cast, Length, NullIf, Substr
+from django.contrib.auth.hashers import get_hasher
+from django.utils.module_loading import import_string
 from django.core.mail import send_mail
 from django.contrib.auth import get_user_model
-from .tasks import send_email_task
+from courses_apps.outbox.services import outbox_task_enqueue
 
 User = get_user_model()
 
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+_password_hashing_pool = None
+_password_hashing_pool_key = None
+_password_hashing_pool_lock = threading.Lock()
+
 def send_email_confirmation(*, token: str, receiver_email: str, username: str) -> bool:
     data ={
         'token':token
@@ -17,11 +35,29 @@ def send_email_confirmation(*, token: str, receiver_email: str, username: str) -
     subject='Please, confirm your email address for seepalaya.olenepal.org.'
     email_to = receiver_email
     # send_mail(subject, message, email_from, [email_to], fail_silently=False)
-    send_email_task.delay(subject, message, email_to)
+    # published by the beat dispatch, a newer confirmation email within OUTBOX_DISPATCH_INTERVAL
+    # replaces this one and it is merged with the other pending emails, see send_emails
+    outbox_task_enqueue(
+        task_name='send_email_batch_task',
+        args=[[{"subject": subject, "message": message, "email_to": email_to}]],
+        dedup_key=f'email_confirmation:{username}',
+    )
     print(message)
     print('email sent')
     return True
 
+def send_emails(*, payloads: List[Dict[str, str]]) -> None:
+    """
+    Queues many emails at once, in batches of EMAIL_BATCH_SIZE that the worker sends
+    in a single SMTP session each. A payload is {"subject", "message", "email_to"}.
+    The beat dispatch of the outbox merges the batches left pending up to EMAIL_BATCH_SIZE
+    payloads (OUTBOX_MERGED_TASKS), single emails included.
+    """
+    for start in range(0, len(payloads), settings.EMAIL_BATCH_SIZE):
+        outbox_task_enqueue(
+            task_name='send_email_batch_task', args=[payloads[start:start + settings.EMAIL_BATCH_SIZE]]
+        )
+
 def identify_email_or_username(credential: str) -> bool:
     # Regular expression to match email pattern
     pattern = r"(^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$)"
@@ -39,11 +75,113 @@ def send_reset_password_link(*, link: str, receiver_email: str) -> bool:
     email_to = receiver_email
 
     # send_mail(subject, message, email_from, [email_to], fail_silently=False)
-    send_email_task.delay(subject, message, email_to)
+    # published by the beat dispatch, a newer reset email within OUTBOX_DISPATCH_INTERVAL
+    # replaces this one
+    outbox_task_enqueue(
+        task_name='send_email_batch_task',
+        args=[[{"subject": subject, "message": message, "email_to": email_to}]],
+        dedup_key=f'reset_password:{email_to}',
+    )
     print(message)
     return True
 
 
+def allocate_unique_values(*, bases: List[str], fields: Dict[str, str]) -> List[Dict[str, str]]:
+    """
+    Reserves unique values for every base in `bases`, in order.
+    `fields` maps a PortalUser field to the tail appended after the base, e.g.
+    {"username": "", "email": "@seepalaya.com"}. A value is built as base + suffix + tail,
+    where the suffix is empty if the base is free and otherwise the next number after the
+    highest numeric suffix already taken for that base. All fields of one entry share the
+    same suffix. When the suffix would push a value past its field's max_length, the base
+    is shortened by the overflow and the suffix is allocated again for the shorter base.
+    Issues a single prefix query per distinct base, which only aggregates in the database,
+    so memory does not grow with the user table.
+    The values are only checked, not reserved in the database, so insert them with
+    retry_on_unique_violation.
+    """
+    max_lengths = {field: User._meta.get_field(field).max_length for field in fields}
+    reserved = {field: set() for field in fields}
+    first_numeric_suffixes = {}
+    next_suffixes = {}
+    allocated = []
+
+    for base in bases:
+        while True:
+            if base not in next_suffixes:
+                base_taken, first_numeric_suffix = _get_next_suffix(base=base, fields=fields)
+                first_numeric_suffixes[base] = first_numeric_suffix
+                next_suffixes[base] = first_numeric_suffix if base_taken else 0
+
+            suffix = next_suffixes[base]
+            while True:
+                values = {
+                    field: f"{base}{suffix if suffix else ''}{tail}"
+                    for field, tail in fields.items()
+                }
+                if not any(values[field] in reserved[field] for field in fields):
+                    break
+                suffix = suffix + 1 if suffix else first_numeric_suffixes[base]
+
+            overflow = max(len(values[field]) - max_lengths[field] for field in fields)
+            if overflow <= 0:
+                break
+            if overflow >= len(base):
+                raise ValueError(f"No value of at most {max_lengths} characters is left for '{base}'.")
+            base = base[:-overflow]
+        next_suffixes[base] = suffix + 1 if suffix else first_numeric_suffixes[base]
+
+        for field, value in values.items():
+            reserved[field].add(value)
+        allocated.append(values)
+
+    return allocated
+
+
+def retry_on_unique_violation(create: Callable[[], T], *, attempts: int = 3) -> T:
+    """
+    Returns the result of `create`, which allocates unique values and inserts them.
+    Another request may insert the same values between the allocation and the insert,
+    so `create` is called again when the insert violates a constraint. Each attempt
+    runs in a savepoint, a failed insert leaves the surrounding transaction usable.
+    """
+    for attempt in range(attempts):
+        try:
+            with transaction.atomic():
+                return create()
+        except IntegrityError:
+            if attempt == attempts - 1:
+                raise
+
+
+def _get_next_suffix(*, base: str, fields: Dict[str, str]) -> Tuple[bool, int]:
+    """
+    Returns whether base + tail is taken for any field, and one more than the
+    highest numeric suffix taken for the base across the fields.
+    The startswith lookup is served by the pattern index on the unique fields; the
+    regex only narrows the matches to base + digits + tail, at most 18 digits so the
+    suffix fits a bigint.
+    """
+    matches = Q()
+    aggregates = {}
+    for field, tail in fields.items():
+        field_matches = Q(**{
+            f"{field}__startswith": base,
+            f"{field}__regex": rf"^{re.escape(base)}[0-9]{{0,18}}{re.escape(tail)}$",
+        })
+        matches |= field_matches
+        digits = Substr(field, len(base) + 1, Length(field) - len(base) - len(tail))
+        aggregates[f"{field}_max_suffix"] = Max(
+            Cast(NullIf(digits, Value("")), BigIntegerField()), filter=field_matches
+        )
+        aggregates[f"{field}_base_taken"] = Count("pk", filter=Q(**{field: f"{base}{tail}"}))
+
+    result = User.objects.filter(matches).aggregate(**aggregates)
+
+    base_taken = any(result[f"{field}_base_taken"] for field in fields)
+    return base_taken, max(result[f"{field}_max_suffix"] or 0 for field in fields) + 1
+
+
 def construct_username_from_email(email: str) -> str:
     """
     Constructs a unique username from the given email, handling potential duplicates
@@ -54,14 +192,7 @@ def construct_username_from_email(email: str) -> str:
     # Ensure the username is no longer than 10 characters
     username = username[:10]
 
-    # Check if the username already exists in the database
-    final_username = username
-    while User.objects.filter(username__startswith=final_username).exists():
-        # Generate a random string of 2 letters and 2 numbers
-        random_chars = ''.join(random.choices(string.ascii_letters, k=1)) + ''.join(random.choices(string.digits, k=2))
-        final_username = f"{username[:5]}_{random_chars}"
-
-    return final_username
+    return allocate_unique_values(bases=[username], fields={"username": ""})[0]["username"]
 
 
 def construct_username_from_full_name(full_name: str) -> str:
@@ -73,29 +204,23 @@ def construct_username_from_full_name(full_name: str) -> str:
 
     username = username[:10]
 
-    final_username = username
-    while User.objects.filter(username__startswith=final_username).exists():
-        # Generate a random string of 2 letters and 2 numbers
-        random_chars = ''.join(random.choices(string.ascii_letters, k=1)) + ''.join(random.choices(string.digits, k=2))
-        final_username = f"{username[:5]}_{random_chars}"
-
-    return final_username
+    return allocate_unique_values(bases=[username], fields={"username": ""})[0]["username"]
 
 
 def construct_email_from_username(username: str) -> str:
     """
     Constructs a unique email address from the given username, handling potential duplicates.
     """
-    email = f"{username}@seepalaya.com"
-    final_email = email
-    # while EmailAddress.objects.filter(email=final_email).exists():
-    #     random_chars = ''.join(random.choices(string.ascii_letters, k=2))
-    #     final_email = f"{email[:5]}_{random_chars}@seepalaya.com"
-    while User.objects.filter(email__startswith=final_email).exists():
-        random_string = ''.join(random.choices(string.ascii_lowercase, k=3))
-        username_with_suffix = f"{username}_{random_string}"
-        final_email = f"{username_with_suffix}@{email.split('@')[1]}" 
-    return final_email
+    return allocate_unique_values(bases=[username], fields={"email": "@seepalaya.com"})[0]["email"]
+
+
+def construct_email_for_child(*, username: str, email: str) -> str:
+    """
+    Constructs an email for a child user based on the guardian's email/teacher's email and the child's username.
+    """
+    return allocate_unique_values(
+        bases=[username], fields={"email": f"@{email.split('@')[1]}"}
+    )[0]["email"]
 
 
 def generate_random_password() -> str:
@@ -113,4 +238,71 @@ def generate_random_password() -> str:
 #     """
 #     Checks if the email is verified or not
 #     """
-#     return EmailAddress.objects.filter(email=email, is_verified=True).exists()
\ No newline at end of file
+#     return EmailAddress.objects.filter(email=email, is_verified=True).exists()
+
+
+def _hash_password_chunk(hasher_path: str, passwords: List[str]) -> List[str]:
+    """
+    Runs inside a pool worker. The hasher is passed by its import path so the
+    worker does not depend on the settings it was forked with.
+    """
+    hasher = import_string(hasher_path)()
+    return [hasher.encode(password, hasher.salt()) for password in passwords]
+
+
+def _get_password_hashing_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Returns the process pool used for password hashing, creating it lazily.
+    The pool is recreated after a fork (e.g. in a new server worker) or when
+    the configured worker count changes.
+    """
+    global _password_hashing_pool, _password_hashing_pool_key
+
+    pool_key = (os.getpid(), workers)
+    with _password_hashing_pool_lock:
+        if _password_hashing_pool is None or _password_hashing_pool_key != pool_key:
+            _password_hashing_pool = ProcessPoolExecutor(max_workers=workers)
+            _password_hashing_pool_key = pool_key
+        return _password_hashing_pool
+
+
+def _reset_password_hashing_pool(*, broken: ProcessPoolExecutor) -> None:
+    """
+    Drops a pool that broke (e.g. a worker was killed), so the next call builds a new one
+    instead of falling back to serial hashing for the life of the process.
+    """
+    global _password_hashing_pool, _password_hashing_pool_key
+
+    with _password_hashing_pool_lock:
+        if _password_hashing_pool is broken:
+            _password_hashing_pool = None
+            _password_hashing_pool_key = None
+    broken.shutdown(wait=False)
+
+
+def make_passwords(passwords: List[str]) -> List[str]:
+    """
+    Hashes the given raw passwords with the default password hasher and returns the
+    encoded hashes in the same order.
+    Hashing is CPU bound, so batches are split across a process pool of
+    PASSWORD_HASHING_WORKERS processes. Falls back to hashing on the current process
+    when the pool is disabled or cannot be used (e.g. inside a daemonic celery worker).
+    """
+    hasher = get_hasher()
+    hasher_path = f"{hasher.__class__.__module__}.{hasher.__class__.__qualname__}"
+    workers = min(settings.PASSWORD_HASHING_WORKERS, len(passwords))
+
+    if workers <= 1:
+        return _hash_password_chunk(hasher_path, passwords)
+
+    chunk_size = -(-len(passwords) // workers)
+    chunks = [passwords[i:i + chunk_size] for i in range(0, len(passwords), chunk_size)]
+    try:
+        pool = _get_password_hashing_pool(settings.PASSWORD_HASHING_WORKERS)
+        hashed_chunks = pool.map(_hash_password_chunk, [hasher_path] * len(chunks), chunks)
+        return [hashed for chunk in hashed_chunks for hashed in chunk]
+    except (BrokenProcessPool, AssertionError, OSError) as e:
+        logger.warning(f"Password hashing pool unavailable, hashing serially: {e}")
+        if isinstance(e, BrokenProcessPool):
+            _reset_password_hashing_pool(broken=pool)
+        return _hash_password_chunk(hasher_path, passwords)
@@ -0,0 +1,140 @@
+import logging
+import os
+import random
+import smtplib
+import threading
+import time
+from typing import Dict, List, Tuple
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+
+logger = logging.getLogger('django.errors')
+
+# an email payload as queued to celery: {"subject": ..., "message": ..., "email_to": ...}
+EmailPayload = Dict[str, str]
+
+
+def email_message_build(*, subject: str, message: str, email_to: str) -> EmailMessage:
+    return EmailMessage(subject, message, settings.EMAIL_HOST_USER, [email_to])
+
+
+def email_error_is_permanent(error: Exception) -> bool:
+    """
+    Returns whether retrying cannot help, the server rejected the message or the
+    recipient for good (a 5xx reply). A refused recipient carries its own reply code,
+    a 4xx one, e.g. a full mailbox or greylisting, is retried.
+    """
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return bool(error.recipients) and all(code >= 500 for code, _ in error.recipients.values())
+    return isinstance(error, smtplib.SMTPResponseException) and error.smtp_code >= 500
+
+
+def email_error_ends_session(error: Exception) -> bool:
+    """
+    Returns whether the error concerns the SMTP session rather than the message, e.g.
+    the server cannot be reached, refused our login or sender, or is shutting down (421).
+    Every message after it would fail alike, so the batch is aborted.
+    """
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return False
+    if isinstance(error, smtplib.SMTPDataError):
+        return error.smtp_code == 421
+    return True
+
+
+class EmailBatchAborted(Exception):
+    """
+    Raised when the session failed midway through a batch. Carries the error, the
+    messages that failed on their own before it and the ones not sent yet.
+    """
+
+    def __init__(self, error: Exception, failed: List[Tuple[EmailPayload, Exception]], unsent: List[EmailPayload]):
+        super().__init__(error)
+        self.error = error
+        self.failed = failed
+        self.unsent = unsent
+
+
+def email_retry_countdown(*, retries: int) -> float:
+    """
+    Returns the seconds to wait before the next delivery attempt: EMAIL_RETRY_BACKOFF
+    doubled per retry, capped at EMAIL_RETRY_BACKOFF_MAX, with jitter so messages
+    that failed together are not retried together.
+    """
+    countdown = min(settings.EMAIL_RETRY_BACKOFF * 2 ** retries, settings.EMAIL_RETRY_BACKOFF_MAX)
+    return countdown / 2 + random.uniform(0, countdown / 2)
+
+
+class PooledEmailConnection:
+    """
+    An email backend connection kept open per worker process and reused by every task
+    it runs, so the TLS session to the SMTP server is set up once rather than per
+    message. The connection is reopened after a fork, after EMAIL_CONNECTION_MAX_IDLE
+    seconds unused (SMTP servers drop idle sessions) and when the server hung up.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._connection = None
+        self._key = None
+        self._last_used = 0.0
+
+    def send(self, payloads: List[EmailPayload]) -> List[Tuple[EmailPayload, Exception]]:
+        """
+        Sends the payloads in one session and returns the ones the server refused with
+        their errors. A message the server hung up on is sent once more on a new
+        connection. Raises EmailBatchAborted on the first error of the session itself
+        (see email_error_ends_session), so an unreachable server costs one timeout per
+        batch rather than one per message.
+        """
+        failed = []
+        with self._lock:
+            for index, payload in enumerate(payloads):
+                message = email_message_build(**payload)
+                for attempt in range(2):
+                    try:
+                        self._get().send_messages([message])
+                    except smtplib.SMTPServerDisconnected as e:
+                        self._discard()
+                        if attempt:
+                            raise EmailBatchAborted(e, failed, payloads[index:])
+                        continue
+                    except Exception as e:
+                        if email_error_ends_session(e):
+                            self.close()
+                            raise EmailBatchAborted(e, failed, payloads[index:])
+                        failed.append((payload, e))
+                    break
+                self._last_used = time.monotonic()
+        return failed
+
+    def close(self) -> None:
+        if self._connection is None:
+            return
+        try:
+            self._connection.close()
+        except Exception:
+            logger.warning('Could not close the pooled email connection cleanly', exc_info=True)
+        self._discard()
+
+    def _get(self):
+        key = (os.getpid(), settings.EMAIL_BACKEND)
+        if self._connection is not None:
+            if key[0] != self._key[0]:
+                # inherited from the parent process, closing it would end the parent's session
+                self._discard()
+            elif key != self._key or time.monotonic() - self._last_used > settings.EMAIL_CONNECTION_MAX_IDLE:
+                self.close()
+        if self._connection is None:
+            connection = get_connection(fail_silently=False)
+            connection.open()
+            self._connection, self._key = connection, key
+            self._last_used = time.monotonic()
+        return self._connection
+
+    def _discard(self) -> None:
+        self._connection = None
+        self._key = None
+
+
+pooled_email_connection = PooledEmailConnection()
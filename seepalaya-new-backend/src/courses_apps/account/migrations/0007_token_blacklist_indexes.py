@@ -0,0 +1,26 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Indexes the token blacklist tables for the expired token pruner and the revocation
+    filter sync. The tables belong to simplejwt, so the indexes are created here.
+    """
+
+    dependencies = [
+        ('account', '0006_lazyportaluser'),
+        ('token_blacklist', '0012_alter_outstandingtoken_user'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql='CREATE INDEX IF NOT EXISTS token_outstanding_expires_at_idx '
+                'ON token_blacklist_outstandingtoken (expires_at);',
+            reverse_sql='DROP INDEX IF EXISTS token_outstanding_expires_at_idx;',
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX IF NOT EXISTS token_blacklisted_at_idx '
+                'ON token_blacklist_blacklistedtoken (blacklisted_at);',
+            reverse_sql='DROP INDEX IF EXISTS token_blacklisted_at_idx;',
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2 on 2026-10-18 15:07
+
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0007_token_blacklist_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeadLetterEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('uid', models.UUIDField(default=uuid.uuid4, editable=False, unique=True, verbose_name='Public Identifier')),
+                ('created_date', models.DateTimeField(auto_now_add=True)),
+                ('updated_date', models.DateTimeField(auto_now=True)),
+                ('subject', models.CharField(max_length=255)),
+                ('message', models.TextField()),
+                ('email_to', models.EmailField(max_length=255)),
+                ('error', models.TextField()),
+                ('attempts', models.PositiveSmallIntegerField()),
+            ],
+            options={
+                'verbose_name': 'Dead Letter Email',
+                'verbose_name_plural': 'Dead Letter Emails',
+                'ordering': ['-created_date'],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2 on 2026-10-18 15:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0008_deadletteremail'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='changeemailaddresstoken',
+            index=models.Index(fields=['user', 'token'], name='account_emailchange_user_token'),
+        ),
+        migrations.AddIndex(
+            model_name='changeemailaddresstoken',
+            index=models.Index(fields=['created_time'], name='account_emailchange_created'),
+        ),
+        migrations.AddIndex(
+            model_name='emailconfirmationtoken',
+            index=models.Index(fields=['user', 'token'], name='account_emailconf_user_token'),
+        ),
+        migrations.AddIndex(
+            model_name='emailconfirmationtoken',
+            index=models.Index(fields=['created_time'], name='account_emailconf_created'),
+        ),
+    ]
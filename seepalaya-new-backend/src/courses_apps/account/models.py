@@ -10,6 +10,7 @@ from django.db.models import Index, Q
 from django.db.models.constraints import UniqueConstraint
 from django.db.models.functions import Upper
 from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
 from config.validators import validate_full_name
 from django.core.validators import MinLengthValidator
 
@@ -92,6 +93,31 @@ class PortalUser(AbstractUser):
         return self.username
 
 
+class LazyPortalUser(PortalUser):
+    """
+    A portal user built from access token claims with only the primary key loaded.
+    The first access to any other field loads all remaining fields in one query,
+    instead of one query per field.
+    """
+
+    class Meta:
+        proxy = True
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        deferred_fields = self.get_deferred_fields()
+        if fields is not None and deferred_fields and set(fields) <= deferred_fields:
+            fields = list(deferred_fields)
+        try:
+            return super().refresh_from_db(using=using, fields=fields, **kwargs)
+        except PortalUser.DoesNotExist:
+            # the token outlived the user it was issued for
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+
+# email confirmation and change tokens are valid this long after they are sent
+EMAIL_TOKEN_LIFETIME = timedelta(minutes=5)
+
+
 class EmailConfirmationToken(models.Model):
 
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="email_confirmation_token")
@@ -103,6 +129,10 @@ class EmailConfirmationToken(models.Model):
         verbose_name = "Email Confirmation Token"
         verbose_name_plural = "Email Confirmation Tokens"
         ordering = ["-created_time"]
+        indexes = [
+            Index(fields=["user", "token"], name="account_emailconf_user_token"),
+            Index(fields=["created_time"], name="account_emailconf_created"),
+        ]
 
     def __str__(self):
         return self.user.username + self.email
@@ -110,7 +140,7 @@ class EmailConfirmationToken(models.Model):
     @property
     def has_expired(self) -> bool:
         now = timezone.now()
-        expiry_time = self.created_time + timedelta(minutes=5)
+        expiry_time = self.created_time + EMAIL_TOKEN_LIFETIME
         return now > expiry_time
     
 
@@ -147,6 +177,10 @@ class ChangeEmailAddressToken(IdentifierTimeStampAbstractModel):
         verbose_name = "Email Change Token"
         verbose_name_plural = "Email Change Tokens"
         ordering = ["-created_time"]
+        indexes = [
+            Index(fields=["user", "token"], name="account_emailchange_user_token"),
+            Index(fields=["created_time"], name="account_emailchange_created"),
+        ]
 
     def __str__(self):
         return self.user.username + self.email
@@ -154,6 +188,25 @@ class ChangeEmailAddressToken(IdentifierTimeStampAbstractModel):
     @property
     def has_expired(self) -> bool:
         now = timezone.now()
-        created_time = self.created_time + timedelta(minutes=5)
+        created_time = self.created_time + EMAIL_TOKEN_LIFETIME
         return now > created_time
-    
\ No newline at end of file
+    
+
+class DeadLetterEmail(IdentifierTimeStampAbstractModel):
+    """
+    An email that could not be delivered, kept so it can be inspected and queued again
+    with the resend_dead_letter_emails command.
+    """
+    subject = models.CharField(max_length=255)
+    message = models.TextField()
+    email_to = models.EmailField(max_length=255)
+    error = models.TextField()
+    attempts = models.PositiveSmallIntegerField()
+
+    class Meta:
+        verbose_name = "Dead Letter Email"
+        verbose_name_plural = "Dead Letter Emails"
+        ordering = ["-created_date"]
+
+    def __str__(self):
+        return f"{self.email_to}: {self.subject}"
@@ -1,5 +1,6 @@
 from rest_framework.permissions import BasePermission
 from django.contrib.auth import get_user_model
+from .selectors import get_request_user_role_names
 
 User = get_user_model()
     
@@ -11,7 +12,7 @@ class IsVerifiedGuardian(BasePermission):
     message = "User needs to be a verified guardian to access this view."
 
     def has_permission(self, request, view):
-        return User.objects.filter(roles__name="guardian", pk=request.user.pk, is_verified=True).exists()
+        return "guardian" in get_request_user_role_names(request=request) and request.user.is_verified
 
 
 class IsGuardian(BasePermission):
@@ -21,7 +22,7 @@ class IsGuardian(BasePermission):
     message = "You do not have permission to perform this action."
 
     def has_permission(self, request, view):
-        return User.objects.filter(roles__name="guardian", pk=request.user.pk).exists()
+        return "guardian" in get_request_user_role_names(request=request)
 
 
 class IsLearner(BasePermission):
@@ -31,7 +32,7 @@ class IsLearner(BasePermission):
     message = "You do not have permission to perform this action."
 
     def has_permission(self, request, view):
-        return User.objects.filter(roles__name="learner", pk=request.user.pk).exists()
+        return "learner" in get_request_user_role_names(request=request)
 
 
 class IsTeacher(BasePermission):
@@ -41,7 +42,7 @@ class IsTeacher(BasePermission):
     message = "You do not have permission to perform this action."
 
     def has_permission(self, request, view):
-        return User.objects.filter(roles__name="teacher", pk=request.user.pk).exists()
+        return "teacher" in get_request_user_role_names(request=request)
 
 
 class IsVerified(BasePermission):
@@ -1,11 +1,16 @@
 import datetime
+from django.conf import settings
+from django.core.cache import caches
 from datetime import timedelta
 from django.utils import timezone
-from typing import Union, List
+from typing import Dict, Union, List, Optional
 from django.db.models import F, QuerySet
 from django.contrib.postgres.aggregates import ArrayAgg
 from django.contrib.auth import get_user_model
+from django.db import connection
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
 from .models import UserRoles
+from .tokens import ROLES_CLAIM
 from rest_framework.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 from .models import PortalUser, ProfilePicture, EmailConfirmationToken
@@ -48,6 +53,18 @@ def user_get_from_email(*, email: str) -> User:
     return user
 
 
+def user_get_for_login(*, username: Optional[str] = None, email: Optional[str] = None) -> Optional[User]:
+    """
+    Returns the user with the given username or email together with their teacher and
+    learner profiles, fetched in a single query. Returns None if the user does not exist.
+    """
+    lookup = {"email": email} if email is not None else {"username": username}
+    try:
+        return User.objects.select_related("teacher", "learner").get(**lookup)
+    except User.DoesNotExist:
+        return None
+
+
 def check_if_email_is_taken(*, email: str) -> bool:
     """
     Returns True if the email is already taken, else False.
@@ -83,10 +100,7 @@ def token_get_from_user_and_incoming_token(*, user: str, incoming_token: str) ->
     """
     Returns an otp object from a given otp number. Returns None if not found.
     """
-    qs = EmailConfirmationToken.objects.filter(user=user, token=incoming_token).order_by('created_time')
-    if qs.exists():
-        return qs.first()
-    return None
+    return EmailConfirmationToken.objects.filter(user=user, token=incoming_token).order_by('created_time').first()
 
 def get_user_role_by_name(*, user_type: str) -> UserRoles:
     """
@@ -111,6 +125,85 @@ def get_user_roles_by_user(*, user: User) -> List[UserRoles]:
         return None
 
 
+def user_role_names_cache_key(*, user_id: int) -> str:
+    """
+    Returns the cache key holding the role names of the given user.
+    """
+    return f"account:user_roles:{user_id}"
+
+
+def get_user_role_names(*, user_id: int, use_cache: bool = True) -> List[str]:
+    """
+    Returns the role names of the given user, from the cache when present.
+    The shared cache is refreshed whenever the user's roles change, in whichever process
+    they changed, so a cached value is always current. Pass use_cache=False to read the
+    roles from the database only.
+    """
+    if not use_cache:
+        return list(UserRoles.objects.filter(users_roles=user_id).values_list("name", flat=True))
+
+    cache_key = user_role_names_cache_key(user_id=user_id)
+    role_names = caches["shared"].get(cache_key)
+    if role_names is None:
+        role_names = get_user_role_names(user_id=user_id, use_cache=False)
+        caches["shared"].set(cache_key, role_names, timeout=settings.USER_ROLES_CACHE_TIMEOUT)
+    return role_names
+
+
+def user_active_cache_key(*, user_id: int) -> str:
+    """
+    Returns the cache key holding whether the given user is active.
+    """
+    return f"account:user_active:{user_id}"
+
+
+def user_is_active(*, user_id: int) -> Optional[bool]:
+    """
+    Returns whether the given user is active, or None if they do not exist.
+    The state is kept in the shared cache and dropped whenever the user is saved or
+    deleted. Each process reuses its own copy for USER_ACTIVE_LOCAL_TIMEOUT seconds, so
+    a warm request makes no query and the other processes notice a deactivation within
+    that time.
+    """
+    cache_key = user_active_cache_key(user_id=user_id)
+    is_active = caches["local"].get(cache_key)
+    if is_active is not None:
+        return is_active
+
+    is_active = caches["shared"].get(cache_key)
+    if is_active is None:
+        is_active = User.objects.filter(pk=user_id).values_list("is_active", flat=True).first()
+        if is_active is None:
+            return None
+        caches["shared"].set(cache_key, is_active, timeout=settings.USER_ACTIVE_CACHE_TIMEOUT)
+    caches["local"].set(cache_key, is_active, timeout=settings.USER_ACTIVE_LOCAL_TIMEOUT)
+    return is_active
+
+
+def get_request_user_role_names(*, request) -> List[str]:
+    """
+    Returns the role names of the requesting user, resolved at most once per request.
+    The signed roles claim of the access token is trusted without a query, a role change
+    applies to the tokens issued after it (RotateAccessTokenAPIView re-reads the roles).
+    Tokens without the claim fall back to the cache, then the database.
+    """
+    user = request.user
+    if user is None or user.pk is None:
+        return []
+
+    role_names = getattr(user, "_role_names", None)
+    if role_names is not None:
+        return role_names
+
+    if request.auth is not None:
+        role_names = request.auth.get(ROLES_CLAIM)
+    if role_names is None:
+        role_names = get_user_role_names(user_id=user.pk)
+
+    user._role_names = role_names
+    return role_names
+
+
 # def email_get_from_email_table_by_user(*, user: User, email: str) -> EmailAddress:
 #     """
 #     Returns an email address object from the given user object.
@@ -271,3 +364,23 @@ def check_verification_requirement(user: User) -> bool:
     except User.DoesNotExist:
         return False
     return False
+
+
+def token_blacklist_stats() -> Dict[str, int]:
+    """
+    Returns the size of the token blacklist tables: the outstanding, expired and
+    blacklisted token counts and, on PostgreSQL, the bytes both tables take on disk.
+    """
+    stats = {
+        "outstanding_tokens": OutstandingToken.objects.count(),
+        "expired_tokens": OutstandingToken.objects.filter(expires_at__lt=timezone.now()).count(),
+        "blacklisted_tokens": BlacklistedToken.objects.count(),
+    }
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_total_relation_size(%s), pg_total_relation_size(%s)",
+                [OutstandingToken._meta.db_table, BlacklistedToken._meta.db_table],
+            )
+            stats["outstanding_tokens_bytes"], stats["blacklisted_tokens_bytes"] = cursor.fetchone()
+    return stats
@@ -0,0 +1,79 @@
+from django.db import transaction
+from django.core.cache import cache, caches
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from .revocation import token_blacklist_version_bump, token_revocation_filter
+from .selectors import user_active_cache_key, user_role_names_cache_key
+from .services import user_roles_cache_refresh
+
+User = get_user_model()
+
+
+@receiver(m2m_changed, sender=User.roles.through)
+def refresh_user_roles_cache(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Refreshes the cached role names of every user whose roles changed, once the
+    change is committed.
+    """
+    if action == "pre_clear" and reverse:
+        # the affected users are unknown once the role has been cleared
+        instance._cleared_user_ids = list(instance.users_roles.values_list("pk", flat=True))
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if not reverse:
+        user_ids = [instance.pk]
+    elif action == "post_clear":
+        user_ids = getattr(instance, "_cleared_user_ids", [])
+    else:
+        user_ids = list(pk_set)
+
+    if user_ids:
+        transaction.on_commit(lambda: user_roles_cache_refresh(user_ids=user_ids))
+
+
+@receiver(post_delete, sender=User)
+def delete_user_roles_cache(sender, instance, **kwargs):
+    """
+    Drops the cached role names of a deleted user.
+    """
+    caches["shared"].delete(user_role_names_cache_key(user_id=instance.pk))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def delete_user_active_cache(sender, instance, **kwargs):
+    """
+    Drops the cached active state of a saved or deleted user once the change is
+    committed, so their tokens are checked against the new state. This process' copy is
+    dropped at once as well. Queryset updates of is_active send no signal and must drop
+    the key themselves.
+    """
+    cache_key = user_active_cache_key(user_id=instance.pk)
+    caches["local"].delete(cache_key)
+
+    def delete_cache_key():
+        caches["shared"].delete(cache_key)
+        caches["local"].delete(cache_key)
+
+    transaction.on_commit(delete_cache_key)
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def publish_blacklisted_token(sender, instance, created, **kwargs):
+    """
+    Adds a newly blacklisted token to this process' revocation filter and has the
+    other processes sync theirs, once the blacklisting is committed.
+    """
+    if not created:
+        return
+    jti = instance.token.jti
+
+    def publish():
+        token_revocation_filter.add(jti)
+        token_blacklist_version_bump()
+
+    transaction.on_commit(publish)
@@ -0,0 +1,167 @@
+import smtplib
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import TestCase, override_settings
+from courses_apps.account.mailer import pooled_email_connection
+from courses_apps.account.models import DeadLetterEmail
+from courses_apps.account.services import dead_letter_emails_resend
+from courses_apps.account.tasks import send_email_batch_task, send_email_task
+from courses_apps.outbox.models import OutboxTask
+
+BACKEND_PATH = 'courses_apps.account.tests.services.test_email_delivery'
+
+
+class CountingEmailBackend(EmailBackend):
+    opened = 0
+    errors = []
+    open_errors = []
+
+    def open(self):
+        CountingEmailBackend.opened += 1
+        if CountingEmailBackend.open_errors:
+            raise CountingEmailBackend.open_errors.pop(0)
+        return True
+
+    def send_messages(self, messages):
+        if CountingEmailBackend.errors:
+            raise CountingEmailBackend.errors.pop(0)
+        return super().send_messages(messages)
+
+
+def make_payloads(count):
+    return [
+        {"subject": f"Subject {i}", "message": f"Message {i}", "email_to": f"user{i}@example.com"}
+        for i in range(count)
+    ]
+
+
+@override_settings(
+    EMAIL_BACKEND=f'{BACKEND_PATH}.CountingEmailBackend', EMAIL_MAX_RETRIES=2,
+    EMAIL_RETRY_BACKOFF=0, EMAIL_RETRY_BACKOFF_MAX=0,
+)
+class TestEmailDelivery(TestCase):
+    def setUp(self):
+        pooled_email_connection.close()
+        CountingEmailBackend.opened = 0
+        CountingEmailBackend.errors = []
+        CountingEmailBackend.open_errors = []
+
+    def tearDown(self):
+        pooled_email_connection.close()
+
+    def test_connection_is_reused_across_tasks(self):
+        send_email_batch_task.apply(args=[make_payloads(3)])
+        send_email_task.apply(args=['Subject', 'Message', 'user@example.com'])
+
+        self.assertEqual(CountingEmailBackend.opened, 1)
+        self.assertEqual(len(mail.outbox), 4)
+        self.assertEqual(mail.outbox[3].to, ['user@example.com'])
+
+    @override_settings(EMAIL_CONNECTION_MAX_IDLE=-1)
+    def test_idle_connection_is_reopened(self):
+        send_email_task.apply(args=['Subject', 'Message', 'user@example.com'])
+        send_email_task.apply(args=['Subject', 'Message', 'user@example.com'])
+
+        self.assertEqual(CountingEmailBackend.opened, 2)
+
+    def test_dropped_connection_is_reopened(self):
+        CountingEmailBackend.errors = [smtplib.SMTPServerDisconnected()]
+
+        send_email_batch_task.apply(args=[make_payloads(2)])
+
+        self.assertEqual(CountingEmailBackend.opened, 2)
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertFalse(DeadLetterEmail.objects.exists())
+
+    def test_unreachable_server_aborts_the_batch(self):
+        CountingEmailBackend.open_errors = [ConnectionRefusedError()]
+
+        result = send_email_batch_task.apply(args=[make_payloads(5)])
+
+        self.assertTrue(result.successful())
+        # one attempt to connect for the failed batch, one for its retry
+        self.assertEqual(CountingEmailBackend.opened, 2)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertFalse(DeadLetterEmail.objects.exists())
+
+    def test_session_failure_midway_retries_the_rest(self):
+        CountingEmailBackend.errors = [smtplib.SMTPSenderRefused(550, b'sender denied', 'noreply@example.com')]
+
+        send_email_batch_task.apply(args=[make_payloads(3)])
+
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertFalse(DeadLetterEmail.objects.exists())
+
+    def test_authentication_failure_is_not_dead_lettered(self):
+        CountingEmailBackend.open_errors = [smtplib.SMTPAuthenticationError(535, b'bad credentials')] * 2
+
+        result = send_email_batch_task.apply(args=[make_payloads(5)])
+
+        self.assertTrue(result.successful())
+        self.assertEqual(CountingEmailBackend.opened, 3)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertFalse(DeadLetterEmail.objects.exists())
+
+    def test_session_failing_every_attempt_is_dead_lettered_at_the_end(self):
+        CountingEmailBackend.open_errors = [smtplib.SMTPAuthenticationError(535, b'bad credentials')] * 3
+
+        send_email_batch_task.apply(args=[make_payloads(5)])
+
+        # once per attempt, not once per message
+        self.assertEqual(CountingEmailBackend.opened, 3)
+        self.assertEqual(DeadLetterEmail.objects.count(), 5)
+        self.assertEqual(set(DeadLetterEmail.objects.values_list('attempts', flat=True)), {3})
+
+    def test_transient_failure_is_retried(self):
+        CountingEmailBackend.errors = [smtplib.SMTPDataError(451, b'try again')]
+
+        result = send_email_batch_task.apply(args=[make_payloads(3)])
+
+        self.assertTrue(result.successful())
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox),
+                         ['user0@example.com', 'user1@example.com', 'user2@example.com'])
+        self.assertFalse(DeadLetterEmail.objects.exists())
+
+    def test_permanent_failure_is_dead_lettered(self):
+        CountingEmailBackend.errors = [smtplib.SMTPRecipientsRefused({'user0@example.com': (550, b'no such user')})]
+
+        send_email_batch_task.apply(args=[make_payloads(2)])
+
+        self.assertEqual(len(mail.outbox), 1)
+        dead_letter_email = DeadLetterEmail.objects.get()
+        self.assertEqual(dead_letter_email.email_to, 'user0@example.com')
+        self.assertEqual(dead_letter_email.attempts, 1)
+
+    def test_temporarily_refused_recipient_is_retried(self):
+        CountingEmailBackend.errors = [smtplib.SMTPRecipientsRefused({
+            'user0@example.com': (550, b'no such user'), 'user1@example.com': (452, b'mailbox full'),
+        })]
+
+        result = send_email_batch_task.apply(args=[make_payloads(1)])
+
+        self.assertTrue(result.successful())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertFalse(DeadLetterEmail.objects.exists())
+
+    def test_exhausted_retries_are_dead_lettered(self):
+        CountingEmailBackend.errors = [smtplib.SMTPDataError(451, b'try again')] * 3
+
+        send_email_task.apply(args=['Subject', 'Message', 'user@example.com'])
+
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(DeadLetterEmail.objects.get().attempts, 3)
+
+    def test_dead_letter_emails_resend(self):
+        DeadLetterEmail.objects.create(
+            subject='Subject', message='Message', email_to='user@example.com', error='error', attempts=3
+        )
+
+        count = dead_letter_emails_resend(dead_letter_emails=DeadLetterEmail.objects.all())
+
+        self.assertEqual(count, 1)
+        self.assertFalse(DeadLetterEmail.objects.exists())
+        outbox_task = OutboxTask.objects.get()
+        self.assertEqual(outbox_task.task_name, 'send_email_batch_task')
+        self.assertEqual(
+            outbox_task.args, [[{"subject": "Subject", "message": "Message", "email_to": "user@example.com"}]]
+        )
@@ -0,0 +1,41 @@
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from courses_apps.account.models import ChangeEmailAddressToken, EmailConfirmationToken
+from courses_apps.account.selectors import token_get_from_user_and_incoming_token
+from courses_apps.account.services import email_tokens_expired_delete
+from courses_apps.core.housekeeping import housekeeping_jobs_run
+
+User = get_user_model()
+
+
+@override_settings(EMAIL_TOKEN_PURGE_AFTER=timedelta(days=1))
+class TestEmailTokenPurge(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tokenuser', email='token@example.com', password='strongpassword1$')
+        now = timezone.now()
+        for model in (EmailConfirmationToken, ChangeEmailAddressToken):
+            for token, age in [('fresh', timedelta(minutes=1)), ('expired', timedelta(hours=1)),
+                               ('stale', timedelta(days=2))]:
+                model.objects.create(user=self.user, token=token, email='token@example.com')
+                # created_time is auto_now, so it is backdated after the insert
+                model.objects.filter(token=token).update(created_time=now - age)
+
+    def test_only_tokens_expired_past_the_grace_period_are_deleted(self):
+        self.assertEqual(email_tokens_expired_delete(batch_size=1), 2)
+
+        for model in (EmailConfirmationToken, ChangeEmailAddressToken):
+            self.assertEqual(set(model.objects.values_list('token', flat=True)), {'fresh', 'expired'})
+
+    def test_housekeeping_job(self):
+        run, = housekeeping_jobs_run(names=['purge_expired_email_tokens'])
+
+        self.assertEqual(run.rows, 2)
+        self.assertEqual(run.error, '')
+
+    def test_token_lookup_is_a_single_query(self):
+        with self.assertNumQueries(1):
+            token = token_get_from_user_and_incoming_token(user=self.user, incoming_token='expired')
+
+        self.assertTrue(token.has_expired)
@@ -0,0 +1,122 @@
+import uuid
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from courses_apps.account.revocation import TOKEN_BLACKLIST_VERSION_KEY, BloomFilter, TokenRevocationFilter
+from courses_apps.account.selectors import token_blacklist_stats
+from courses_apps.account.services import token_blacklist_prune
+from courses_apps.account.tokens import PortalRefreshToken
+
+User = get_user_model()
+
+
+class TestBloomFilter(TestCase):
+    def test_added_values_are_members(self):
+        bloom = BloomFilter(capacity=100)
+        values = [str(uuid.uuid4()) for _ in range(100)]
+        for value in values:
+            bloom.add(value)
+
+        self.assertTrue(all(value in bloom for value in values))
+        self.assertEqual(bloom.count, 100)
+
+    def test_false_positive_rate(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for _ in range(1000):
+            bloom.add(str(uuid.uuid4()))
+
+        false_positives = sum(str(uuid.uuid4()) in bloom for _ in range(10000))
+        self.assertLess(false_positives, 300)
+
+
+class TestTokenRevocation(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='tokenuser', email='token@example.com', password='strongpassword1$')
+
+    def test_blacklisted_token_is_rejected(self):
+        token = PortalRefreshToken.for_user(self.user, role_names=[])
+        PortalRefreshToken(str(token))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            token.blacklist()
+
+        with self.assertRaises(TokenError):
+            PortalRefreshToken(str(token))
+
+    def test_valid_token_is_verified_without_queries(self):
+        token = PortalRefreshToken.for_user(self.user, role_names=[])
+        PortalRefreshToken(str(token))
+
+        # only the blacklist version is read, from the shared cache table
+        with self.assertNumQueries(1):
+            PortalRefreshToken(str(token))
+
+    def test_token_blacklisted_elsewhere_is_rejected_once_synced(self):
+        token = PortalRefreshToken.for_user(self.user, role_names=[])
+        PortalRefreshToken(str(token))
+
+        # blacklisted without the signal, e.g. by a bulk insert, nothing is published
+        BlacklistedToken.objects.bulk_create([BlacklistedToken(token=OutstandingToken.objects.get(jti=token['jti']))])
+        PortalRefreshToken(str(token))
+
+        # the version key expires after TOKEN_REVOCATION_SYNC_INTERVAL
+        caches['shared'].delete(TOKEN_BLACKLIST_VERSION_KEY)
+        with self.assertRaises(TokenError):
+            PortalRefreshToken(str(token))
+
+    def test_logout_reaches_other_processes(self):
+        token = PortalRefreshToken.for_user(self.user, role_names=[])
+        access_token = token.access_token
+        # another worker, its filter synced before the logout
+        other_process_filter = TokenRevocationFilter()
+        self.assertFalse(other_process_filter.is_blacklisted(token['jti']))
+
+        self.client.cookies['refresh_token'] = str(token)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('account:logout'), HTTP_AUTHORIZATION=f'Bearer {access_token}')
+        self.assertEqual(response.status_code, 200)
+        # the other worker shares nothing but the shared cache and the database
+        cache.clear()
+
+        self.assertTrue(other_process_filter.is_blacklisted(token['jti']))
+
+
+class TestTokenBlacklistPrune(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tokenuser', email='token@example.com', password='strongpassword1$')
+        now = timezone.now()
+        for index in range(5):
+            expired = index < 3
+            token = OutstandingToken.objects.create(
+                user=self.user,
+                jti=uuid.uuid4().hex,
+                token=f'token-{index}',
+                created_at=now - timedelta(days=30),
+                expires_at=now - timedelta(days=1) if expired else now + timedelta(days=1),
+            )
+            if index % 2 == 0:
+                BlacklistedToken.objects.create(token=token)
+
+    def test_prune_deletes_expired_tokens_in_batches(self):
+        # per batch: savepoint, ids, tokens, blacklist delete, token delete, release,
+        # the short second batch ends the loop
+        with self.assertNumQueries(6 * 2):
+            deleted = token_blacklist_prune(batch_size=2)
+
+        self.assertEqual(deleted, 3)
+        self.assertEqual(OutstandingToken.objects.count(), 2)
+        self.assertFalse(OutstandingToken.objects.filter(expires_at__lt=timezone.now()).exists())
+        self.assertEqual(BlacklistedToken.objects.count(), 1)
+
+    def test_stats(self):
+        stats = token_blacklist_stats()
+
+        self.assertEqual(stats['outstanding_tokens'], 5)
+        self.assertEqual(stats['expired_tokens'], 3)
+        self.assertEqual(stats['blacklisted_tokens'], 3)
@@ -1,7 +1,12 @@
 import unittest
+from django.core.cache import cache, caches
 from django.test import TestCase
 from django.contrib.auth import get_user_model
+from courses_apps.account.models import UserRoles
+from courses_apps.account.selectors import user_role_names_cache_key
 from courses_apps.account.services import user_login
+from courses_apps.learner.models import Learner
+from courses_apps.teacher.models import Teacher
 from rest_framework.exceptions import ValidationError
 
 User = get_user_model()
@@ -15,6 +20,7 @@ class TestUserLogin(TestCase):
         )
         self.user.is_verified = True  # Set is_verified to True
         self.user.save()
+        cache.clear()
 
     def test_user_login_success(self):
         username_or_email = 'testuser'
@@ -55,6 +61,37 @@ class TestUserLogin(TestCase):
 
         self.assertEqual(str(context.exception.detail[0]), "Invalid credentials.")
 
+    def test_user_login_query_count(self):
+        """
+        Login loads the user and profiles in one query, reads the roles from the database
+        and inserts the outstanding token, three queries whether or not the roles are cached.
+        """
+        learner_role, _ = UserRoles.objects.get_or_create(name='learner')
+        self.user.roles.add(learner_role)
+        Learner.objects.create(user=self.user)
+        teacher_user = User.objects.create_user(
+            username='teacheruser', email='teacher@example.com', password='strongpassword1$'
+        )
+        teacher_role, _ = UserRoles.objects.get_or_create(name='teacher')
+        teacher_user.roles.add(teacher_role)
+        Teacher.objects.create(user=teacher_user)
+
+        for username, role in [('testuser', 'learner'), ('teacher@example.com', 'teacher')]:
+            for _ in range(2):
+                with self.assertNumQueries(3):
+                    login_details, _ = user_login(username_or_email=username, password='strongpassword1$')
+                self.assertEqual(login_details.user_type, [role])
+                self.assertFalse(login_details.verification_required)
+
+    def test_user_login_ignores_stale_cached_roles(self):
+        learner_role, _ = UserRoles.objects.get_or_create(name='learner')
+        self.user.roles.add(learner_role)
+        # e.g. a process that missed a role change cached the roles before it
+        caches['shared'].set(user_role_names_cache_key(user_id=self.user.pk), ['teacher'])
+
+        login_details, _ = user_login(username_or_email='testuser', password='strongpassword1$')
+
+        self.assertEqual(login_details.user_type, ['learner'])
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -5,7 +5,8 @@ from rest_framework.views import APIView
 from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from .tokens import ROLES_CLAIM, PortalRefreshToken
 from .services import (
     user_verify, confirmation_email_resend,
     user_login, user_send_forgot_password_email, 
@@ -13,7 +14,7 @@ from .services import (
     profile_picture_change
 )
 from .selectors import (
-    get_user_details, all_profile_pictures_get
+    get_user_details, all_profile_pictures_get, get_user_role_names
 )
 from drf_spectacular.utils import extend_schema
 from django.core.exceptions import ValidationError as DjangoValidationError
@@ -98,7 +99,7 @@ class UserLogoutAPIView(APIView):
         try: 
             # refresh_token = request.COOKIES.get("refresh_token")
             # if refresh_token is not None:
-            refresh = RefreshToken(request.COOKIES.get("refresh_token"))
+            refresh = PortalRefreshToken(request.COOKIES.get("refresh_token"))
             refresh.blacklist()
             response = Response(
                 {
@@ -130,8 +131,13 @@ class RotateAccessTokenAPIView(APIView):
     def get(self, request, *args, **kwargs):
         refresh_token = request.COOKIES.get("refresh_token")
         if refresh_token is not None:
-            refresh = RefreshToken(refresh_token)
-            access_token = str(refresh.access_token)
+            refresh = PortalRefreshToken(refresh_token)
+            access = refresh.access_token
+            # the refresh token's roles claim may be older than the user's current roles
+            access[ROLES_CLAIM] = get_user_role_names(
+                user_id=refresh[jwt_settings.USER_ID_CLAIM], use_cache=False
+            )
+            access_token = str(access)
             return Response(
                 {
                     "success": True,
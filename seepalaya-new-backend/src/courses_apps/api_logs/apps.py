@@ -0,0 +1,7 @@
+from django.apps import AppConfig
+
+
+class ApiLogsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'courses_apps.api_logs'
+    verbose_name = 'API Logs'
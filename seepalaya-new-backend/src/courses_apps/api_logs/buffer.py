@@ -0,0 +1,96 @@
+import atexit
+import logging
+import os
+import threading
+from collections import deque
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from .services import api_log_entries_create
+
+logger = logging.getLogger(__name__)
+
+
+class APILogBuffer:
+    """
+    Collects API log entries in memory and writes them in bulk from a background thread,
+    every API_LOG_FLUSH_INTERVAL seconds or as soon as API_LOG_BATCH_SIZE entries are waiting.
+    Entries beyond API_LOG_BUFFER_MAX_SIZE are dropped and counted, logging never slows
+    a request down. The writer runs no DDL, the day partitions are created ahead by the
+    maintain_api_log_partitions housekeeping job.
+    """
+
+    def __init__(self):
+        self.entries = deque()
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._pid = None
+
+    def add(self, entry: dict) -> None:
+        if len(self.entries) >= settings.API_LOG_BUFFER_MAX_SIZE:
+            self.dropped += 1
+            return
+        self.entries.append(entry)
+        self._start_flusher()
+        if len(self.entries) >= settings.API_LOG_BATCH_SIZE:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """
+        Writes the waiting entries in batches of API_LOG_BATCH_SIZE and returns how many
+        were written.
+        """
+        written = 0
+        while self.entries:
+            batch = []
+            try:
+                while len(batch) < settings.API_LOG_BATCH_SIZE:
+                    batch.append(self.entries.popleft())
+            except IndexError:
+                pass
+            if batch:
+                self._write(batch)
+                written += len(batch)
+        return written
+
+    def _write(self, batch) -> None:
+        try:
+            with transaction.atomic():
+                api_log_entries_create(entries=batch)
+        except IntegrityError:
+            # no partition holds the day of an entry, the housekeeping job has not run
+            self.dropped += len(batch)
+            logger.error(
+                "Dropped %s API logs without a partition, run python manage.py maintain_api_log_partitions.",
+                len(batch),
+            )
+
+    def _start_flusher(self) -> None:
+        # checked per process, a worker forked from a preloaded master does not inherit the thread
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            first_start = self._pid is None
+            self._pid = os.getpid()
+            threading.Thread(target=self._run, name="api-log-flusher", daemon=True).start()
+        if first_start:
+            atexit.register(self._flush_safely)
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait(settings.API_LOG_FLUSH_INTERVAL)
+            self._wakeup.clear()
+            # the thread keeps its own connection, drop it if the database went away
+            close_old_connections()
+            self._flush_safely()
+
+    def _flush_safely(self) -> None:
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Could not write the buffered API logs.")
+
+
+api_log_buffer = APILogBuffer()
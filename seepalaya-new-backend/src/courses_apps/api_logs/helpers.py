@@ -0,0 +1,64 @@
+import json
+import re
+from typing import Iterable
+from django.conf import settings
+
+FILTERED = "***FILTERED***"
+
+
+def get_sample_rate(*, path: str) -> float:
+    """
+    Returns the share of requests to the given path that are logged, from the longest
+    matching API_LOG_SAMPLE_RATES prefix or API_LOG_SAMPLE_RATE.
+    """
+    matches = [prefix for prefix in settings.API_LOG_SAMPLE_RATES if path.startswith(prefix)]
+    if not matches:
+        return settings.API_LOG_SAMPLE_RATE
+    return settings.API_LOG_SAMPLE_RATES[max(matches, key=len)]
+
+
+def mask_sensitive_data(data, *, keys: Iterable[str]):
+    """
+    Replaces the values of the given keys, case insensitive, in nested dicts and lists.
+    """
+    keys = {key.lower() for key in keys}
+    if isinstance(data, dict):
+        return {
+            key: FILTERED if str(key).lower() in keys else mask_sensitive_data(value, keys=keys)
+            for key, value in data.items()
+        }
+    if isinstance(data, list):
+        return [mask_sensitive_data(item, keys=keys) for item in data]
+    return data
+
+
+def mask_sensitive_query_params(url: str, *, keys: Iterable[str]) -> str:
+    """
+    Replaces the values of the given query parameters in a url.
+    """
+    for key in keys:
+        url = re.sub(rf"([?&]{re.escape(key)}=)[^&]*", rf"\g<1>{FILTERED}", url, flags=re.IGNORECASE)
+    return url
+
+
+def encode_data(data, *, keys: Iterable[str]) -> str:
+    """
+    Returns data as stored in the log, masked and indented JSON.
+    """
+    if not data:
+        return ""
+    return json.dumps(mask_sensitive_data(data, keys=keys), indent=4, ensure_ascii=False)
+
+
+def encode_body(raw: bytes, *, keys: Iterable[str]) -> str:
+    """
+    Returns a request or response body as stored in the log, masked JSON when it parses,
+    the raw text otherwise.
+    """
+    if not raw:
+        return ""
+    try:
+        data = json.loads(raw)
+    except ValueError:
+        return raw.decode(errors="replace")
+    return encode_data(data, keys=keys)
@@ -0,0 +1,59 @@
+import statistics
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from django.urls import reverse
+from courses_apps.api_logs.buffer import api_log_buffer
+from courses_apps.api_logs.models import APIRequestLog
+from courses_apps.core.dataset import DatasetSpec, dataset_module_queryset
+
+
+class Command(BaseCommand):
+    """
+    This command measures the request latency of the E-Paath catalog with API logging off,
+    with every request logged and with the configured sampling, over the modules of the
+    generated dataset. The Django test client is used, so no web server has to be
+    running. Run it against a development database, the benchmark requests end up in the logs.
+    running the command:
+        - python manage.py generate_dataset
+        - python manage.py benchmark_api_logging --requests 2000
+    """
+    help = 'Benchmark request latency with API logging on and off'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per scenario')
+        parser.add_argument('--prefix', default=DatasetSpec.prefix, help='Prefix of the generated dataset')
+
+    def handle(self, *args, **kwargs):
+        if not dataset_module_queryset(prefix=kwargs['prefix']).exists():
+            raise CommandError('The benchmark needs the E-Paath modules of a dataset, '
+                               'run python manage.py generate_dataset first.')
+        url = reverse('epaath:module_list')
+        scenarios = [
+            ('logging off', {'API_LOG_ENABLED': False}),
+            ('api_logs, every request', {'API_LOG_ENABLED': True, 'API_LOG_SAMPLE_RATES': {}, 'API_LOG_SAMPLE_RATE': 1.0}),
+            ('api_logs, sampled', {'API_LOG_ENABLED': True}),
+        ]
+
+        for scenario, overrides in scenarios:
+            with override_settings(**overrides):
+                client = Client(HTTP_HOST='localhost')
+                client.get(url)
+                api_log_buffer.flush()
+                logged = APIRequestLog.objects.count()
+                latencies = []
+                for _ in range(kwargs['requests']):
+                    start = time.perf_counter()
+                    client.get(url)
+                    latencies.append(time.perf_counter() - start)
+
+                api_log_buffer.flush()
+                logged = APIRequestLog.objects.count() - logged
+
+            latencies.sort()
+            line = (
+                f"{scenario:<24} mean {statistics.mean(latencies) * 1000:6.3f} ms, "
+                f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:6.3f} ms, "
+                f"{logged} requests written to api_request_logs"
+            )
+            self.stdout.write(line)
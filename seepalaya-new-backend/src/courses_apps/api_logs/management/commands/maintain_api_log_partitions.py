@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from courses_apps.api_logs.services import api_log_partitions_maintain
+
+
+class Command(BaseCommand):
+    """
+    This command creates the API log partitions of today and the next
+    API_LOG_PARTITION_DAYS_AHEAD days and drops the ones older than API_LOG_RETENTION_DAYS.
+    The maintain_api_log_partitions housekeeping job does the same every hour, the command
+    runs on deploy and drops old logs right after lowering the retention.
+    running the command:
+        - python manage.py maintain_api_log_partitions
+    """
+    help = 'Create upcoming and drop expired API log partitions'
+
+    def handle(self, *args, **kwargs):
+        dropped = api_log_partitions_maintain()
+        self.stdout.write(self.style.SUCCESS(
+            f"Dropped {len(dropped)} expired API log partitions: {', '.join(dropped) or '-'}"
+        ))
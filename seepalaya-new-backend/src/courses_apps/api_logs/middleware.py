@@ -0,0 +1,87 @@
+import random
+import time
+from django.conf import settings
+from django.utils import timezone
+from .buffer import api_log_buffer
+from .helpers import get_sample_rate
+
+JSON_CONTENT_TYPES = ("application/json", "application/vnd.api+json")
+
+
+class APILogMiddleware:
+    """
+    Logs API requests without holding them up. The request only decides whether it is
+    logged and hands the raw headers and bodies to the in-process buffer, masking, encoding
+    and the bulk insert happen on the buffer's background thread.
+
+    Requests are sampled by path prefix (API_LOG_SAMPLE_RATES, API_LOG_SAMPLE_RATE).
+    Errors and requests slower than API_LOG_SLOW_REQUEST_MS are always logged.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.API_LOG_ENABLED or request.path_info.startswith(settings.API_LOG_SKIP_PATHS):
+            return self.get_response(request)
+
+        added_on = timezone.now()
+        request_body = self.get_request_body(request)
+        start = time.perf_counter()
+        response = self.get_response(request)
+        execution_time = time.perf_counter() - start
+
+        if not response.get("Content-Type", "").startswith(JSON_CONTENT_TYPES):
+            return response
+
+        if (
+            (settings.API_LOG_ALWAYS_LOG_ERRORS and response.status_code >= 400)
+            or execution_time * 1000 >= settings.API_LOG_SLOW_REQUEST_MS
+        ):
+            sample_rate = 1.0
+        else:
+            sample_rate = get_sample_rate(path=request.path_info)
+            if random.random() >= sample_rate:
+                return response
+
+        api_log_buffer.add({
+            "added_on": added_on,
+            "api": request.get_full_path(),
+            "method": request.method,
+            "status_code": response.status_code,
+            "execution_time": execution_time,
+            "sample_rate": sample_rate,
+            "client_ip_address": self.get_client_ip(request),
+            "headers": {
+                header[5:]: value for header, value in request.META.items() if header.startswith("HTTP_")
+            },
+            "body": request_body,
+            "response": self.get_response_body(response),
+        })
+        return response
+
+    def get_request_body(self, request) -> bytes:
+        """
+        Returns the raw JSON request body, empty when it is not JSON or larger than
+        API_LOG_MAX_BODY_SIZE so uploads are never read into memory for the log.
+        """
+        if not request.content_type.startswith(JSON_CONTENT_TYPES):
+            return b""
+        try:
+            content_length = int(request.META.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            return b""
+        if not content_length or content_length > settings.API_LOG_MAX_BODY_SIZE:
+            return b""
+        return request.body
+
+    def get_response_body(self, response) -> bytes:
+        if getattr(response, "streaming", False) or len(response.content) > settings.API_LOG_MAX_BODY_SIZE:
+            return b""
+        return response.content
+
+    def get_client_ip(self, request) -> str:
+        forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
+        if forwarded_for:
+            return forwarded_for.split(",")[0].strip()
+        return request.META.get("REMOTE_ADDR", "")
@@ -0,0 +1,70 @@
+from django.db import migrations, models
+
+PARTITIONED_TABLE_SQL = """
+CREATE TABLE api_request_logs (
+    id bigint GENERATED BY DEFAULT AS IDENTITY,
+    added_on timestamp with time zone NOT NULL,
+    api varchar(1024) NOT NULL,
+    method varchar(10) NOT NULL,
+    status_code smallint NOT NULL CHECK (status_code >= 0),
+    execution_time double precision NOT NULL,
+    sample_rate double precision NOT NULL,
+    client_ip_address varchar(50) NOT NULL,
+    headers text NOT NULL,
+    body text NOT NULL,
+    response text NOT NULL,
+    PRIMARY KEY (id, added_on)
+) PARTITION BY RANGE (added_on);
+CREATE INDEX api_request_logs_added_on ON api_request_logs (added_on);
+"""
+
+
+def create_table(apps, schema_editor):
+    # the primary key of a partitioned table has to include the partition key, which
+    # django cannot express, so the table is created by hand on postgresql
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(PARTITIONED_TABLE_SQL)
+    else:
+        schema_editor.create_model(apps.get_model("api_logs", "APIRequestLog"))
+
+
+def drop_table(apps, schema_editor):
+    schema_editor.delete_model(apps.get_model("api_logs", "APIRequestLog"))
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name="APIRequestLog",
+                    fields=[
+                        ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                        ("added_on", models.DateTimeField()),
+                        ("api", models.CharField(help_text="API URL", max_length=1024)),
+                        ("method", models.CharField(max_length=10)),
+                        ("status_code", models.PositiveSmallIntegerField(help_text="Response status code")),
+                        ("execution_time", models.FloatField(help_text="Server execution time in seconds")),
+                        ("sample_rate", models.FloatField(help_text="Share of matching requests that were logged, 1 for errors and slow requests")),
+                        ("client_ip_address", models.CharField(max_length=50)),
+                        ("headers", models.TextField()),
+                        ("body", models.TextField()),
+                        ("response", models.TextField()),
+                    ],
+                    options={
+                        "verbose_name": "API Log",
+                        "verbose_name_plural": "API Logs",
+                        "db_table": "api_request_logs",
+                        "ordering": ("-added_on",),
+                        "indexes": [models.Index(fields=["added_on"], name="api_request_logs_added_on")],
+                    },
+                ),
+            ],
+        ),
+        migrations.RunPython(create_table, drop_table),
+    ]
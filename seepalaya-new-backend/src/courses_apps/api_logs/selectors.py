@@ -0,0 +1,44 @@
+from datetime import date, datetime
+from typing import Dict
+from django.db import connection
+from .models import APIRequestLog
+
+PARTITION_DATE_FORMAT = "%Y%m%d"
+
+
+def api_log_partition_name(*, day: date) -> str:
+    """
+    Returns the name of the partition holding the API logs of the given UTC day.
+    """
+    return f"{APIRequestLog._meta.db_table}_p{day.strftime(PARTITION_DATE_FORMAT)}"
+
+
+def api_log_partition_list() -> Dict[date, str]:
+    """
+    Returns the daily partitions of the API log table by day, empty where the table
+    is not partitioned.
+    """
+    if connection.vendor != "postgresql":
+        return {}
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = %s
+            """,
+            [APIRequestLog._meta.db_table],
+        )
+        names = [name for name, in cursor.fetchall()]
+
+    prefix = f"{APIRequestLog._meta.db_table}_p"
+    partitions = {}
+    for name in names:
+        try:
+            day = datetime.strptime(name[len(prefix):], PARTITION_DATE_FORMAT).date()
+        except ValueError:
+            continue
+        partitions[day] = name
+    return partitions
@@ -0,0 +1,59 @@
+from datetime import date, datetime, time, timedelta, timezone
+from django.db import connection
+from django.test import TestCase, override_settings
+from courses_apps.api_logs.models import APIRequestLog
+from courses_apps.api_logs.selectors import api_log_partition_list
+from courses_apps.api_logs.services import (
+    api_log_entries_create, api_log_partitions_drop_expired, api_log_partitions_ensure
+)
+
+TODAY = date(2026, 3, 31)
+
+
+def log_entry(day):
+    return {
+        'added_on': datetime.combine(day, time(12), tzinfo=timezone.utc),
+        'api': '/epaath/modules/?token=abc&grade=1',
+        'method': 'GET',
+        'status_code': 200,
+        'execution_time': 0.01,
+        'sample_rate': 0.5,
+        'client_ip_address': '127.0.0.1',
+        'headers': {},
+        'body': b'',
+        'response': b'not json',
+    }
+
+
+@override_settings(API_LOG_RETENTION_DAYS=30)
+class APILogPartitionsTestCase(TestCase):
+    def setUp(self):
+        self.expired_day = TODAY - timedelta(days=31)
+        self.kept_day = TODAY - timedelta(days=30)
+        api_log_partitions_ensure(days=[self.expired_day, self.kept_day, TODAY])
+        api_log_entries_create(entries=[log_entry(self.expired_day), log_entry(self.kept_day), log_entry(TODAY)])
+
+    def test_entries_are_written_and_masked(self):
+        log = APIRequestLog.objects.get(added_on__date=TODAY)
+        self.assertEqual(log.api, '/epaath/modules/?token=***FILTERED***&grade=1')
+        self.assertEqual(log.response, 'not json')
+        self.assertEqual(log.body, '')
+
+    def test_partitions_are_created_once(self):
+        if connection.vendor != 'postgresql':
+            self.skipTest('API logs are only partitioned on PostgreSQL')
+        api_log_partitions_ensure(days=[TODAY])
+        self.assertEqual(
+            set(api_log_partition_list()) & {self.expired_day, self.kept_day, TODAY},
+            {self.expired_day, self.kept_day, TODAY},
+        )
+
+    def test_expired_logs_are_dropped(self):
+        api_log_partitions_drop_expired(today=TODAY)
+
+        self.assertEqual(
+            sorted(log.added_on.date() for log in APIRequestLog.objects.all()),
+            [self.kept_day, TODAY],
+        )
+        if connection.vendor == 'postgresql':
+            self.assertNotIn(self.expired_day, api_log_partition_list())
@@ -0,0 +1,83 @@
+import json
+from unittest.mock import patch
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from courses_apps.api_logs.buffer import api_log_buffer
+from courses_apps.api_logs.helpers import FILTERED
+from courses_apps.api_logs.models import APIRequestLog
+from courses_apps.api_logs.services import api_log_partitions_maintain
+
+
+# entries are flushed by the tests, not by the background writer
+@patch('courses_apps.api_logs.buffer.APILogBuffer._start_flusher')
+@override_settings(API_LOG_ENABLED=True, API_LOG_SAMPLE_RATE=1.0, API_LOG_SAMPLE_RATES={}, API_LOG_SLOW_REQUEST_MS=10000)
+class APILogMiddlewareTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        api_log_buffer.entries.clear()
+        api_log_partitions_maintain()
+        self.catalog_url = reverse('epaath:module_list')
+
+    def test_request_is_logged_in_bulk_with_sensitive_data_masked(self, mock_start_flusher):
+        response = self.client.post(
+            reverse('account:login'),
+            {'username_or_email': 'nobody@gmail.com', 'password': 'secret@123'},
+            format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.assertEqual(api_log_buffer.flush(), 1)
+        log = APIRequestLog.objects.get()
+        self.assertEqual(log.api, reverse('account:login'))
+        self.assertEqual(log.method, 'POST')
+        self.assertEqual(log.status_code, 401)
+        self.assertEqual(log.sample_rate, 1.0)
+        self.assertEqual(json.loads(log.body), {'username_or_email': 'nobody@gmail.com', 'password': FILTERED})
+        self.assertFalse(json.loads(log.response)['success'])
+
+    def test_authorization_header_is_masked(self, mock_start_flusher):
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer secret-token')
+        self.client.get(self.catalog_url)
+
+        api_log_buffer.flush()
+        self.assertEqual(json.loads(APIRequestLog.objects.get().headers)['AUTHORIZATION'], FILTERED)
+
+    def test_sampled_out_request_is_not_logged(self, mock_start_flusher):
+        with override_settings(API_LOG_SAMPLE_RATES={'/epaath/': 0.0}):
+            response = self.client.get(self.catalog_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(api_log_buffer.entries), 0)
+
+    def test_errors_and_slow_requests_bypass_sampling(self, mock_start_flusher):
+        with override_settings(API_LOG_SAMPLE_RATES={'/epaath/': 0.0}):
+            self.client.get(self.catalog_url, {'grade': 'not-a-uuid'})
+            with override_settings(API_LOG_SLOW_REQUEST_MS=0):
+                self.client.get(self.catalog_url)
+
+        self.assertEqual(
+            [(entry['status_code'], entry['sample_rate']) for entry in api_log_buffer.entries],
+            [(400, 1.0), (200, 1.0)],
+        )
+
+    def test_longest_sample_rate_prefix_wins(self, mock_start_flusher):
+        with override_settings(API_LOG_SAMPLE_RATES={'/epaath/': 1.0, '/epaath/modules/': 0.0}):
+            self.client.get(self.catalog_url)
+        self.assertEqual(len(api_log_buffer.entries), 0)
+
+    def test_disabled_logging_and_skipped_paths(self, mock_start_flusher):
+        with override_settings(API_LOG_ENABLED=False):
+            self.client.get(self.catalog_url)
+        with override_settings(API_LOG_SKIP_PATHS=('/epaath/',)):
+            self.client.get(self.catalog_url)
+        self.assertEqual(len(api_log_buffer.entries), 0)
+
+    def test_full_buffer_drops_entries(self, mock_start_flusher):
+        dropped = api_log_buffer.dropped
+        with override_settings(API_LOG_BUFFER_MAX_SIZE=1):
+            self.client.get(self.catalog_url)
+            self.client.get(self.catalog_url)
+        self.assertEqual(len(api_log_buffer.entries), 1)
+        self.assertEqual(api_log_buffer.dropped, dropped + 1)
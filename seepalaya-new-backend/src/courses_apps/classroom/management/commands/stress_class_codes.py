@@ -0,0 +1,87 @@
+import logging
+import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from courses_apps.classroom.helpers import CLASS_CODE_LENGTH
+from courses_apps.classroom.models import ClassRoom
+from courses_apps.classroom.services import create_classroom
+from courses_apps.core.dataset import DatasetSpec, dataset_user_queryset
+from courses_apps.teacher.models import Teacher
+
+
+class CollisionCounter(logging.Handler):
+    def __init__(self):
+        super().__init__(level=logging.WARNING)
+        self.count = 0
+
+    def emit(self, record):
+        self.count += 1
+
+
+class Command(BaseCommand):
+    """
+    This command creates classrooms from many threads at once and checks that every one of
+    them got its own class code, among the classrooms of the generated dataset. Collisions
+    are retried by create_classroom; a shorter --code-length makes them frequent enough to
+    exercise that path. The classrooms are created for a teacher of the dataset and are
+    committed, since the threads use separate connections, and deleted afterwards.
+    running the command:
+        - python manage.py generate_dataset --classrooms 50000
+        - python manage.py stress_class_codes --classrooms 100000 --workers 16
+        - python manage.py stress_class_codes --classrooms 100000 --workers 16 --code-length 4
+    """
+    help = 'Create classrooms concurrently and check their class codes for collisions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--classrooms', type=int, default=100000, help='Classrooms to create')
+        parser.add_argument('--workers', type=int, default=16, help='Threads creating classrooms')
+        parser.add_argument('--code-length', type=int, default=CLASS_CODE_LENGTH,
+                            help='Class code length, shorter codes collide more often')
+        parser.add_argument('--prefix', default=DatasetSpec.prefix, help='Prefix of the generated dataset')
+
+    def handle(self, *args, **kwargs):
+        classrooms, workers = kwargs['classrooms'], kwargs['workers']
+        teacher = Teacher.objects.filter(
+            user__in=dataset_user_queryset(prefix=kwargs['prefix'], kind='teacher')
+        ).order_by('pk').first()
+        if teacher is None:
+            raise CommandError('No dataset teacher found, run python manage.py generate_dataset first.')
+        title = f'Stress Classroom {secrets.token_hex(3)}'
+
+        def create_all(count):
+            try:
+                for i in range(count):
+                    create_classroom(title=f'{title} {i}', teacher=teacher, code_length=kwargs['code_length'])
+            finally:
+                connection.close()
+            return count
+
+        collisions = CollisionCounter()
+        services_logger = logging.getLogger('courses_apps.classroom.services')
+        services_logger.addHandler(collisions)
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                start = time.perf_counter()
+                created = sum(executor.map(
+                    create_all, [classrooms // workers + (i < classrooms % workers) for i in range(workers)]
+                ))
+                elapsed = time.perf_counter() - start
+
+            stored = ClassRoom.objects.filter(teacher=teacher, title__startswith=title)
+            duplicated = (
+                ClassRoom.objects.values('class_code').annotate(count=Count('pk')).filter(count__gt=1).count()
+            )
+            self.stdout.write(
+                f'{created} classrooms in {elapsed:.1f} s ({created / elapsed:.0f}/second) by {workers} workers, '
+                f'{stored.count()} stored, {collisions.count} collisions retried, {duplicated} duplicated codes'
+            )
+            if stored.count() != classrooms or duplicated:
+                self.stderr.write(self.style.ERROR('class codes collided'))
+            else:
+                self.stdout.write(self.style.SUCCESS('every classroom got its own class code'))
+        finally:
+            services_logger.removeHandler(collisions)
+            ClassRoom.objects.filter(teacher=teacher, title__startswith=title).delete()
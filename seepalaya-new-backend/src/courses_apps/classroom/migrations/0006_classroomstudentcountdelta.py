@@ -0,0 +1,28 @@
+# Generated by Django 4.2 on 2026-10-18 17:37
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('classroom', '0005_classroom_student_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClassRoomStudentCountDelta',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('delta', models.IntegerField()),
+                ('created_date', models.DateTimeField(default=django.utils.timezone.now)),
+                ('classroom', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='classroom.classroom')),
+            ],
+            options={
+                'verbose_name': 'Class Student Count Delta',
+                'verbose_name_plural': 'Class Student Count Deltas',
+            },
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from config.model_mixins import IdentifierTimeStampAbstractModel
 from courses_apps.learner.models import PortalUser
 from courses_apps.teacher.models import Teacher
@@ -9,6 +10,9 @@ from config.validators import validate_class_room_name
 
 User = get_user_model()
 
+# written only with F() updates, see ClassRoom.save
+COUNTER_FIELDS = ('student_count', 'last_activity')
+
 class ClassRoom(IdentifierTimeStampAbstractModel):
     title = models.CharField(
         max_length=255, 
@@ -20,12 +24,45 @@ class ClassRoom(IdentifierTimeStampAbstractModel):
     class_code = models.CharField(max_length=10, unique=True)
     teacher = models.ForeignKey(Teacher, on_delete=models.SET_NULL, null=True)
     students = models.ManyToManyField(User, related_name='classes')
+    # with the pending ClassRoomStudentCountDelta rows, the number of students, see
+    # classroom_student_count_expression and classroom_student_count_deltas_fold
+    student_count = models.PositiveIntegerField(default=0, editable=False)
+    last_activity = models.DateTimeField(null=True, blank=True, editable=False)
 
     def __str__(self):
         return self.title
+
+    def save(self, *args, **kwargs):
+        # a classroom loaded before a membership change holds stale counters, saving it
+        # must not write them back over the maintained ones
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
     
     class Meta:
         verbose_name = _('Class')
         verbose_name_plural = _('Classes')
-    
+        indexes = [
+            models.Index(fields=['teacher', '-student_count'], name='classroom_teacher_count'),
+        ]
 
+
+class ClassRoomStudentCountDelta(models.Model):
+    """
+    A change to the number of students of a classroom, recorded by every membership
+    change instead of an update of the classroom row, so the students joining a classroom
+    at once never wait on each other. Folded into ClassRoom.student_count and
+    last_activity by the fold_classroom_student_counts housekeeping job.
+    """
+    id = models.BigAutoField(primary_key=True)
+    # no constraint, the rows of a deleted classroom are dropped by the next fold
+    classroom = models.ForeignKey(ClassRoom, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    delta = models.IntegerField()
+    created_date = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = _('Class Student Count Delta')
+        verbose_name_plural = _('Class Student Count Deltas')
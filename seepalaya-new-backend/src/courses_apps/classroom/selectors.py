@@ -1,7 +1,13 @@
-from courses_apps.classroom.models import ClassRoom
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from django.conf import settings
+from django.core.cache import caches
+from courses_apps.classroom.models import ClassRoom, ClassRoomStudentCountDelta
 from django.core.exceptions import ValidationError as DjangoValidationError
 from django.utils.translation import gettext as _
-from django.db.models import F, Count
+from django.db.models import F, Count, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from courses_apps.core.pagination import keyset_paginate, queryset_count_estimate
 from courses_apps.teacher.selectors import teacher_get_from_user
 from django.contrib.auth import get_user_model
 
@@ -17,6 +23,54 @@ def get_classroom_from_code(*, class_code: str) -> ClassRoom:
         classroom = None
     return classroom
 
+def classroom_student_count_expression():
+    """
+    Returns an expression of the number of students of the classroom: its student_count
+    plus the changes recorded since the last fold (see ClassRoomStudentCountDelta).
+    """
+    pending = (
+        ClassRoomStudentCountDelta.objects.filter(classroom_id=OuterRef("pk"))
+        .order_by().values("classroom_id").annotate(total=Sum("delta")).values("total")
+    )
+    return F("student_count") + Coalesce(Subquery(pending), 0)
+
+
+def classroom_student_count_get(*, classroom_id: int) -> int:
+    """
+    Returns the number of students of the classroom with the given primary key.
+    """
+    return (
+        ClassRoom.objects.filter(pk=classroom_id)
+        .annotate(current_student_count=classroom_student_count_expression())
+        .values_list("current_student_count", flat=True)
+        .first()
+    ) or 0
+
+def classroom_code_cache_key(*, class_code: str) -> str:
+    """
+    Returns the cache key holding the primary key and title of the classroom with the given code.
+    """
+    return f"classroom:code:{class_code}"
+
+
+def get_classroom_id_and_title_from_code(*, class_code: str) -> Optional[Tuple[int, str]]:
+    """
+    Returns the primary key and title of the classroom with the given class_code, from
+    the shared cache when present, or None if it does not exist. Everyone joining a
+    projected class code resolves it within seconds, so only the first of them reads the
+    classroom. The entry is dropped in every process when the classroom is saved or
+    deleted (see signals.py).
+    """
+    cache = caches["shared"]
+    cache_key = classroom_code_cache_key(class_code=class_code)
+    details = cache.get(cache_key)
+    if details is None:
+        details = ClassRoom.objects.filter(class_code=class_code).values_list("pk", "title").first()
+        if details is None:
+            return None
+        cache.set(cache_key, details, timeout=settings.CLASSROOM_CODE_CACHE_TIMEOUT)
+    return tuple(details)
+
 def get_class_room_name_from_class_code(class_code: str) -> str:
     """
     Returns the name of a class room from the given class code.
@@ -26,41 +80,60 @@ def get_class_room_name_from_class_code(class_code: str) -> str:
         raise DjangoValidationError(_("Classroom does not exist."))
     return classroom.title
 
-# def get_classroom_students(*, class_code: str) -> list:
-#     """
-#     Returns a list of students associated with a given class_code.
-#     """
-#     classroom = get_classroom_from_code(class_code=class_code)
-#     if classroom is None:
-#         raise DjangoValidationError(_("Classroom does not exist."))
-#     return classroom.students.all()
+@dataclass
+class ClassroomStudentPage:
+    students: List[Dict[str, Any]]
+    next_cursor: Optional[str]
+    # None on the pages after the first, the client keeps the first page's count
+    count: Optional[int]
+    count_is_estimate: bool
 
 
-def get_classroom_students(*, class_code: str, search_query: str = '', sort_order: str = 'asc', teacher_user: User) -> list:
+def get_classroom_students(
+    *,
+    class_code: str,
+    search_query: str = '',
+    sort_order: str = 'asc',
+    teacher_user: User,
+    cursor: Optional[str] = None,
+    page_size: int = 50,
+) -> ClassroomStudentPage:
     """
-    Returns a list of students associated with a given class_code,
-    optionally filtered by search_query and sorted by full_name.
+    Returns a page of the students associated with a given class_code,
+    optionally filtered by search_query on the full name or username and sorted by full_name.
+    The teacher's ownership of the classroom is part of the same query. The classroom is
+    only looked up on an empty page, to tell a missing or foreign classroom from an empty one.
     """
-    classroom = get_classroom_from_code(class_code=class_code)
-    if classroom is None:
-        raise DjangoValidationError(_("Classroom does not exist."))
-    
-    teacher = teacher_get_from_user(user=teacher_user)
-    if classroom.teacher != teacher:
-        raise DjangoValidationError(_("Teacher is not the owner of the classroom."))
+    students = User.objects.filter(classes__class_code=class_code, classes__teacher__user=teacher_user)
+    if search_query:
+        # served by the trigram indexes on PostgreSQL, see account migration 0010
+        students = students.filter(Q(full_name__icontains=search_query) | Q(username__icontains=search_query))
+    students = students.annotate(sort_name=Coalesce('full_name', Value(''))).values(
+        'id', 'sort_name', 'full_name', 'username'
+    )
 
-    students = classroom.students.all()
+    rows, next_cursor = keyset_paginate(
+        students, fields=['sort_name', 'id'], cursor=cursor, page_size=page_size,
+        descending=sort_order == 'desc',
+    )
 
-    if search_query:
-        students = students.filter(full_name__icontains=search_query)
+    if not rows:
+        classroom = get_classroom_from_code(class_code=class_code)
+        if classroom is None:
+            raise DjangoValidationError(_("Classroom does not exist."))
+        if classroom.teacher is None or classroom.teacher.user_id != teacher_user.pk:
+            raise DjangoValidationError(_("Teacher is not the owner of the classroom."))
 
-    # Apply sorting
-    if sort_order == 'asc':
-        students = students.order_by('full_name')
-    else:
-        students = students.order_by('-full_name')
+    count, count_is_estimate = None, False
+    if not cursor:
+        if next_cursor is None:
+            count = len(rows)
+        else:
+            count, count_is_estimate = queryset_count_estimate(students)
 
-    return students
+    return ClassroomStudentPage(
+        students=rows, next_cursor=next_cursor, count=count, count_is_estimate=count_is_estimate
+    )
 
 def get_classroom_details(*, class_code: str, teacher_user: User) -> dict:
     """
@@ -70,17 +143,18 @@ def get_classroom_details(*, class_code: str, teacher_user: User) -> dict:
     if not teacher:
         raise DjangoValidationError(_("Teacher does not exist."))
 
-    classroom = get_classroom_from_code(class_code=class_code)
+    classroom = (
+        ClassRoom.objects.annotate(current_student_count=classroom_student_count_expression())
+        .filter(class_code=class_code).first()
+    )
     if classroom is None:
         raise DjangoValidationError(_("Classroom does not exist."))
     
     if classroom.teacher != teacher:
         raise DjangoValidationError(_("Teacher is not the owner of the classroom."))
 
-    student_count = classroom.students.count()
-
     return {
         "title": classroom.title,
         "class_code": classroom.class_code,
-        "student_count": student_count,
+        "student_count": classroom.current_student_count,
     }
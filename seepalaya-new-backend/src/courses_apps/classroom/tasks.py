@@ -4,6 +4,8 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Student credentials are no longer written to disk, the task is kept for the files
+# and queued deletions left by earlier releases.
 @shared_task(name='delete_student_detail_csv')
 def delete_student_detail_csv(file_path):
     try:
@@ -0,0 +1,92 @@
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import connection
+from django.test import TestCase
+from rest_framework.exceptions import ValidationError
+from courses_apps.classroom.models import ClassRoom
+from courses_apps.classroom.selectors import get_classroom_students
+from courses_apps.teacher.models import Teacher
+
+User = get_user_model()
+
+
+class TestGetClassroomStudents(TestCase):
+    def setUp(self):
+        self.teacher_user = User.objects.create_user(username='teacher', email='teacher@example.com', password='x')
+        self.teacher = Teacher.objects.create(user=self.teacher_user)
+        self.classroom = ClassRoom.objects.create(title='Test Classroom', class_code='TC123', teacher=self.teacher)
+        self.students = User.objects.bulk_create([
+            User(username=f'student{i:02}', email=f'student{i:02}@example.com', full_name=f'Student {name}')
+            for i, name in enumerate(['Asha', 'Bikash', 'Chandra', 'Deepa', 'Esha', 'Asmita', 'Bishnu'])
+        ])
+        self.classroom.students.add(*self.students)
+        other_classroom = ClassRoom.objects.create(title='Other Classroom', class_code='OC123', teacher=self.teacher)
+        other_classroom.students.add(User.objects.create_user(username='other', email='other@example.com', password='x'))
+
+    def test_pages_follow_the_name_order(self):
+        names, cursor = [], None
+        while True:
+            page = get_classroom_students(
+                class_code='TC123', teacher_user=self.teacher_user, cursor=cursor, page_size=3
+            )
+            names += [student['full_name'] for student in page.students]
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+        self.assertEqual(names, sorted(student.full_name for student in self.students))
+
+    def test_descending_order(self):
+        page = get_classroom_students(class_code='TC123', teacher_user=self.teacher_user, sort_order='desc', page_size=2)
+        next_page = get_classroom_students(
+            class_code='TC123', teacher_user=self.teacher_user, sort_order='desc', page_size=2, cursor=page.next_cursor
+        )
+
+        self.assertEqual(
+            [student['full_name'] for student in page.students + next_page.students],
+            ['Student Esha', 'Student Deepa', 'Student Chandra', 'Student Bishnu'],
+        )
+
+    def test_first_page_carries_the_count(self):
+        page = get_classroom_students(class_code='TC123', teacher_user=self.teacher_user, page_size=3)
+        next_page = get_classroom_students(
+            class_code='TC123', teacher_user=self.teacher_user, page_size=3, cursor=page.next_cursor
+        )
+
+        self.assertEqual((page.count, page.count_is_estimate), (7, False))
+        self.assertIsNone(next_page.count)
+
+    def test_search_by_name_or_username(self):
+        page = get_classroom_students(class_code='TC123', teacher_user=self.teacher_user, search_query='asm')
+        self.assertEqual([student['full_name'] for student in page.students], ['Student Asmita'])
+
+        page = get_classroom_students(class_code='TC123', teacher_user=self.teacher_user, search_query='student03')
+        self.assertEqual([student['username'] for student in page.students], ['student03'])
+
+    def test_single_query_page(self):
+        with self.assertNumQueries(1):
+            get_classroom_students(class_code='TC123', teacher_user=self.teacher_user, search_query='bi')
+
+    def test_other_teacher_is_rejected(self):
+        other_teacher_user = User.objects.create_user(username='teacher2', email='teacher2@example.com', password='x')
+        Teacher.objects.create(user=other_teacher_user)
+
+        with self.assertRaisesMessage(DjangoValidationError, 'Teacher is not the owner of the classroom.'):
+            get_classroom_students(class_code='TC123', teacher_user=other_teacher_user)
+        with self.assertRaisesMessage(DjangoValidationError, 'Classroom does not exist.'):
+            get_classroom_students(class_code='MISSING', teacher_user=self.teacher_user)
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(ValidationError):
+            get_classroom_students(class_code='TC123', teacher_user=self.teacher_user, cursor='not-a-cursor')
+
+    def test_trigram_indexes(self):
+        if connection.vendor != 'postgresql':
+            self.skipTest('pg_trgm is PostgreSQL only')
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+            if cursor.fetchone() is None:
+                self.skipTest('pg_trgm is not available on this server')
+            cursor.execute("SELECT indexname FROM pg_indexes WHERE tablename = 'account_portaluser'")
+            indexes = {name for name, in cursor.fetchall()}
+        self.assertLessEqual({'account_portaluser_full_name_trgm', 'account_portaluser_username_trgm'}, indexes)
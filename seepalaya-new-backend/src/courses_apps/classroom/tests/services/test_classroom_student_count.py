@@ -0,0 +1,156 @@
+from io import StringIO
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from courses_apps.account.models import PortalUser, UserRoles
+from courses_apps.classroom.models import ClassRoom, ClassRoomStudentCountDelta
+from courses_apps.classroom.selectors import classroom_student_count_get
+from courses_apps.classroom.services import (
+    add_students_to_classroom, classroom_student_count_deltas_fold, classroom_student_counts_reconcile,
+    join_classroom, remove_students_from_classroom, student_create,
+)
+from courses_apps.teacher.models import Teacher
+from courses_apps.teacher.selectors import get_teacher_classroom_list
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class ClassroomStudentCountTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.teacher_user = PortalUser.objects.create_user(
+            username="teacher1", email="teacher1@example.com", password="password", full_name="John Doe",
+        )
+        self.teacher = Teacher.objects.create(user=self.teacher_user)
+        UserRoles.objects.create(name="learner")
+        self.classroom = ClassRoom.objects.create(title="Test Classroom", class_code="TC123", teacher=self.teacher)
+        self.other_classroom = ClassRoom.objects.create(title="Other Classroom", class_code="OC123", teacher=self.teacher)
+        self.students = [
+            PortalUser.objects.create_user(username=f"student{i}", email=f"student{i}@example.com", password="password")
+            for i in range(3)
+        ]
+
+    def assertStudentCount(self, classroom, expected):
+        self.assertEqual(classroom_student_count_get(classroom_id=classroom.pk), expected)
+        self.assertEqual(classroom.students.count(), expected)
+
+    def test_forward_membership_changes(self):
+        self.classroom.students.add(*self.students)
+        self.assertStudentCount(self.classroom, 3)
+
+        # adding an existing member again does not count twice
+        self.classroom.students.add(self.students[0])
+        self.assertStudentCount(self.classroom, 3)
+
+        # removing a non member does not count
+        self.other_classroom.students.add(self.students[0])
+        self.classroom.students.remove(self.students[0])
+        self.classroom.students.remove(self.students[0])
+        self.assertStudentCount(self.classroom, 2)
+
+        self.classroom.students.clear()
+        self.assertStudentCount(self.classroom, 0)
+        self.assertStudentCount(self.other_classroom, 1)
+
+    def test_reverse_membership_changes(self):
+        student = self.students[0]
+        student.classes.add(self.classroom, self.other_classroom)
+        self.assertStudentCount(self.classroom, 1)
+        self.assertStudentCount(self.other_classroom, 1)
+
+        student.classes.remove(self.classroom)
+        self.assertStudentCount(self.classroom, 0)
+        self.assertStudentCount(self.other_classroom, 1)
+
+        student.classes.clear()
+        self.assertStudentCount(self.other_classroom, 0)
+
+    def test_membership_changes_do_not_write_the_classroom(self):
+        join_classroom(class_code="TC123", user=self.students[0])
+        self.classroom.students.add(self.students[1])
+        self.classroom.students.remove(self.students[0])
+
+        self.assertEqual(ClassRoom.objects.get(pk=self.classroom.pk).student_count, 0)
+        self.assertStudentCount(self.classroom, 1)
+
+    def test_fold(self):
+        self.classroom.students.add(*self.students)
+        self.other_classroom.students.add(self.students[0])
+        self.classroom.students.remove(self.students[1])
+
+        self.assertEqual(classroom_student_count_deltas_fold(batch_size=2), 3)
+
+        self.assertFalse(ClassRoomStudentCountDelta.objects.exists())
+        self.classroom.refresh_from_db()
+        self.assertEqual(self.classroom.student_count, 2)
+        self.assertIsNotNone(self.classroom.last_activity)
+        self.assertStudentCount(self.classroom, 2)
+        self.assertStudentCount(self.other_classroom, 1)
+
+    def test_saving_a_stale_classroom_keeps_the_counter(self):
+        stale_classroom = ClassRoom.objects.get(pk=self.classroom.pk)
+        self.classroom.students.add(*self.students)
+        classroom_student_count_deltas_fold(batch_size=100)
+
+        stale_classroom.title = "Renamed Classroom"
+        stale_classroom.save()
+
+        self.classroom.refresh_from_db()
+        self.assertEqual(self.classroom.student_count, 3)
+        self.assertEqual(self.classroom.title, "Renamed Classroom")
+
+    def test_deleted_student(self):
+        self.classroom.students.add(*self.students)
+        self.other_classroom.students.add(self.students[0])
+
+        self.students[0].delete()
+
+        self.assertStudentCount(self.classroom, 2)
+        self.assertStudentCount(self.other_classroom, 0)
+
+    def test_membership_services(self):
+        self.teacher.students.add(*self.students)
+        join_classroom(class_code="TC123", user=self.students[0])
+        add_students_to_classroom(class_code="TC123", students=["student1", "student2"], teacher_user="teacher1")
+        self.assertStudentCount(self.classroom, 3)
+
+        remove_students_from_classroom(class_code="TC123", students=["student0"], teacher_user="teacher1")
+        self.assertStudentCount(self.classroom, 2)
+
+        student_create(class_code="TC123", students=["Student One", "Student Two"], teacher_user="teacher1")
+        self.assertStudentCount(self.classroom, 4)
+
+    def test_teacher_classroom_list_reads_the_counter(self):
+        self.classroom.students.add(*self.students)
+        self.other_classroom.students.add(self.students[0])
+
+        with self.assertNumQueries(2):
+            classrooms = get_teacher_classroom_list(exclude="", teacher_user=self.teacher_user)
+
+        self.assertEqual(
+            [(classroom["classroom_code"], classroom["student_count"]) for classroom in classrooms],
+            [("TC123", 3), ("OC123", 1)],
+        )
+
+    def test_reconcile(self):
+        self.classroom.students.add(*self.students)
+        classroom_student_count_deltas_fold(batch_size=100)
+        ClassRoom.objects.filter(pk=self.classroom.pk).update(student_count=7)
+        ClassRoom.students.through.objects.create(classroom=self.other_classroom, portaluser=self.students[0])
+
+        self.assertEqual(
+            classroom_student_counts_reconcile(dry_run=True), [("OC123", 0, 1), ("TC123", 7, 3)]
+        )
+        self.assertEqual(ClassRoom.objects.get(pk=self.classroom.pk).student_count, 7)
+        # a change not folded yet is not undone
+        self.classroom.students.remove(self.students[2])
+
+        out = StringIO()
+        call_command("reconcile_classroom_student_counts", stdout=out)
+
+        self.assertIn("2 classroom counts repaired.", out.getvalue())
+        self.assertStudentCount(self.classroom, 2)
+        self.assertStudentCount(self.other_classroom, 1)
+        self.assertEqual(classroom_student_counts_reconcile(), [])
+        classroom_student_count_deltas_fold(batch_size=100)
+        self.assertEqual(ClassRoom.objects.get(pk=self.classroom.pk).student_count, 2)
@@ -0,0 +1,70 @@
+from unittest.mock import patch
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from courses_apps.account.models import PortalUser
+from courses_apps.classroom.helpers import CLASS_CODE_CHARACTERS, CLASS_CODE_LENGTH
+from courses_apps.classroom.models import ClassRoom
+from courses_apps.classroom.services import CLASS_CODE_ATTEMPTS, create_classroom
+from courses_apps.teacher.models import Teacher
+
+
+class CreateClassroomServiceTestCase(TestCase):
+
+    def setUp(self):
+        teacher_user = PortalUser.objects.create_user(
+            username="teacher1", email="teacher1@example.com", password="password", full_name="John Doe",
+        )
+        self.teacher = Teacher.objects.create(user=teacher_user)
+        ClassRoom.objects.create(title="Taken Classroom", class_code="TAKEN1234", teacher=self.teacher)
+
+    def test_class_code_is_not_checked_before_the_insert(self):
+        with CaptureQueriesContext(connection) as queries:
+            classroom = create_classroom(title="Test Classroom", teacher=self.teacher)
+
+        self.assertEqual(len(classroom.class_code), CLASS_CODE_LENGTH)
+        self.assertTrue(set(classroom.class_code) <= set(CLASS_CODE_CHARACTERS))
+        self.assertFalse([query for query in queries if query["sql"].startswith("SELECT") and "class_code" in query["sql"]])
+        self.assertTrue(ClassRoom.objects.filter(class_code=classroom.class_code, title="Test Classroom").exists())
+
+    def test_collision_draws_another_code(self):
+        with patch("courses_apps.classroom.services.generate_class_code", side_effect=["TAKEN1234", "FRESH1234"]):
+            classroom = create_classroom(title="Test Classroom", teacher=self.teacher)
+
+        self.assertEqual(classroom.class_code, "FRESH1234")
+        self.assertEqual(ClassRoom.objects.filter(teacher=self.teacher).count(), 2)
+
+    def test_gives_up_after_repeated_collisions(self):
+        with patch("courses_apps.classroom.services.generate_class_code", return_value="TAKEN1234") as generate:
+            with self.assertRaises(ValidationError):
+                create_classroom(title="Test Classroom", teacher=self.teacher)
+
+        self.assertEqual(generate.call_count, CLASS_CODE_ATTEMPTS)
+        self.assertEqual(ClassRoom.objects.filter(teacher=self.teacher).count(), 1)
+
+    def test_short_codes_collide_and_are_retried(self):
+        # 30 codes drawn from 36 one-character codes are all but certain to collide
+        with self.assertLogs("courses_apps.classroom.services", "WARNING") as logs:
+            for index in range(30):
+                try:
+                    create_classroom(title=f"Test Classroom {index}", teacher=self.teacher, code_length=1)
+                except ValidationError:
+                    # every attempt hit a taken code, there are few left
+                    pass
+
+        self.assertTrue(logs.output)
+        codes = ClassRoom.objects.exclude(class_code="TAKEN1234").values_list("class_code", flat=True)
+        self.assertTrue(codes)
+        self.assertTrue(all(len(code) == 1 for code in codes))
+
+    def test_other_integrity_errors_are_raised(self):
+        with patch.object(ClassRoom, "save", side_effect=IntegrityError("NOT NULL constraint failed")) as save:
+            with self.assertRaises(IntegrityError):
+                create_classroom(title="Test Classroom", teacher=self.teacher)
+
+        self.assertEqual(save.call_count, 1)
+
+    def test_invalid_title(self):
+        with self.assertRaises(ValidationError):
+            create_classroom(title="Abc", teacher=self.teacher)
@@ -0,0 +1,55 @@
+from django.core import signing
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from courses_apps.classroom.services import (
+    CREDENTIAL_SHEET_SALT, credential_sheet_cache_key, credential_sheet_create, credential_sheet_pop,
+)
+
+
+def make_students(count):
+    return [
+        {'username': f'student{i}', 'full_name': f'Student {i}', 'password': f'password{i}'}
+        for i in range(count)
+    ]
+
+
+class TestCredentialSheet(TestCase):
+    def test_sheet_is_returned_once(self):
+        token = credential_sheet_create(students=make_students(1000))
+
+        rows = credential_sheet_pop(token=token)
+
+        self.assertEqual(len(rows), 1000)
+        self.assertEqual(rows[999], ['student999', 'Student 999', 'password999'])
+        self.assertIsNone(credential_sheet_pop(token=token))
+
+    def test_record_is_encrypted(self):
+        token = credential_sheet_create(students=make_students(1))
+        sheet_id = signing.loads(token, salt=CREDENTIAL_SHEET_SALT)['id']
+
+        record = caches['credentials'].get(credential_sheet_cache_key(sheet_id=sheet_id))
+
+        self.assertNotIn(b'password0', record)
+
+    def test_token_does_not_carry_the_key(self):
+        token = credential_sheet_create(students=make_students(1))
+
+        payload = signing.loads(token, salt=CREDENTIAL_SHEET_SALT)
+
+        self.assertEqual(list(payload), ['id'])
+        # a token signed elsewhere does not decrypt the sheet without this SECRET_KEY
+        with override_settings(SECRET_KEY='another-secret-key'):
+            self.assertIsNone(credential_sheet_pop(token=signing.dumps(payload, salt=CREDENTIAL_SHEET_SALT)))
+
+    def test_tampered_token_is_rejected(self):
+        token = credential_sheet_create(students=make_students(1))
+
+        self.assertIsNone(credential_sheet_pop(token=token[:-2] + 'xx'))
+        self.assertIsNone(credential_sheet_pop(token='not-a-token'))
+        self.assertIsNotNone(credential_sheet_pop(token=token))
+
+    def test_expired_token_is_rejected(self):
+        token = credential_sheet_create(students=make_students(1))
+
+        with override_settings(CREDENTIAL_SHEET_TIMEOUT=-1):
+            self.assertIsNone(credential_sheet_pop(token=token))
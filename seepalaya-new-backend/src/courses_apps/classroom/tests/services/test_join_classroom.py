@@ -0,0 +1,65 @@
+from django.core.cache import caches
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from courses_apps.account.models import PortalUser
+from courses_apps.classroom.models import ClassRoom
+from courses_apps.classroom.selectors import classroom_student_count_get
+from courses_apps.classroom.services import join_classroom
+from courses_apps.teacher.models import Teacher
+
+
+class JoinClassroomServiceTestCase(TestCase):
+
+    def setUp(self):
+        caches["shared"].clear()
+        teacher_user = PortalUser.objects.create_user(
+            username="teacher1", email="teacher1@example.com", password="password", full_name="John Doe",
+        )
+        self.classroom = ClassRoom.objects.create(
+            title="Test Classroom", class_code="TC123", teacher=Teacher.objects.create(user=teacher_user),
+        )
+        self.students = PortalUser.objects.bulk_create([
+            PortalUser(username=f"student{i}", email=f"student{i}@example.com") for i in range(2)
+        ])
+
+    def classroom_lookups(self, user):
+        """
+        Joins the classroom and returns its title and the number of classroom reads.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            title = join_classroom(class_code="TC123", user=user)
+        # concurrent joins never write the classroom row
+        self.assertFalse([query for query in queries if query['sql'].startswith('UPDATE')])
+        return title, len([query for query in queries if query['sql'].startswith('SELECT')
+                           and 'classroom_classroom' in query['sql']])
+
+    def test_join_resolves_the_class_code_once(self):
+        self.assertEqual(self.classroom_lookups(self.students[0]), ("Test Classroom", 1))
+        self.assertEqual(self.classroom_lookups(self.students[1]), ("Test Classroom", 0))
+
+        self.assertEqual(classroom_student_count_get(classroom_id=self.classroom.pk), 2)
+        self.assertCountEqual(self.classroom.students.all(), self.students)
+
+    def test_join_twice(self):
+        join_classroom(class_code="TC123", user=self.students[0])
+
+        with self.assertRaisesMessage(ValidationError, "Student is already in the classroom."):
+            join_classroom(class_code="TC123", user=self.students[0])
+
+        self.assertEqual(classroom_student_count_get(classroom_id=self.classroom.pk), 1)
+
+    def test_renamed_and_deleted_classroom(self):
+        join_classroom(class_code="TC123", user=self.students[0])
+
+        # the entry is dropped from the shared cache, so for every process
+        with self.captureOnCommitCallbacks(execute=True):
+            self.classroom.title = "Renamed Classroom"
+            self.classroom.save()
+        self.assertEqual(join_classroom(class_code="TC123", user=self.students[1]), "Renamed Classroom")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.classroom.delete()
+        with self.assertRaisesMessage(ValidationError, "Classroom does not exist."):
+            join_classroom(class_code="TC123", user=self.students[0])
@@ -146,3 +146,33 @@ class ClassStudentListAPIViewTestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
         response_data = response.json()  # Parse JSON response
         self.assertEqual(response_data['detail'], "You do not have permission to perform this action.")
+
+    def test_get_classroom_students_paginated(self):
+        """Test that the students are returned page by page, following the next cursor."""
+        self.create_students_through_api(self.classroom.class_code, ['Student Two', 'Student Three', 'Student One'])
+
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + self.teacher_access_token)
+        request_data = {'class_code': self.classroom.class_code, 'page_size': 2}
+        response = self.client.post(self.class_student_list_uri, request_data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response_data = response.json()
+        self.assertEqual([student['full_name'] for student in response_data['data']], ['Student One', 'Student Three'])
+        self.assertEqual(response_data['pagination']['count'], 3)
+        self.assertFalse(response_data['pagination']['count_is_estimate'])
+
+        request_data['cursor'] = response_data['pagination']['next_cursor']
+        response = self.client.post(self.class_student_list_uri, request_data, format='json')
+
+        response_data = response.json()
+        self.assertEqual([student['full_name'] for student in response_data['data']], ['Student Two'])
+        self.assertIsNone(response_data['pagination']['next_cursor'])
+
+    def test_get_classroom_students_invalid_cursor(self):
+        """Test that a malformed cursor is rejected."""
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + self.teacher_access_token)
+        request_data = {'class_code': self.classroom.class_code, 'cursor': 'not-a-cursor'}
+        response = self.client.post(self.class_student_list_uri, request_data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(response.json()['success'])
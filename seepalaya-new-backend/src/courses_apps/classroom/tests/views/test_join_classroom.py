@@ -1,4 +1,5 @@
 import json
+from django.core.cache import cache
 from django.urls import reverse
 from rest_framework.test import APIClient, APITestCase
 from rest_framework import status
@@ -15,6 +16,7 @@ User = get_user_model()
 
 class JoinClassRoomWithCodeAPIViewTestCase(APITestCase):
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
         self.join_classroom_uri = reverse('classroom:join_classroom')
         self.teacher_signup_uri = reverse('teacher:teacher_signup')
@@ -106,8 +106,8 @@ class TeacherStudentCreationAPIViewTestCase(APITestCase):
 
     @patch('courses_apps.classroom.selectors.get_class_room_name_from_class_code')
     @patch('courses_apps.classroom.services.student_create')
-    def test_teacher_student_creation_file_created(self, mock_student_create, mock_get_class_room_name_from_class_code):
-        """Test that CSV file is created and contains correct data."""
+    def test_teacher_student_creation_credentials_download(self, mock_student_create, mock_get_class_room_name_from_class_code):
+        """Test that the credentials are downloaded once as a CSV file, without writing to disk."""
         mock_student_create.return_value = [{'username': 'student1', 'full_name': 'Student One', 'password': 'password1'}]
         mock_get_class_room_name_from_class_code.return_value = 'Test Classroom'
 
@@ -116,17 +116,24 @@ class TeacherStudentCreationAPIViewTestCase(APITestCase):
             'class_code': 'TC123',
             'students': ['Student One']
         }
+        media_files = set(os.listdir(settings.MEDIA_ROOT)) if os.path.exists(settings.MEDIA_ROOT) else set()
         response = self.client.post(self.teacher_student_creation_uri, student_data)
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
-        csv_file_path = os.path.join(settings.MEDIA_ROOT, f'created_students_{self.teacher_user.username}.csv')
-        self.assertTrue(os.path.exists(csv_file_path))
+        if os.path.exists(settings.MEDIA_ROOT):
+            self.assertEqual(set(os.listdir(settings.MEDIA_ROOT)), media_files)
 
-        with open(csv_file_path, newline='') as csvfile:
-            reader = csv.DictReader(csvfile)
-            rows = list(reader)
-            self.assertEqual(len(rows), 1)
-            self.assertEqual(rows[0]['full_name'], 'Student One')
-        
-        # Clean up the file
-        os.remove(csv_file_path)
+        self.client.credentials()
+        download_response = self.client.get(response.data['file_url'])
+        self.assertEqual(download_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(download_response['Content-Type'], 'text/csv')
+        content = b''.join(download_response.streaming_content).decode()
+        rows = list(csv.DictReader(content.splitlines()))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['full_name'], 'Student One')
+        self.assertEqual(rows[0]['username'], response.data['data']['students'][0]['username'])
+        self.assertEqual(rows[0]['password'], response.data['data']['students'][0]['password'])
+
+        # the link works only once
+        download_response = self.client.get(response.data['file_url'])
+        self.assertEqual(download_response.status_code, status.HTTP_404_NOT_FOUND)
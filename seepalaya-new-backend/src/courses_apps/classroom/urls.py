@@ -10,6 +10,11 @@ urlpatterns = [
     path("update/", ClassRoomUpdateAPIView.as_view(), name="classroom_update"),
     path("delete/", DeleteClassRoomAPIView.as_view(), name="classroom_delete"),
     path("student/create/", TeacherStudentCreationAPIView.as_view(), name="student_create"),
+    path(
+        "student/credentials/<str:token>/",
+        StudentCredentialsDownloadAPIView.as_view(),
+        name="student_credentials_download",
+    ),
     path('join-class/', JoinClassRoomWithCodeAPIView.as_view(), name='join_classroom'),
     path('students/', ClassStudentListAPIView.as_view(), name='get_classroom_students'),
     path('students/add/', AddStudentsToClassRoomAPIView.as_view(), name='add_student_to_classroom'),
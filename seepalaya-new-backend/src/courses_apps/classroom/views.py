@@ -1,16 +1,16 @@
-import csv
-import os
 from typing import List
 from rest_framework.parsers import MultiPartParser
 from django.conf import settings
-from django.core.files.storage import default_storage
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+from django.utils import timezone
 from rest_framework import serializers
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from django.db import transaction
 from django.conf import settings
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from courses_apps.account.permissions import IsTeacher
 from .services import (
     create_classroom, 
@@ -19,7 +19,9 @@ from .services import (
     add_students_to_classroom,
     remove_students_from_classroom,
     update_classroom,
-    delete_classroom
+    delete_classroom,
+    credential_sheet_create,
+    credential_sheet_pop,
 )
 from .selectors import (
     get_classroom_students,
@@ -27,11 +29,11 @@ from .selectors import (
     get_class_room_name_from_class_code
 )
 from .nested_serializers import TeacherStudentCreationInputNestedSerializer, TeacherStudentCreationOutputNestedSerializer
+from .helpers import csv_rows_stream
 from rest_framework.exceptions import ValidationError
 from django.core.exceptions import ValidationError as DjangoValidationError
 from gettext import gettext as _
 from drf_spectacular.utils import extend_schema
-from .tasks import delete_student_detail_csv
 import asyncio
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
@@ -387,7 +389,7 @@ class TeacherStudentCreationAPIView(APIView):
         - kwargs: Additional keyword arguments.
 
         Returns:
-        - A Response object with the created students' data and a download link for the CSV file.
+        - A Response object with the created students' data and a single-use download link for their credentials.
 
         """
         input_serializer = self.TeacherStudentCreationInputSerializer(data=request.data)
@@ -433,30 +435,11 @@ class TeacherStudentCreationAPIView(APIView):
         )
         created_students_data = output_serializer.data['students']
 
-        # Ensure the directory exists
-        media_root = settings.MEDIA_ROOT
-        if not os.path.exists(media_root):
-            os.makedirs(media_root)
-
-        # Create CSV file with a unique filename
-        csv_file_path = os.path.join(media_root, f'created_students_{teacher_user}.csv')
-        with open(csv_file_path, 'w', newline='') as csvfile:
-            fieldnames = ['username', 'full_name', 'password']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-
-            writer.writeheader()
-            for student in created_students_data:
-                writer.writerow({
-                    'username': student['username'],
-                    'full_name': student['full_name'],
-                    'password': student['password'],
-                })
-
-        # Schedule file deletion task
-        delete_student_detail_csv.apply_async((csv_file_path,), countdown=900)
-
-        # Provide download link
-        file_url = default_storage.url(f'created_students_{teacher_user}.csv')
+        # the passwords are only handed out once, from an encrypted short-lived record
+        credential_sheet_token = credential_sheet_create(students=created_students_data)
+        file_url = request.build_absolute_uri(
+            reverse("classroom:student_credentials_download", kwargs={"token": credential_sheet_token})
+        )
 
         response_data = {
             "success": True,
@@ -468,6 +451,42 @@ class TeacherStudentCreationAPIView(APIView):
         return Response(response_data, status=status.HTTP_201_CREATED)
 
 
+class StudentCredentialsDownloadAPIView(APIView):
+    """
+    This view streams the credentials of the students a teacher just created as a CSV file.
+    The link from TeacherStudentCreationAPIView works once and for CREDENTIAL_SHEET_TIMEOUT
+    seconds, its signed token is the only authorization.
+
+    Methods:
+    - get: Streams the CSV file.
+    """
+
+    # opened as a plain link, the token itself authorizes the download
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request, token, *args, **kwargs):
+        rows = credential_sheet_pop(token=token)
+        if rows is None:
+            return Response(
+                {
+                    "success": False,
+                    "message": _("The download link is invalid, expired or already used."),
+                },
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        response = StreamingHttpResponse(
+            csv_rows_stream(header=["username", "full_name", "password"], rows=rows),
+            content_type="text/csv",
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="created_students_{timezone.now():%Y%m%d%H%M%S}.csv"'
+        )
+        response["Cache-Control"] = "no-store"
+        return response
+
+
 class JoinClassRoomWithCodeAPIView(APIView):
     """
     This view is used to join a classroom with a class code.
@@ -481,7 +500,6 @@ class JoinClassRoomWithCodeAPIView(APIView):
     class JoinClassRoomWithCodeInputSerializer(serializers.Serializer):
         class_code = serializers.CharField(required=True)
 
-    @transaction.atomic
     def post(self, request, *args, **kwargs):
         """
         Handles the POST request to join a classroom with a class code.
@@ -500,7 +518,7 @@ class JoinClassRoomWithCodeAPIView(APIView):
         try:
             class_details = join_classroom(
                 **input_serializer.validated_data,
-                username=request.user
+                user=request.user
             )
         except DjangoValidationError as e:
             return Response(
@@ -546,13 +564,14 @@ class ClassStudentListAPIView(APIView):
         class_code = serializers.CharField()
         search_query = serializers.CharField(required=False, allow_blank=True)
         sort_order = serializers.ChoiceField(choices=['asc', 'desc'], required=False)
+        cursor = serializers.CharField(required=False, allow_blank=True)
+        page_size = serializers.IntegerField(required=False, min_value=1, max_value=200)
 
     class ClassStudentListOutputSerializer(serializers.Serializer):
         full_name = serializers.CharField()
         username = serializers.CharField()
         # email = serializers.EmailField()
 
-    @transaction.atomic
     def post(self, request, *args, **kwargs):
         """
         Retrieves the list of students in a classroom based on the provided input data.
@@ -563,7 +582,7 @@ class ClassStudentListAPIView(APIView):
         - kwargs: Additional keyword arguments.
 
         Returns:
-        - A Response object containing the list of students fetched successfully.
+        - A Response object containing a page of the students, and the cursor of the next page.
         """
         input_serializer = self.ClassStudentListInputSerializer(data=request.data)
         input_serializer.is_valid(raise_exception=True)
@@ -598,11 +617,16 @@ class ClassStudentListAPIView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
         
-        output_serializer = self.ClassStudentListOutputSerializer(students_details, many=True)
+        output_serializer = self.ClassStudentListOutputSerializer(students_details.students, many=True)
         return Response({
             "success": True,
             "message": _("Students fetched successfully."),
-            "data": output_serializer.data
+            "data": output_serializer.data,
+            "pagination": {
+                "next_cursor": students_details.next_cursor,
+                "count": students_details.count,
+                "count_is_estimate": students_details.count_is_estimate,
+            },
         }, status=status.HTTP_200_OK)
 
 
@@ -642,7 +666,6 @@ class AddStudentsToClassRoomAPIView(APIView):
                 **input_serializer.validated_data,
                 teacher_user=teacher_user
             )
-            print(input_serializer.validated_data)
         except DjangoValidationError as e:
             return Response(
                 {
@@ -710,7 +733,6 @@ class RemoveStudentsFromClassRoomAPIView(APIView):
                 **input_serializer.validated_data,
                 teacher_user=teacher_user
             )
-            print(input_serializer.validated_data)
         except DjangoValidationError as e:
             return Response(
                 {
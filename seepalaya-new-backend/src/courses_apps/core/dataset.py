@@ -0,0 +1,583 @@
+"""
+Synthetic datasets of realistic volume for load tests and benchmarks, generated by the
+generate_dataset command. A dataset is identified by the prefix of its usernames, so
+several can live side by side and be deleted again.
+"""
+import csv
+import io
+import json
+import logging
+import math
+import random
+import string
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import caches
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Count, Max, QuerySet
+from django.db.models.signals import post_delete, pre_delete
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.state import token_backend
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from courses_apps.account.models import EmailConfirmationToken, ProfilePicture, UserRoles
+from courses_apps.account.revocation import token_blacklist_version_bump
+from courses_apps.account.selectors import user_active_cache_key, user_role_names_cache_key
+from courses_apps.account.tokens import ROLES_CLAIM
+from courses_apps.api_logs.helpers import encode_data
+from courses_apps.api_logs.models import APIRequestLog
+from courses_apps.api_logs.services import api_log_partitions_ensure
+from courses_apps.classroom.helpers import CLASS_CODE_CHARACTERS, CLASS_CODE_LENGTH
+from courses_apps.classroom.models import ClassRoom
+from courses_apps.classroom.selectors import classroom_code_cache_key
+from courses_apps.classroom.services import classroom_student_count_adjust
+from courses_apps.core.models import Grade, Language, Subject
+from courses_apps.epaath.models import EpaathModules
+from courses_apps.epaath.services import epaath_catalog_cache_invalidate
+from courses_apps.guardian.models import Guardian
+from courses_apps.learner.models import Learner
+from courses_apps.teacher.models import Teacher
+
+User = get_user_model()
+
+logger = logging.getLogger(__name__)
+
+# every dataset user logs in with this password
+DATASET_PASSWORD = "dataset@123"
+DATASET_EMAIL_DOMAIN = "dataset.seepalaya.com"
+# username letter of each kind of user, e.g. "dst12" is teacher 12 of the dataset "ds"
+DATASET_USER_KINDS = {"teacher": "t", "guardian": "g", "learner": "l"}
+DATASET_PREFIX_MAX_LENGTH = 6
+
+# rows generated and written at a time, bounding the memory of large datasets
+CHUNK_SIZE = 10000
+# share of the learners maintained by their teacher, the others signed up themselves
+TEACHER_MAINTAINED_SHARE = 0.7
+VERIFIED_SHARE = 0.8
+CHILDREN_PER_GUARDIAN = (1, 3)
+
+FIRST_NAMES = [
+    "Aarati", "Aashish", "Anil", "Anita", "Bikash", "Bimala", "Binod", "Deepa", "Dipendra", "Gita",
+    "Hari", "Kabita", "Kamala", "Krishna", "Laxmi", "Manish", "Nabin", "Nirmala", "Pooja", "Prakash",
+    "Puja", "Rajesh", "Ram", "Rita", "Roshan", "Sabina", "Sagar", "Sanjay", "Sarita", "Shyam",
+    "Sita", "Sunil", "Sunita", "Suraj", "Sushila", "Tara", "Ujjwal", "Usha", "Yamuna", "Yogesh",
+]
+LAST_NAMES = [
+    "Acharya", "Adhikari", "Bhandari", "Bhattarai", "Chaudhary", "Dahal", "Gautam", "Ghimire", "Gurung",
+    "Karki", "Khadka", "Koirala", "Lama", "Magar", "Maharjan", "Neupane", "Pandey", "Poudel", "Rai",
+    "Regmi", "Sapkota", "Shahi", "Sharma", "Shrestha", "Tamang", "Thapa", "Tiwari", "Yadav",
+]
+# the vocabulary of chapters.csv
+LANGUAGES = [("English", "en"), ("Nepali", "ne")]
+GRADES = [("one", "1"), ("two", "2"), ("three", "3"), ("four", "4"), ("five", "5"),
+          ("six", "6"), ("seven", "7"), ("eight", "8"), ("nine", "9"), ("ten", "10")]
+SUBJECTS = ["math", "science", "english", "nepali"]
+TOPICS = [
+    "Numbers", "Fractions", "Geometric Shapes", "Measurement", "Plants", "Animals", "Our Body",
+    "Water", "Weather", "Matter", "Energy", "Grammar", "Reading", "Poems", "Stories", "Letters",
+]
+SECTIONS = "ABCDE"
+# (method, path, share) of the logged API requests
+API_LOG_REQUESTS = [
+    ("GET", "/epaath/modules/", 0.35),
+    ("POST", "/account/login/", 0.15),
+    ("GET", "/account/user-details/", 0.15),
+    ("GET", "/account/token/refresh/", 0.1),
+    ("POST", "/teacher/classroom/list/", 0.08),
+    ("GET", "/teacher/students/list/", 0.05),
+    ("POST", "/classroom/students/", 0.05),
+    ("POST", "/classroom/join-class/", 0.04),
+    ("POST", "/classroom/students/add/", 0.03),
+]
+API_LOG_STATUSES = [(200, 0.94), (400, 0.03), (401, 0.02), (404, 0.005), (500, 0.005)]
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    """
+    The volume of a dataset. The same prefix, seed and sizes generate the same rows.
+    """
+    prefix: str = "ds"
+    seed: int = 0
+    teachers: int = 1000
+    classrooms: int = 5000
+    learners: int = 100000
+    guardians: int = 5000
+    classes_per_learner: int = 2
+    modules: int = 2000
+    tokens: int = 20000
+    blacklisted_share: float = 0.1
+    api_logs: int = 100000
+    api_log_days: int = 7
+
+
+def dataset_username(*, prefix: str, kind: str, number: int) -> str:
+    return f"{prefix}{DATASET_USER_KINDS[kind]}{number}"
+
+
+def dataset_user_queryset(*, prefix: str, kind: Optional[str] = None) -> QuerySet:
+    """
+    Returns the users of the dataset with the given prefix, of one kind or all of them,
+    ordered by their number.
+    """
+    letters = DATASET_USER_KINDS[kind] if kind else "".join(DATASET_USER_KINDS.values())
+    return User.objects.filter(username__regex=rf"^{prefix}[{letters}][0-9]+$").order_by("pk")
+
+
+def dataset_module_queryset(*, prefix: str) -> QuerySet:
+    """
+    Returns the E-Paath modules of the dataset with the given prefix.
+    """
+    return EpaathModules.objects.filter(chapter_id__regex=rf"^{prefix}-[0-9]+$")
+
+
+def dataset_spec_validate(*, spec: DatasetSpec) -> List[str]:
+    """
+    Returns the reasons the dataset cannot be generated, empty when it can.
+    """
+    errors = []
+    if not (spec.prefix.isalpha() and spec.prefix.islower() and len(spec.prefix) <= DATASET_PREFIX_MAX_LENGTH):
+        errors.append(f"The prefix must be 1 to {DATASET_PREFIX_MAX_LENGTH} lowercase letters.")
+    elif dataset_user_queryset(prefix=spec.prefix).exists():
+        errors.append(f"A dataset with the prefix {spec.prefix!r} exists, delete it first.")
+    if spec.classrooms and not spec.teachers:
+        errors.append("Classrooms need teachers.")
+    if spec.learners and spec.classes_per_learner and not spec.classrooms:
+        errors.append("Learners joining classes need classrooms.")
+    if spec.guardians and spec.learners < spec.guardians * CHILDREN_PER_GUARDIAN[0]:
+        errors.append("Every guardian needs a learner as child.")
+    if (spec.tokens or spec.api_logs) and not spec.teachers + spec.guardians + spec.learners:
+        errors.append("Tokens and API logs need users.")
+    if not 0 <= spec.blacklisted_share <= 1:
+        errors.append("The blacklisted share must be between 0 and 1.")
+    if spec.api_logs and not 1 <= spec.api_log_days <= settings.API_LOG_RETENTION_DAYS:
+        errors.append(f"The API logs must span 1 to API_LOG_RETENTION_DAYS ({settings.API_LOG_RETENTION_DAYS}) days.")
+    return errors
+
+
+def _chunks(count: int) -> Iterable[range]:
+    for start in range(0, count, CHUNK_SIZE):
+        yield range(start, min(start + CHUNK_SIZE, count))
+
+
+def _next_pk(model) -> int:
+    return (model.objects.aggregate(pk_max=Max("pk"))["pk_max"] or 0) + 1
+
+
+def _rows_load(model, columns: Sequence[str], rows: List[tuple]) -> int:
+    """
+    Writes the rows, tuples of database ready values in the order of the column attnames.
+    PostgreSQL loads them with COPY, the other databases with bulk inserts. No signals
+    are sent and no defaults applied, so every NOT NULL column must be given.
+    """
+    if not rows:
+        return 0
+    if connection.vendor != "postgresql":
+        model.objects.bulk_create([model(**dict(zip(columns, row))) for row in rows], batch_size=1000)
+        return len(rows)
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(["\\N" if value is None else value for value in row])
+    buffer.seek(0)
+    quote_name = connection.ops.quote_name
+    fields = [model._meta.get_field(column) for column in columns]
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {quote_name(model._meta.db_table)} ({', '.join(quote_name(field.column) for field in fields)}) "
+            f"FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+            buffer,
+        )
+    return len(rows)
+
+
+def _weighted(rng: random.Random, choices: List[tuple]):
+    """
+    Returns the leading values of one of the tuples, weighted by their last item.
+    """
+    value = rng.choices(choices, weights=[choice[-1] for choice in choices])[0][:-1]
+    return value[0] if len(value) == 1 else value
+
+
+class DatasetGenerator:
+    """
+    Generates the rows of a dataset in chunks, every kind of row from its own random
+    stream so that resizing one kind does not change the others. The primary keys
+    are allocated after the existing rows, so rows can reference each other without
+    reading them back.
+    """
+
+    def __init__(self, *, spec: DatasetSpec, log: Optional[Callable[[str], None]] = None):
+        self.spec = spec
+        self.log = log or logger.info
+        self.counts: Dict[str, int] = {}
+        # timestamps are relative to the start of the day, so runs on the same day match
+        self.now = datetime.combine(date.today(), datetime.min.time(), tzinfo=dt_timezone.utc)
+
+    def rng(self, stream: str) -> random.Random:
+        return random.Random(f"{self.spec.seed}:{stream}")
+
+    def uid(self, rng: random.Random) -> str:
+        return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+    def load(self, model, columns: Sequence[str], rows: List[tuple]) -> None:
+        loaded = _rows_load(model, columns, rows)
+        self.counts[model._meta.db_table] = self.counts.get(model._meta.db_table, 0) + loaded
+
+    def generate(self) -> Dict[str, int]:
+        """
+        Writes the dataset in one transaction and returns the rows written per table.
+        """
+        spec = self.spec
+        with transaction.atomic():
+            self.allocate()
+            self.generate_modules()
+            self.generate_users(kind="teacher", count=spec.teachers)
+            self.generate_users(kind="guardian", count=spec.guardians)
+            self.generate_learners()
+            self.generate_classrooms()
+            self.generate_tokens()
+            self.generate_api_logs()
+            self.sequences_reset()
+            transaction.on_commit(token_blacklist_version_bump)
+            transaction.on_commit(epaath_catalog_cache_invalidate)
+        return self.counts
+
+    def allocate(self):
+        spec = self.spec
+        self.user_pk = {}
+        next_user_pk = _next_pk(User)
+        for kind, count in (("teacher", spec.teachers), ("guardian", spec.guardians), ("learner", spec.learners)):
+            self.user_pk[kind] = next_user_pk
+            next_user_pk += count
+        self.teacher_pk = _next_pk(Teacher)
+        self.guardian_pk = _next_pk(Guardian)
+        self.learner_pk = _next_pk(Learner)
+        self.classroom_pk = _next_pk(ClassRoom)
+        self.token_pk = _next_pk(OutstandingToken)
+
+        self.roles = {
+            kind: UserRoles.objects.get_or_create(name=kind)[0].pk for kind in DATASET_USER_KINDS
+        }
+        self.picture_pks = list(ProfilePicture.objects.order_by("pk").values_list("pk", flat=True))
+        # hashed once, hashing a password per user would take hours, with a salt long
+        # enough that logging in does not rehash it
+        salt = "".join(self.rng("password").choices(string.ascii_letters + string.digits, k=22))
+        self.password = make_password(DATASET_PASSWORD, salt=salt)
+        # teacher t owns the classrooms t, t + teachers, t + 2 * teachers...
+        self.student_counts = [0] * spec.classrooms
+
+        # the first learners are the children of the guardians
+        rng = self.rng("guardians")
+        self.child_guardian = []
+        for number in range(spec.guardians):
+            children = rng.randint(*CHILDREN_PER_GUARDIAN)
+            self.child_guardian += [number] * min(children, spec.learners - len(self.child_guardian))
+
+    def user_row(self, rng: random.Random, kind: str, number: int, verified: bool) -> tuple:
+        username = dataset_username(prefix=self.spec.prefix, kind=kind, number=number)
+        full_name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        joined = self.now - timedelta(seconds=rng.randrange(2 * 365 * 86400))
+        picture = rng.choice(self.picture_pks) if self.picture_pks and rng.random() < 0.5 else None
+        return (
+            self.user_pk[kind] + number, username, f"{username}@{DATASET_EMAIL_DOMAIN}", full_name,
+            self.password, joined, joined + timedelta(days=rng.randrange(30)), verified, picture,
+            False, False, True, "", "",
+        )
+
+    USER_COLUMNS = (
+        "id", "username", "email", "full_name", "password", "date_joined", "last_login", "is_verified",
+        "profile_picture_id", "is_superuser", "is_staff", "is_active", "first_name", "last_name",
+    )
+
+    def users_load(self, rng: random.Random, kind: str, user_rows: List[tuple]) -> None:
+        """
+        Writes the users with their role and an email confirmation token for the unverified ones.
+        """
+        self.load(User, self.USER_COLUMNS, user_rows)
+        self.load(User.roles.through, ("portaluser_id", "userroles_id"),
+                  [(row[0], self.roles[kind]) for row in user_rows])
+        self.load(EmailConfirmationToken, ("user_id", "created_time", "token", "email"), [
+            (row[0], row[6], "%064x" % rng.getrandbits(256), row[2]) for row in user_rows if not row[7]
+        ])
+
+    def generate_users(self, *, kind: str, count: int) -> None:
+        rng = self.rng(f"users:{kind}")
+        for numbers in _chunks(count):
+            user_rows = [self.user_row(rng, kind, number, rng.random() < VERIFIED_SHARE) for number in numbers]
+            self.users_load(rng, kind, user_rows)
+            if kind == "teacher":
+                self.load(Teacher, ("id", "user_id", "school"), [
+                    (self.teacher_pk + number, row[0], f"{rng.choice(LAST_NAMES)} School")
+                    for number, row in zip(numbers, user_rows)
+                ])
+            else:
+                self.load(Guardian, ("id", "user_id"), [
+                    (self.guardian_pk + number, row[0]) for number, row in zip(numbers, user_rows)
+                ])
+        self.log(f"{count} {kind}s")
+
+    def generate_learners(self) -> None:
+        spec = self.spec
+        rng = self.rng("users:learner")
+        classes_rng = self.rng("memberships")
+        for numbers in _chunks(spec.learners):
+            user_rows, learners, memberships, teacher_students, children = [], [], [], [], []
+            for number in numbers:
+                user_pk, learner_pk = self.user_pk["learner"] + number, self.learner_pk + number
+                if number < len(self.child_guardian):
+                    maintained_by = "GUARDIAN"
+                    children.append((self.guardian_pk + self.child_guardian[number], learner_pk))
+                elif rng.random() < TEACHER_MAINTAINED_SHARE:
+                    maintained_by = "TEACHER"
+                else:
+                    maintained_by = "LEARNER"
+                # only learners who signed up themselves confirm their email
+                verified = maintained_by != "LEARNER" or rng.random() < VERIFIED_SHARE
+                user_rows.append(self.user_row(rng, "learner", number, verified))
+                learners.append((
+                    learner_pk, user_pk, self.now.date() - timedelta(days=rng.randrange(6 * 365, 16 * 365)),
+                    f"{rng.randrange(10000):04d}" if maintained_by == "GUARDIAN" else None,
+                    rng.randrange(5000), maintained_by,
+                ))
+
+                # the classes of a learner are classrooms of one teacher
+                if spec.classrooms and spec.classes_per_learner:
+                    teacher = classes_rng.randrange(spec.classrooms) % spec.teachers
+                    owned = len(range(teacher, spec.classrooms, spec.teachers))
+                    for index in classes_rng.sample(range(owned), min(spec.classes_per_learner, owned)):
+                        classroom = teacher + index * spec.teachers
+                        self.student_counts[classroom] += 1
+                        memberships.append((self.classroom_pk + classroom, user_pk))
+                    if maintained_by == "TEACHER":
+                        teacher_students.append((self.teacher_pk + teacher, user_pk))
+
+            self.users_load(rng, "learner", user_rows)
+            self.load(Learner, ("id", "user_id", "date_of_birth", "pin", "total_points", "account_maintained_by"), learners)
+            self.load(Guardian.children.through, ("guardian_id", "learner_id"), children)
+            self.load(Teacher.students.through, ("teacher_id", "portaluser_id"), teacher_students)
+            # the classrooms are written last, with their student counts, foreign keys are checked on commit
+            self.load(ClassRoom.students.through, ("classroom_id", "portaluser_id"), memberships)
+            self.log(f"{numbers.stop} of {spec.learners} learners")
+
+    def class_codes(self) -> List[str]:
+        """
+        Returns a class code per classroom, distinct from each other and from the existing ones.
+        """
+        rng = self.rng("class_codes")
+        codes = []
+        while len(codes) < self.spec.classrooms:
+            needed = self.spec.classrooms - len(codes)
+            drawn = {"".join(rng.choices(CLASS_CODE_CHARACTERS, k=CLASS_CODE_LENGTH)) for _ in range(needed)}
+            drawn = sorted(drawn - set(codes))
+            taken = set()
+            for start in range(0, len(drawn), CHUNK_SIZE):
+                chunk = drawn[start:start + CHUNK_SIZE]
+                taken.update(ClassRoom.objects.filter(class_code__in=chunk).values_list("class_code", flat=True))
+            codes += [code for code in drawn if code not in taken][:needed]
+        rng.shuffle(codes)
+        return codes
+
+    def generate_classrooms(self) -> None:
+        spec = self.spec
+        rng = self.rng("classrooms")
+        codes = self.class_codes()
+        for numbers in _chunks(spec.classrooms):
+            rows = []
+            for number in numbers:
+                created = self.now - timedelta(seconds=rng.randrange(365 * 86400))
+                grade = rng.randint(1, 10)
+                rows.append((
+                    self.classroom_pk + number, self.uid(rng), created, created,
+                    f"Grade {grade} {rng.choice(SUBJECTS).title()} {rng.choice(SECTIONS)}", codes[number],
+                    self.teacher_pk + number % spec.teachers, self.student_counts[number],
+                    created + timedelta(seconds=rng.randrange(int((self.now - created).total_seconds()) + 1))
+                    if self.student_counts[number] else None,
+                ))
+            self.load(ClassRoom, (
+                "id", "uid", "created_date", "updated_date", "title", "class_code", "teacher_id",
+                "student_count", "last_activity",
+            ), rows)
+        self.log(f"{spec.classrooms} classrooms")
+
+    def generate_modules(self) -> None:
+        spec = self.spec
+        if not spec.modules:
+            return
+        rng = self.rng("modules")
+        languages = [Language.objects.get_or_create(language=name, defaults={"abbreviation": code})[0]
+                     for name, code in LANGUAGES]
+        grades = [Grade.objects.get_or_create(grade=name, defaults={"in_symbol": symbol})[0]
+                  for name, symbol in GRADES]
+        subjects = [Subject.objects.get_or_create(subject=name)[0] for name in SUBJECTS]
+        for numbers in _chunks(spec.modules):
+            rows = []
+            for number in numbers:
+                created = self.now - timedelta(seconds=rng.randrange(365 * 86400))
+                subject, grade, language = rng.choice(subjects), rng.choice(grades), rng.choice(languages)
+                chapter_id = f"{spec.prefix}-{number}"
+                rows.append((
+                    self.uid(rng), created, created, f"{rng.choice(TOPICS)} {number}", chapter_id,
+                    None, f"images/thumb/{subject.subject}/{chapter_id}.png",
+                    f"start.html?id={chapter_id}&lang={language.abbreviation}&grade={grade.in_symbol}",
+                    language.pk, grade.pk, subject.pk, "yes" if rng.random() < 0.95 else "no",
+                ))
+            self.load(EpaathModules, (
+                "uid", "created_date", "updated_date", "title", "chapter_id", "abstract", "thumbnail", "link",
+                "language_id", "grade_id", "subject_id", "published",
+            ), rows)
+        self.log(f"{spec.modules} modules")
+
+    def random_user(self, rng: random.Random) -> Tuple[int, str]:
+        """
+        Returns the primary key and role name of a random user of the dataset.
+        """
+        spec = self.spec
+        number = rng.randrange(spec.teachers + spec.guardians + spec.learners)
+        for kind, count in (("teacher", spec.teachers), ("guardian", spec.guardians), ("learner", spec.learners)):
+            if number < count:
+                return self.user_pk[kind] + number, kind
+            number -= count
+
+    def generate_tokens(self) -> None:
+        spec = self.spec
+        rng = self.rng("tokens")
+        lifetime = api_settings.REFRESH_TOKEN_LIFETIME
+        for numbers in _chunks(spec.tokens):
+            tokens, blacklisted = [], []
+            for number in numbers:
+                user_pk, role = self.random_user(rng)
+                jti = "%032x" % rng.getrandbits(128)
+                # about a tenth of them expired already, for the housekeeping jobs to prune
+                created = self.now - lifetime * rng.uniform(0, 1.1)
+                token = token_backend.encode({
+                    api_settings.TOKEN_TYPE_CLAIM: "refresh",
+                    "exp": int((created + lifetime).timestamp()),
+                    "iat": int(created.timestamp()),
+                    api_settings.JTI_CLAIM: jti,
+                    api_settings.USER_ID_CLAIM: user_pk,
+                    ROLES_CLAIM: [role],
+                })
+                tokens.append((self.token_pk + number, user_pk, jti, token, created, created + lifetime))
+                if rng.random() < spec.blacklisted_share:
+                    blacklisted.append((self.token_pk + number, created + (self.now - created) * rng.random()))
+            self.load(OutstandingToken, ("id", "user_id", "jti", "token", "created_at", "expires_at"), tokens)
+            self.load(BlacklistedToken, ("token_id", "blacklisted_at"), blacklisted)
+        self.log(f"{spec.tokens} refresh tokens")
+
+    def generate_api_logs(self) -> None:
+        spec = self.spec
+        if not spec.api_logs:
+            return
+        rng = self.rng("api_logs")
+        start = self.now - timedelta(days=spec.api_log_days - 1)
+        api_log_partitions_ensure(days=[(start + timedelta(days=day)).date() for day in range(spec.api_log_days)])
+        keys = settings.API_LOG_SENSITIVE_KEYS
+        slow = settings.API_LOG_SLOW_REQUEST_MS / 1000
+        for numbers in _chunks(spec.api_logs):
+            rows = []
+            for _number in numbers:
+                method, path = _weighted(rng, API_LOG_REQUESTS)
+                status_code = _weighted(rng, API_LOG_STATUSES)
+                execution_time = round(rng.lognormvariate(math.log(0.03), 0.8), 4)
+                user_pk, _role = self.random_user(rng)
+                headers = {
+                    "CONTENT_TYPE": "application/json",
+                    "HTTP_USER_AGENT": rng.choice(["okhttp/4.9.2", "Mozilla/5.0 (Linux; Android 11)", "Dart/3.1 (dart:io)"]),
+                    "HTTP_AUTHORIZATION": "Bearer token",
+                }
+                body = {"user": user_pk} if method == "POST" else {}
+                rows.append((
+                    start + timedelta(seconds=rng.randrange(spec.api_log_days * 86400)), path, method, status_code,
+                    execution_time,
+                    1.0 if status_code >= 400 or execution_time >= slow else settings.API_LOG_SAMPLE_RATE,
+                    f"10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(1, 255)}",
+                    encode_data(headers, keys=keys), encode_data(body, keys=keys),
+                    json.dumps({"message": "OK" if status_code < 400 else "Error"}),
+                ))
+            self.load(APIRequestLog, (
+                "added_on", "api", "method", "status_code", "execution_time", "sample_rate", "client_ip_address",
+                "headers", "body", "response",
+            ), rows)
+        self.log(f"{spec.api_logs} API log rows")
+
+    def sequences_reset(self) -> None:
+        """
+        Moves the primary key sequences past the explicitly numbered rows.
+        """
+        statements = connection.ops.sequence_reset_sql(
+            no_style(), [User, Teacher, Guardian, Learner, ClassRoom, OutstandingToken]
+        )
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+
+
+def dataset_generate(*, spec: DatasetSpec, log: Optional[Callable[[str], None]] = None) -> Dict[str, int]:
+    """
+    Generates the dataset of the spec and returns the rows written per table. Run it
+    against an otherwise idle database, the primary keys are allocated up front.
+    """
+    return DatasetGenerator(spec=spec, log=log).generate()
+
+
+@contextmanager
+def _delete_signals_muted():
+    """
+    Disconnects every pre_delete and post_delete receiver for the duration, so deleting a
+    chunk of users cascades with a query per table instead of signals per row. The
+    receivers are gone for the whole process, use it in single-threaded commands only.
+    """
+    saved = [(signal, signal.receivers) for signal in (pre_delete, post_delete)]
+    try:
+        for signal, _receivers in saved:
+            signal.receivers = []
+            signal.sender_receivers_cache.clear()
+        yield
+    finally:
+        for signal, receivers in saved:
+            signal.receivers = receivers
+            signal.sender_receivers_cache.clear()
+
+
+def dataset_delete(*, prefix: str) -> int:
+    """
+    Deletes the users, classrooms, tokens and modules of the dataset with the given prefix
+    and returns the number of users deleted. The API log rows are left to expire. The
+    delete signals are muted, their bookkeeping is done here once per chunk: the student
+    counts of other classrooms the users were in and the shared cache entries.
+    """
+    ClassRoomStudents = ClassRoom.students.through
+    user_pks = list(dataset_user_queryset(prefix=prefix).values_list("pk", flat=True))
+    deleted = 0
+    for start in range(0, len(user_pks), CHUNK_SIZE):
+        chunk = user_pks[start:start + CHUNK_SIZE]
+        with transaction.atomic(), _delete_signals_muted():
+            OutstandingToken.objects.filter(user_id__in=chunk).delete()
+            classrooms = ClassRoom.objects.filter(teacher__user_id__in=chunk)
+            class_codes = list(classrooms.values_list("class_code", flat=True))
+            classrooms.delete()
+            memberships = (
+                ClassRoomStudents.objects.filter(portaluser_id__in=chunk)
+                .order_by().values("classroom_id").annotate(count=Count("pk"))
+            )
+            classroom_student_count_adjust(deltas={row["classroom_id"]: -row["count"] for row in memberships})
+            deleted += User.objects.filter(pk__in=chunk).delete()[1].get(User._meta.label, 0)
+        caches["shared"].delete_many(
+            [user_role_names_cache_key(user_id=pk) for pk in chunk]
+            + [user_active_cache_key(user_id=pk) for pk in chunk]
+            + [classroom_code_cache_key(class_code=class_code) for class_code in class_codes]
+        )
+        caches["local"].delete_many([user_active_cache_key(user_id=pk) for pk in chunk])
+    with _delete_signals_muted():
+        modules_deleted = dataset_module_queryset(prefix=prefix).delete()[0]
+    if modules_deleted:
+        epaath_catalog_cache_invalidate()
+    return deleted
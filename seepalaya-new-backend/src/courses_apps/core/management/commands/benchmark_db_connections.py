@@ -0,0 +1,79 @@
+import time
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection
+from django.db.backends.signals import connection_created
+from courses_apps.core.dataset import DatasetSpec, dataset_user_queryset
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    """
+    This command compares reconnecting on every request (CONN_MAX_AGE=0) against the configured
+    persistent connections. Each simulated request runs what django does when a request starts
+    and finishes around a single indexed query, the lookup of a user of the generated dataset
+    by username. Nothing is written to the database.
+    running the command:
+        - python manage.py generate_dataset
+        - python manage.py benchmark_db_connections --requests 500
+    """
+    help = 'Benchmark per-request database connections, reconnecting vs persistent'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help='Simulated requests per run')
+        parser.add_argument('--conn-max-age', type=int, default=None,
+                            help='CONN_MAX_AGE of the persistent run, defaults to the configured value')
+        parser.add_argument('--prefix', default=DatasetSpec.prefix, help='Prefix of the generated dataset')
+
+    def handle(self, *args, **kwargs):
+        user = dataset_user_queryset(prefix=kwargs['prefix'], kind='teacher').first()
+        if user is None:
+            raise CommandError('The benchmark needs a dataset user, run python manage.py generate_dataset first.')
+        configured_max_age = connection.settings_dict['CONN_MAX_AGE']
+        persistent_max_age = kwargs['conn_max_age']
+        if persistent_max_age is None:
+            persistent_max_age = configured_max_age or 60
+
+        try:
+            reconnect = self.run(kwargs['requests'], username=user.username, conn_max_age=0)
+            persistent = self.run(kwargs['requests'], username=user.username, conn_max_age=persistent_max_age)
+        finally:
+            connection.close()
+            connection.settings_dict['CONN_MAX_AGE'] = configured_max_age
+
+        self.stdout.write(f'{kwargs["requests"]} requests against {connection.vendor}')
+        for label, (elapsed, connections_opened) in (
+            ('CONN_MAX_AGE=0:', reconnect),
+            (f'CONN_MAX_AGE={persistent_max_age}:', persistent),
+        ):
+            self.stdout.write(
+                f'{label:<20} {kwargs["requests"] / elapsed:8.1f} requests/second, '
+                f'{elapsed / kwargs["requests"] * 1000:.3f} ms/request, '
+                f'{connections_opened} connections opened'
+            )
+        self.stdout.write(self.style.SUCCESS(f'speedup: {reconnect[0] / persistent[0]:.2f}x'))
+
+    def run(self, requests, *, username, conn_max_age):
+        """
+        Returns the elapsed seconds and the number of connections opened for the given
+        number of simulated requests, each looking up the user with the username.
+        """
+        connection.close()
+        connection.settings_dict['CONN_MAX_AGE'] = conn_max_age
+        opened = []
+
+        def count_connection(sender, **kwargs):
+            opened.append(sender)
+
+        connection_created.connect(count_connection)
+        try:
+            start = time.perf_counter()
+            for _ in range(requests):
+                close_old_connections()  # request_started
+                User.objects.filter(username=username).exists()
+                close_old_connections()  # request_finished
+            elapsed = time.perf_counter() - start
+        finally:
+            connection_created.disconnect(count_connection)
+        return elapsed, len(opened)
@@ -0,0 +1,81 @@
+import base64
+import binascii
+import json
+from typing import Any, List, Optional, Tuple
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.utils.translation import gettext as _
+from rest_framework.exceptions import ValidationError
+
+
+def keyset_cursor_encode(values: List[Any]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values, separators=(",", ":")).encode()).decode()
+
+
+def keyset_cursor_decode(cursor: str, *, size: int) -> List[Any]:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeError, ValueError):
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise ValidationError(_("Invalid cursor."))
+    return values
+
+
+def keyset_after(*, fields: List[str], values: List[Any], descending: bool = False) -> Q:
+    """
+    Returns the filter for the rows after the given values in the (fields) order, i.e.
+    (f1 > v1) OR (f1 = v1 AND f2 > v2) ..., with < when descending.
+    """
+    lookup = "lt" if descending else "gt"
+    condition = Q()
+    for index in range(len(fields)):
+        equal = {field: value for field, value in zip(fields[:index], values[:index])}
+        condition |= Q(**equal, **{f"{fields[index]}__{lookup}": values[index]})
+    return condition
+
+
+def keyset_paginate(
+    queryset: QuerySet,
+    *,
+    fields: List[str],
+    cursor: Optional[str],
+    page_size: int,
+    descending: bool = False,
+) -> Tuple[list, Optional[str]]:
+    """
+    Returns a page of the queryset, a values() queryset including the fields, and the
+    cursor of the next page (None on the last page). The last field must be unique.
+    Unlike offset pagination, every page costs the same however deep it is.
+    """
+    if cursor:
+        values = keyset_cursor_decode(cursor, size=len(fields))
+        queryset = queryset.filter(keyset_after(fields=fields, values=values, descending=descending))
+    ordering = [f"-{field}" if descending else field for field in fields]
+    rows = list(queryset.order_by(*ordering)[:page_size + 1])
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    return rows, keyset_cursor_encode([rows[-1][field] for field in fields])
+
+
+def queryset_count_estimate(queryset: QuerySet, *, exact_up_to: int = 1000) -> Tuple[int, bool]:
+    """
+    Returns the number of rows of the queryset and whether it is an estimate. Counts are
+    exact up to exact_up_to rows, beyond that PostgreSQL's planner estimate is used so
+    a large result is never counted row by row.
+    """
+    count = queryset.order_by()[:exact_up_to + 1].count()
+    if count <= exact_up_to:
+        return count, False
+
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return queryset.count(), False
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return max(int(plan[0]["Plan"]["Plan Rows"]), count), True
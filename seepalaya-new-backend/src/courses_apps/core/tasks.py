@@ -0,0 +1,13 @@
+from celery import shared_task
+
+
+@shared_task(name='run_housekeeping_task')
+def run_housekeeping_task(names=None):
+    """
+    Runs the registered housekeeping jobs, all of them by default. Scheduled by celery
+    beat, see CELERY_BEAT_SCHEDULE.
+    """
+    from .housekeeping import housekeeping_jobs_run
+
+    runs = housekeeping_jobs_run(names=names)
+    return {run.job: {"rows": run.rows, "duration": run.duration, "error": run.error} for run in runs}
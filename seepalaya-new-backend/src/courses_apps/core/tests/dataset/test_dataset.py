@@ -0,0 +1,97 @@
+import dataclasses
+from django.contrib.auth import authenticate
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from courses_apps.account.models import PortalUser
+from courses_apps.api_logs.models import APIRequestLog
+from courses_apps.classroom.models import ClassRoom
+from courses_apps.classroom.selectors import classroom_student_count_get
+from courses_apps.classroom.services import classroom_student_counts_reconcile
+from courses_apps.core.dataset import (
+    DATASET_PASSWORD, DatasetSpec, dataset_delete, dataset_generate, dataset_spec_validate, dataset_user_queryset,
+    dataset_username,
+)
+from courses_apps.epaath.models import EpaathModules
+from courses_apps.guardian.models import Guardian
+from courses_apps.learner.models import Learner
+from courses_apps.teacher.models import Teacher
+
+SPEC = DatasetSpec(
+    prefix="ts", seed=7, teachers=4, classrooms=12, learners=60, guardians=5, classes_per_learner=2,
+    modules=20, tokens=30, blacklisted_share=0.5, api_logs=40, api_log_days=3,
+)
+
+
+def snapshot():
+    return (
+        list(PortalUser.objects.order_by("username").values_list("username", "full_name", "is_verified")),
+        list(ClassRoom.objects.order_by("class_code").values_list("class_code", "title", "student_count")),
+        list(Learner.objects.order_by("user__username").values_list("user__username", "account_maintained_by", "pin")),
+    )
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class TestDataset(TestCase):
+
+    def test_generates_consistent_rows(self):
+        counts = dataset_generate(spec=SPEC)
+
+        self.assertEqual(counts["account_portaluser"], 69)
+        self.assertEqual(Teacher.objects.count(), 4)
+        self.assertEqual(Guardian.objects.count(), 5)
+        self.assertEqual(Learner.objects.count(), 60)
+        self.assertEqual(EpaathModules.objects.count(), 20)
+        self.assertEqual(OutstandingToken.objects.count(), 30)
+        self.assertEqual(APIRequestLog.objects.count(), 40)
+        self.assertTrue(BlacklistedToken.objects.exists())
+        self.assertEqual(ClassRoom.students.through.objects.count(), 120)
+        # the recorded student counts match the memberships
+        self.assertEqual(classroom_student_counts_reconcile(dry_run=True), [])
+        # a learner's classes belong to one teacher
+        for learner in dataset_user_queryset(prefix="ts", kind="learner"):
+            self.assertEqual(len(set(learner.classes.values_list("teacher", flat=True))), 1)
+        self.assertEqual(Learner.objects.filter(account_maintained_by="GUARDIAN").count(),
+                         Guardian.children.through.objects.count())
+
+        teacher = authenticate(username=dataset_username(prefix="ts", kind="teacher", number=0), password=DATASET_PASSWORD)
+        self.assertEqual(list(teacher.roles.values_list("name", flat=True)), ["teacher"])
+
+    def test_same_seed_generates_the_same_rows(self):
+        dataset_generate(spec=SPEC)
+        first = snapshot()
+        dataset_delete(prefix="ts")
+        self.assertFalse(PortalUser.objects.exists())
+        self.assertFalse(ClassRoom.objects.exists())
+        self.assertFalse(EpaathModules.objects.exists())
+
+        dataset_generate(spec=SPEC)
+
+        self.assertEqual(snapshot(), first)
+
+    def test_delete_does_not_query_per_user(self):
+        dataset_generate(spec=dataclasses.replace(SPEC, teachers=20, learners=600, guardians=50))
+        teacher = Teacher.objects.create(user=PortalUser.objects.create_user(
+            username="outsider", email="outsider@example.com", password="password",
+        ))
+        outside = ClassRoom.objects.create(title="Outside Classroom", class_code="OUT123456", teacher=teacher)
+        outside.students.add(*dataset_user_queryset(prefix="ts", kind="learner")[:10])
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(dataset_delete(prefix="ts"), 670)
+
+        # a user costs no query of its own, the signals are muted
+        self.assertLess(len(queries), 100)
+        # the memberships of the deleted learners left the outside classroom's count
+        self.assertEqual((classroom_student_count_get(classroom_id=outside.pk), outside.students.count()), (0, 0))
+        self.assertEqual(list(PortalUser.objects.values_list("username", flat=True)), ["outsider"])
+
+    def test_invalid_specs(self):
+        dataset_generate(spec=DatasetSpec(prefix="ts", teachers=1, classrooms=1, learners=1, guardians=0,
+                                          modules=0, tokens=0, api_logs=0))
+
+        self.assertEqual(dataset_spec_validate(spec=SPEC), ["A dataset with the prefix 'ts' exists, delete it first."])
+        self.assertEqual(len(dataset_spec_validate(spec=DatasetSpec(prefix="Toolong1"))), 1)
+        self.assertEqual(len(dataset_spec_validate(spec=DatasetSpec(teachers=0))), 1)
+        self.assertEqual(dataset_spec_validate(spec=DatasetSpec()), [])
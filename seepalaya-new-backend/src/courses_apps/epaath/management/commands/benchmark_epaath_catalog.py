@@ -0,0 +1,36 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+from courses_apps.core.dataset import DatasetSpec, dataset_module_queryset
+
+
+class Command(BaseCommand):
+    """
+    This command measures how many catalog requests a single process serves per second,
+    for full responses and for ETag revalidations, once the requested page is cached.
+    The Django test client is used, so no web server has to be running.
+    running the command:
+        - python manage.py benchmark_epaath_catalog --requests 5000
+    """
+    help = 'Benchmark the E-Paath catalog endpoint on a single process'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per scenario')
+        parser.add_argument('--page-size', type=int, default=50, help='Modules per page')
+        parser.add_argument('--prefix', default=DatasetSpec.prefix, help='Prefix of the generated dataset')
+
+    def handle(self, *args, **kwargs):
+        if not dataset_module_queryset(prefix=kwargs['prefix']).exists():
+            raise CommandError('The benchmark needs the E-Paath modules of a dataset, '
+                               'run python manage.py generate_dataset first.')
+        client = Client(HTTP_HOST='localhost')
+        url = f"{reverse('epaath:module_list')}?page_size={kwargs['page_size']}"
+        etag = client.get(url)['ETag']
+
+        for scenario, headers in [('cached page', {}), ('etag revalidation', {'HTTP_IF_NONE_MATCH': etag})]:
+            start = time.perf_counter()
+            for _ in range(kwargs['requests']):
+                client.get(url, **headers)
+            elapsed = time.perf_counter() - start
+            self.stdout.write(f"{scenario}: {kwargs['requests'] / elapsed:.0f} requests/second")
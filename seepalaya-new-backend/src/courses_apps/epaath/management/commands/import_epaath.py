@@ -1,12 +1,20 @@
 import csv
+from itertools import islice
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from courses_apps.core.models import Language, Subject, Grade
 from courses_apps.epaath.models import EpaathModules
+from courses_apps.epaath.services import epaath_catalog_cache_invalidate
+
+# fields refreshed on chapters that are already imported
+CHAPTER_UPDATE_FIELDS = ['title', 'thumbnail', 'link', 'subject', 'published']
+
 
 class Command(BaseCommand):
     """
     This command imports epaath chapters from a CSV file. The CSV file must have the following columns:
     title, chapter_id, language, language_code, grade, grade_in_symbol, subject, thumbnail, link
+    Chapters are upserted on (chapter_id, language, grade), so the command is safe to re-run.
     running the command:
         - python manage.py import_epaath path/to/csv/file.csv
     """
@@ -14,49 +22,135 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument('csv_file', type=str, help='The CSV file to import')
+        parser.add_argument('--chunk-size', type=int, default=500, help='Rows upserted per query')
 
+    @transaction.atomic
     def handle(self, *args, **kwargs):
         csv_file = kwargs['csv_file']
-        
+        self.languages = {language.language: language for language in Language.objects.all()}
+        self.grades = {grade.grade: grade for grade in Grade.objects.all()}
+        self.subjects = {subject.subject: subject for subject in Subject.objects.all()}
+        counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+
         with open(csv_file, newline='', encoding='utf-8') as csvfile:
             reader = csv.DictReader(csvfile)
-            for row in reader:
-                # Get or create the Language object
-                language, created = Language.objects.get_or_create(
-                    language=row['language'],
-                    defaults={'abbreviation': row['language_code']}
-                )
-                if not created:
-                    # Update the abbreviation if it doesn't match
-                    if language.abbreviation != row['language_code']:
-                        language.abbreviation = row['language_code']
-                        language.save()
-
-                # Get or create the Grade object
-                grade, created = Grade.objects.get_or_create(
-                    grade=row['grade'],
-                    defaults={'in_symbol': row['grade_in_symbol']}
-                )
-                if not created:
-                    # Update the in_symbol if it doesn't match
-                    if grade.in_symbol != row['grade_in_symbol']:
-                        grade.in_symbol = row['grade_in_symbol']
-                        grade.save()
-
-                # Get or create the Subject object
-                subject, created = Subject.objects.get_or_create(
-                    subject=row['subject']
-                )
+            while True:
+                rows = list(islice(reader, kwargs['chunk_size']))
+                if not rows:
+                    break
+                self.resolve_lookups(rows)
+                for outcome, count in self.upsert_chapters(rows).items():
+                    counts[outcome] += count
+
+        if counts['inserted'] or counts['updated']:
+            transaction.on_commit(epaath_catalog_cache_invalidate)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported chapters: {counts['inserted']} inserted, {counts['updated']} updated, "
+            f"{counts['unchanged']} unchanged."
+        ))
+
+    def resolve_lookups(self, rows):
+        """
+        Creates the languages, grades and subjects of the chunk that do not exist yet and
+        updates the abbreviations/symbols that changed, a single query per model.
+        """
+        new_languages, changed_languages = {}, {}
+        new_grades, changed_grades = {}, {}
+        new_subjects = {}
 
-                chapter = EpaathModules.objects.create(
-                    title=row['title'],
-                    chapter_id=row['chapter_id'],
-                    abstract=None,
-                    thumbnail=row['thumbnail'],
-                    link=row['link'],
-                    language=language,
-                    grade=grade,
-                    subject=subject,
-                    published='yes'
+        for row in rows:
+            language = self.languages.get(row['language']) or new_languages.get(row['language'])
+            if language is None:
+                new_languages[row['language']] = Language(
+                    language=row['language'], abbreviation=row['language_code']
                 )
-                self.stdout.write(self.style.SUCCESS(f'Successfully created chapter: {chapter.title}'))
\ No newline at end of file
+            elif language.abbreviation != row['language_code']:
+                language.abbreviation = row['language_code']
+                if language.pk:
+                    changed_languages[language.pk] = language
+
+            grade = self.grades.get(row['grade']) or new_grades.get(row['grade'])
+            if grade is None:
+                new_grades[row['grade']] = Grade(grade=row['grade'], in_symbol=row['grade_in_symbol'])
+            elif grade.in_symbol != row['grade_in_symbol']:
+                grade.in_symbol = row['grade_in_symbol']
+                if grade.pk:
+                    changed_grades[grade.pk] = grade
+
+            if row['subject'] not in self.subjects and row['subject'] not in new_subjects:
+                new_subjects[row['subject']] = Subject(subject=row['subject'])
+
+        if new_languages:
+            self.languages.update(self.bulk_create_lookups(Language, 'language', new_languages))
+        if new_grades:
+            self.grades.update(self.bulk_create_lookups(Grade, 'grade', new_grades))
+        if new_subjects:
+            self.subjects.update(self.bulk_create_lookups(Subject, 'subject', new_subjects))
+        if changed_languages:
+            Language.objects.bulk_update(changed_languages.values(), ['abbreviation'])
+        if changed_grades:
+            Grade.objects.bulk_update(changed_grades.values(), ['in_symbol'])
+
+    def bulk_create_lookups(self, model, field_name, objs):
+        """
+        Creates the given lookup objects, keyed by name, and returns them with their primary keys.
+        The rows are re-read on backends where bulk_create does not set primary keys.
+        """
+        created = model.objects.bulk_create(objs.values())
+        if all(obj.pk for obj in created):
+            return objs
+        return {
+            getattr(obj, field_name): obj
+            for obj in model.objects.filter(**{f'{field_name}__in': objs})
+        }
+
+    def upsert_chapters(self, rows):
+        """
+        Inserts new chapters and updates the changed ones in a single upsert.
+        Unchanged chapters are left alone so their updated_date stays put.
+        """
+        chapters = {}
+        for row in rows:
+            chapter = EpaathModules(
+                title=row['title'],
+                chapter_id=row['chapter_id'],
+                abstract=None,
+                thumbnail=row['thumbnail'],
+                link=row['link'],
+                language=self.languages[row['language']],
+                grade=self.grades[row['grade']],
+                subject=self.subjects[row['subject']],
+                published='yes'
+            )
+            chapters[(chapter.chapter_id, chapter.language_id, chapter.grade_id)] = chapter
+
+        existing = {
+            (values['chapter_id'], values['language_id'], values['grade_id']): values
+            for values in EpaathModules.objects.filter(
+                chapter_id__in={chapter_id for chapter_id, _, _ in chapters}
+            ).values('chapter_id', 'language_id', 'grade_id', 'title', 'thumbnail', 'link', 'subject_id', 'published')
+        }
+
+        counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+        to_upsert = []
+        for key, chapter in chapters.items():
+            current = existing.get(key)
+            if current is None:
+                counts['inserted'] += 1
+            elif any(current[field.attname] != getattr(chapter, field.attname)
+                     for field in map(EpaathModules._meta.get_field, CHAPTER_UPDATE_FIELDS)):
+                counts['updated'] += 1
+            else:
+                counts['unchanged'] += 1
+                continue
+            to_upsert.append(chapter)
+
+        if to_upsert:
+            EpaathModules.objects.bulk_create(
+                to_upsert,
+                update_conflicts=True,
+                unique_fields=['chapter_id', 'language', 'grade'],
+                update_fields=CHAPTER_UPDATE_FIELDS + ['updated_date'],
+            )
+        return counts
@@ -0,0 +1,34 @@
+# Generated by Django 4.2 on 2026-10-18 14:31
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def delete_duplicate_chapters(apps, schema_editor):
+    """
+    Earlier imports created a new row per run. Keeps the oldest row of every
+    chapter/language/grade so the unique constraint can be added.
+    """
+    EpaathModules = apps.get_model('epaath', 'EpaathModules')
+    keep_ids = (
+        EpaathModules.objects
+        .values('chapter_id', 'language', 'grade')
+        .annotate(keep_id=Min('id'))
+        .values('keep_id')
+    )
+    EpaathModules.objects.exclude(id__in=keep_ids).exclude(language=None).exclude(grade=None).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('epaath', '0004_alter_epaathmodules_grade_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicate_chapters, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='epaathmodules',
+            constraint=models.UniqueConstraint(fields=('chapter_id', 'language', 'grade'), name='unique_epaath_chapter_language_grade'),
+        ),
+    ]
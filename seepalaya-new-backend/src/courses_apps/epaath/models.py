@@ -27,4 +27,11 @@ class EpaathModules(IdentifierTimeStampAbstractModel):
     
     class Meta:
         verbose_name = _("E-Paath Module")
-        verbose_name_plural = _("E-Paath Modules")
\ No newline at end of file
+        verbose_name_plural = _("E-Paath Modules")
+        constraints = [
+            # a chapter id is reused across grades, so a chapter is identified per language and grade
+            models.UniqueConstraint(
+                fields=["chapter_id", "language", "grade"],
+                name="unique_epaath_chapter_language_grade",
+            ),
+        ]
\ No newline at end of file
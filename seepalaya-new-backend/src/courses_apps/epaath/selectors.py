@@ -0,0 +1,46 @@
+import time
+from typing import Optional
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models.query import QuerySet
+from .models import EpaathModules
+
+EPAATH_CATALOG_VERSION_KEY = "epaath:catalog:version"
+
+
+def epaath_module_list(
+    *, grade: Optional[str] = None, subject: Optional[str] = None, language: Optional[str] = None
+) -> QuerySet[EpaathModules]:
+    """
+    Returns the published E-Paath modules, optionally filtered by the uid of their
+    grade, subject and language, ordered by id.
+    """
+    queryset = EpaathModules.objects.filter(published="yes").select_related("grade", "subject", "language")
+    if grade:
+        queryset = queryset.filter(grade__uid=grade)
+    if subject:
+        queryset = queryset.filter(subject__uid=subject)
+    if language:
+        queryset = queryset.filter(language__uid=language)
+    return queryset.order_by("id")
+
+
+def epaath_catalog_version_get() -> int:
+    """
+    Returns the current version of the cached E-Paath catalog. Cached catalog pages are
+    keyed on it, so bumping the version invalidates all of them at once. The version is
+    kept in the shared cache, so an import or edit in any process reaches every other,
+    and each process reuses its own copy for EPAATH_CATALOG_VERSION_LOCAL_TIMEOUT
+    seconds, so a cached page or a 304 is served without a query.
+    """
+    version = caches["local"].get(EPAATH_CATALOG_VERSION_KEY)
+    if version is not None:
+        return version
+
+    version = caches["shared"].get(EPAATH_CATALOG_VERSION_KEY)
+    if version is None:
+        # seeded from the clock so a version lost to eviction never reuses an old number
+        caches["shared"].add(EPAATH_CATALOG_VERSION_KEY, time.time_ns(), timeout=None)
+        version = caches["shared"].get(EPAATH_CATALOG_VERSION_KEY)
+    caches["local"].set(EPAATH_CATALOG_VERSION_KEY, version, timeout=settings.EPAATH_CATALOG_VERSION_LOCAL_TIMEOUT)
+    return version
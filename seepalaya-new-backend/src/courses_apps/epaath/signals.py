@@ -0,0 +1,17 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from courses_apps.core.models import Grade, Language, Subject
+from .models import EpaathModules
+from .services import epaath_catalog_cache_invalidate
+
+
+@receiver([post_save, post_delete], sender=EpaathModules)
+@receiver([post_save, post_delete], sender=Language)
+@receiver([post_save, post_delete], sender=Grade)
+@receiver([post_save, post_delete], sender=Subject)
+def invalidate_epaath_catalog(sender, **kwargs):
+    """
+    Invalidates the cached catalog when a module or its taxonomy is edited, e.g. in the admin.
+    """
+    transaction.on_commit(epaath_catalog_cache_invalidate)
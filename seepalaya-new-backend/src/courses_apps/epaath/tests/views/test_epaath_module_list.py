@@ -0,0 +1,110 @@
+from django.urls import reverse
+from django.core.cache import cache, caches
+from rest_framework.test import APIClient, APITestCase
+from rest_framework import status
+from courses_apps.core.models import Grade, Language, Subject
+from courses_apps.epaath.models import EpaathModules
+from courses_apps.epaath.selectors import EPAATH_CATALOG_VERSION_KEY
+
+
+class EpaathModuleListAPIViewTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        caches['local'].clear()
+        self.client = APIClient()
+        self.module_list_uri = reverse('epaath:module_list')
+        self.english = Language.objects.create(language='English', abbreviation='en')
+        self.nepali = Language.objects.create(language='Nepali', abbreviation='ne')
+        self.grade_one = Grade.objects.create(grade='one', in_symbol='1')
+        self.grade_two = Grade.objects.create(grade='two', in_symbol='2')
+        self.math = Subject.objects.create(subject='math')
+
+        modules = []
+        for i in range(6):
+            modules.append(EpaathModules(
+                title=f'Chapter {i}',
+                chapter_id=f'mat{i:05d}',
+                thumbnail=f'images/{i}.png',
+                link=f'start.html?id=mat{i:05d}',
+                language=self.english if i % 2 == 0 else self.nepali,
+                grade=self.grade_one if i < 3 else self.grade_two,
+                subject=self.math,
+            ))
+        modules.append(EpaathModules(
+            title='Unpublished', chapter_id='unpub', thumbnail='', link='',
+            language=self.english, grade=self.grade_one, subject=self.math, published='no',
+        ))
+        EpaathModules.objects.bulk_create(modules)
+
+    def test_list_published_modules(self):
+        response = self.client.get(self.module_list_uri)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['success'])
+        results = response.data['data']['results']
+        self.assertEqual([module['title'] for module in results], [f'Chapter {i}' for i in range(6)])
+        self.assertEqual(results[0]['grade_in_symbol'], '1')
+        self.assertEqual(results[0]['language_code'], 'en')
+        self.assertEqual(results[0]['subject'], 'math')
+
+    def test_list_filtered_modules(self):
+        response = self.client.get(
+            self.module_list_uri, {'grade': str(self.grade_one.uid), 'language': str(self.english.uid)}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([module['title'] for module in response.data['data']['results']], ['Chapter 0', 'Chapter 2'])
+
+    def test_list_invalid_filter(self):
+        response = self.client.get(self.module_list_uri, {'grade': 'one'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_cursor_pagination(self):
+        response = self.client.get(self.module_list_uri, {'page_size': 4})
+        self.assertEqual(len(response.data['data']['results']), 4)
+        self.assertIsNotNone(response.data['data']['next'])
+
+        response = self.client.get(response.data['data']['next'])
+        self.assertEqual([module['title'] for module in response.data['data']['results']], ['Chapter 4', 'Chapter 5'])
+        self.assertIsNone(response.data['data']['next'])
+
+    def test_cached_page_and_etag(self):
+        response = self.client.get(self.module_list_uri)
+        etag = response['ETag']
+
+        with self.assertNumQueries(0):
+            cached_response = self.client.get(self.module_list_uri)
+        self.assertEqual(cached_response.data, response.data)
+
+        with self.assertNumQueries(0):
+            not_modified_response = self.client.get(self.module_list_uri, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(not_modified_response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(not_modified_response['ETag'], etag)
+
+    def test_edit_invalidates_cache(self):
+        etag = self.client.get(self.module_list_uri)['ETag']
+
+        module = EpaathModules.objects.get(chapter_id='mat00000')
+        module.title = 'Renamed Chapter'
+        with self.captureOnCommitCallbacks(execute=True):
+            module.save()
+
+        response = self.client.get(self.module_list_uri, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data['data']['results'][0]['title'], 'Renamed Chapter')
+
+    def test_version_bumped_by_another_process(self):
+        etag = self.client.get(self.module_list_uri)['ETag']
+
+        # another process, e.g. python manage.py import_epaath, shares only the shared cache
+        EpaathModules.objects.filter(chapter_id='mat00000').update(title='Renamed Chapter')
+        caches['shared'].incr(EPAATH_CATALOG_VERSION_KEY)
+        response = self.client.get(self.module_list_uri, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # until the copy of this process expires
+        caches['local'].delete(EPAATH_CATALOG_VERSION_KEY)
+        response = self.client.get(self.module_list_uri, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data']['results'][0]['title'], 'Renamed Chapter')
@@ -0,0 +1,9 @@
+from django.urls import path
+
+from .views import *
+
+app_name = "epaath"
+
+urlpatterns = [
+    path("modules/", EpaathModuleListAPIView.as_view(), name="module_list"),
+]
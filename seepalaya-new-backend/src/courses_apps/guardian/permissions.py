@@ -1,5 +1,6 @@
 from rest_framework.permissions import BasePermission
 from django.contrib.auth import get_user_model
+from courses_apps.account.selectors import get_request_user_role_names
 
 User = get_user_model()
 
@@ -10,5 +11,5 @@ class IsGuardian(BasePermission):
     message = "User needs to be a guardian to access this view."
 
     def has_permission(self, request, view):
-        return User.objects.filter(roles__name="guardian", pk=request.user.pk).exists()
+        return "guardian" in get_request_user_role_names(request=request)
 
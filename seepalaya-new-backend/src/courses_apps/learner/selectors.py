@@ -12,15 +12,13 @@ User = get_user_model()
 
 def student_teacher_list(*, user: PortalUser) -> QuerySet:
     """
-    Returns a list of teachers for a given learner email, including the created_by field.
+    Returns the full name, username and email of the teachers of the given learner user.
     """
-    try:
-        learner = Learner.objects.get(user=user)
-    except Learner.DoesNotExist:
+    if not Learner.objects.filter(user=user).exists():
         raise ValidationError(_("Learner does not exist."))
 
     queryset = (
-        learner.teacher.prefetch_related("user") 
+        Teacher.objects.filter(students=user)
         .annotate(
             full_name=F("user__full_name"),
             username=F("user__username"),
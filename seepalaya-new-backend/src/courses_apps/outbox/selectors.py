@@ -0,0 +1,15 @@
+from typing import Dict, Optional
+from django.db.models import Count, Min
+from django.utils import timezone
+from .models import OutboxTask
+
+
+def outbox_stats() -> Dict[str, Optional[float]]:
+    """
+    Returns the number of tasks waiting to be published and the dispatch lag, the age in
+    seconds of the oldest of them (None when there is none).
+    """
+    stats = OutboxTask.objects.aggregate(pending_tasks=Count("id"), oldest=Min("created_date"))
+    oldest = stats.pop("oldest")
+    stats["dispatch_lag"] = (timezone.now() - oldest).total_seconds() if oldest else None
+    return stats
@@ -0,0 +1,12 @@
+from celery import shared_task
+
+
+@shared_task(name='dispatch_outbox_task')
+def dispatch_outbox_task():
+    """
+    Publishes the deduplicated outbox tasks and those whose after-commit dispatch failed.
+    Scheduled by celery beat every OUTBOX_DISPATCH_INTERVAL seconds.
+    """
+    from .services import outbox_dispatch
+
+    return outbox_dispatch()
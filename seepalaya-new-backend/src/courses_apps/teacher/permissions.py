@@ -1,5 +1,6 @@
 from rest_framework.permissions import BasePermission
 from django.contrib.auth import get_user_model
+from courses_apps.account.selectors import get_request_user_role_names
 
 User = get_user_model()
 
@@ -10,4 +11,4 @@ class IsTeacher(BasePermission):
     message = "User needs to be a teacher to access this view."
 
     def has_permission(self, request, view):
-        return User.objects.filter(roles__name="teacher", pk=request.user.pk).exists()
\ No newline at end of file
+        return "teacher" in get_request_user_role_names(request=request)
\ No newline at end of file
@@ -1,6 +1,10 @@
-from typing import List, Dict, Any, Union
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Union
+from django.db import connection
 from django.db.models.query import QuerySet
-from django.db.models import F
+from django.db.models import Exists, F, OuterRef, Q, Value
+from django.db.models.functions import Coalesce
 from django.contrib.auth import get_user_model
 from courses_apps.teacher.models import Teacher
 from courses_apps.account.models import PortalUser
@@ -9,8 +13,8 @@ from rest_framework.exceptions import ValidationError
 from django.utils.translation import gettext as _
 from django.contrib.postgres.aggregates import ArrayAgg
 from courses_apps.classroom.models import ClassRoom
-from django.db.models import Count
 from django.core.exceptions import ValidationError as DjangoValidationError
+from courses_apps.core.pagination import keyset_paginate, queryset_count_estimate
 
 
 User = get_user_model()
@@ -46,7 +50,7 @@ def teacher_get_from_username(*, username: str) -> Teacher:
     return teacher
 
 
-def teacher_get_all_students(*, teacher: Teacher) -> QuerySet[Learner]:
+def teacher_get_all_students(*, teacher: Teacher) -> QuerySet[User]:
     """
     Used only for validation/internal purposes.
     Returns a list of all students associated with a given teacher object.
@@ -69,9 +73,9 @@ def student_get_from_username(*, username: str) -> Learner:
 
 def check_learner_account_created_by(*, learner: Learner) -> str:
     """
-    Returns the account created by field for a given learner object.
+    Returns who maintains the account of a given learner object, e.g. "TEACHER".
     """
-    return learner.account_created_by
+    return learner.account_maintained_by
 
 
 def get_user_detail_for_student(*, user: PortalUser):
@@ -87,28 +91,94 @@ def get_user_detail_for_student(*, user: PortalUser):
         return None
     return details
 
-def teacher_student_list(*, user: PortalUser) -> QuerySet:
+@dataclass
+class TeacherStudentPage:
+    students: List[Dict[str, Any]]
+    next_cursor: Optional[str]
+    # None on the pages after the first, the client keeps the first page's count
+    count: Optional[int]
+    count_is_estimate: bool
+
+
+def teacher_student_list(
+    *,
+    user: PortalUser,
+    class_code: Optional[str] = None,
+    cursor: Optional[str] = None,
+    page_size: int = 50,
+) -> TeacherStudentPage:
     """
-    Returns a list of students for a given teacher email, including the created_by field.
+    Returns a page of the students of a given teacher, sorted by full name, one row per
+    student with the codes and titles of the teacher's classrooms they are in, optionally
+    only the students of the classroom with the given class_code.
+    On PostgreSQL the classrooms are aggregated in the same grouped query as the page.
     """
     try:
         teacher = Teacher.objects.get(user=user)
     except Teacher.DoesNotExist:
         raise ValidationError(_("Teacher does not exist."))
 
-    queryset = (
-        teacher.students.prefetch_related("learner", "classes")
-        .annotate(
-            student_full_name=F("full_name"),
-            student_username=F("username"),
-            student_maintained_by=F("learner__account_maintained_by"),
-            classroom=F("classes__title"),
+    students = teacher.students.all()
+    if class_code:
+        # filtered with EXISTS, joining classes would narrow the aggregated classrooms too
+        students = students.filter(Exists(
+            ClassRoom.students.through.objects.filter(
+                portaluser_id=OuterRef("pk"), classroom__class_code=class_code, classroom__teacher=teacher
+            )
+        ))
+    students = students.annotate(
+        sort_name=Coalesce("full_name", Value("")),
+        student_full_name=F("full_name"),
+        student_username=F("username"),
+        student_maintained_by=F("learner__account_maintained_by"),
+    ).values("id", "sort_name", "student_full_name", "student_username", "student_maintained_by")
+
+    aggregated = connection.vendor == "postgresql"
+    if aggregated:
+        teacher_classes = Q(classes__teacher=teacher)
+        page_students = students.annotate(
+            class_codes=ArrayAgg(
+                "classes__class_code", filter=teacher_classes, ordering="classes__class_code", default=Value([])
+            ),
+            class_titles=ArrayAgg(
+                "classes__title", filter=teacher_classes, ordering="classes__class_code", default=Value([])
+            ),
+        )
+    else:
+        page_students = students
+
+    rows, next_cursor = keyset_paginate(page_students, fields=["sort_name", "id"], cursor=cursor, page_size=page_size)
+
+    if aggregated:
+        for row in rows:
+            row["classes"] = [
+                {"class_code": code, "title": title}
+                for code, title in zip(row.pop("class_codes"), row.pop("class_titles"))
+            ]
+    else:
+        classes = defaultdict(list)
+        memberships = (
+            ClassRoom.students.through.objects
+            .filter(portaluser_id__in=[row["id"] for row in rows], classroom__teacher=teacher)
+            .order_by("classroom__class_code")
+            .values_list("portaluser_id", "classroom__class_code", "classroom__title")
         )
-        .values("student_full_name", "student_username", "student_maintained_by", "classroom")
+        for student_id, code, title in memberships:
+            classes[student_id].append({"class_code": code, "title": title})
+        for row in rows:
+            row["classes"] = classes[row["id"]]
+
+    count, count_is_estimate = None, False
+    if not cursor:
+        if next_cursor is None:
+            count = len(rows)
+        else:
+            count, count_is_estimate = queryset_count_estimate(students)
+
+    return TeacherStudentPage(
+        students=rows, next_cursor=next_cursor, count=count, count_is_estimate=count_is_estimate
     )
 
-    return queryset
-
 
 
 def get_teacher_classroom_list(*, exclude: str, teacher_user: User) -> list:
@@ -116,6 +186,9 @@ def get_teacher_classroom_list(*, exclude: str, teacher_user: User) -> list:
     Returns a list of classrooms associated with a given teacher, excluding
     the classroom with the specified class_code.
     """
+    # classroom.selectors imports this module
+    from courses_apps.classroom.selectors import classroom_student_count_expression
+
     teacher = teacher_get_from_user(user=teacher_user)
     if not teacher:
         raise DjangoValidationError(_("Teacher does not exist."))
@@ -123,14 +196,20 @@ def get_teacher_classroom_list(*, exclude: str, teacher_user: User) -> list:
     queryset = (
         ClassRoom.objects.filter(teacher=teacher)
         .exclude(class_code=exclude)
-        .prefetch_related("students")
         .annotate(
             classroom_title=F("title"),
             classroom_code=F("class_code"),
-            student_count=Count("students"),
+            classroom_student_count=classroom_student_count_expression(),
         )
-        .values("classroom_title", "classroom_code", "student_count")
-        .order_by("-student_count")
+        .values("classroom_title", "classroom_code", "classroom_student_count")
+        .order_by("-classroom_student_count")
     )
     
-    return list(queryset)
\ No newline at end of file
+    return [
+        {
+            "classroom_title": row["classroom_title"],
+            "classroom_code": row["classroom_code"],
+            "student_count": row["classroom_student_count"],
+        }
+        for row in queryset
+    ]
\ No newline at end of file
@@ -4,18 +4,19 @@ from django.core.exceptions import ValidationError as DjangoValidationError
 from django.db import transaction
 from django.utils.translation import gettext as _
 from rest_framework.exceptions import ValidationError
-from rest_framework_simplejwt.tokens import RefreshToken
+from courses_apps.account.tokens import PortalRefreshToken
 from courses_apps.account.services import user_signup
 from .models import Teacher
-from courses_apps.account.helpers import construct_username_from_email
+from courses_apps.account.helpers import (
+    construct_email_for_child, construct_username_from_email, retry_on_unique_violation,
+)
 from django.contrib.auth import get_user_model
 from courses_apps.teacher.selectors import (
     teacher_get_from_email, teacher_get_from_user, teacher_get_all_students, student_get_from_username, check_learner_account_created_by, 
     get_user_detail_for_student
 )
 from courses_apps.learner.models import Learner
-from courses_apps.account.selectors import user_get_from_username, user_email_get_from_user, get_user_roles_by_user, check_verification_requirement
-from .helpers import construct_email_for_child
+from courses_apps.account.selectors import user_email_get_from_user, get_user_roles_by_user, check_verification_requirement
 
 User = get_user_model()
 
@@ -45,18 +46,19 @@ def teacher_signup(
         verification_required: bool
 
     user_type = "teacher"
-    username = construct_username_from_email(email=email)
     try:
-        user = user_signup(
+        # the username is allocated again if a concurrent signup takes it first
+        user = retry_on_unique_violation(lambda: user_signup(
             full_name=full_name,
-            username=username,
+            username=construct_username_from_email(email=email),
             email=email,
             password=password,
             confirm_password=confirm_password,
             user_type=user_type,
-        )
+        ))
     except ValidationError as e:
         raise ValidationError(detail=_(e.detail[0]))
+    username = user.username
     
     try:
         teacher = Teacher(user=user)
@@ -66,7 +68,7 @@ def teacher_signup(
     
     teacher.save()
 
-    token = RefreshToken.for_user(user)
+    token = PortalRefreshToken.for_user(user)
     refresh_token = str(token)
     access_token = str(token.access_token)
 
@@ -102,24 +104,25 @@ def student_signup(*, teacher_user: User, full_name: str, username: str, passwor
     user_type = "learner"
     teacher_email = user_email_get_from_user(user=teacher_user) 
     username = username.lower()
-    user_email = construct_email_for_child(username=username, email=teacher_email)
     try:
-        user = user_signup(
+        # the email is allocated again if a concurrent signup takes it first
+        user = retry_on_unique_violation(lambda: user_signup(
             username=username,
             full_name=full_name,
-            email=user_email,
+            email=construct_email_for_child(username=username, email=teacher_email),
             password=password,
             confirm_password=password,
             user_type=user_type,
             bypass_flag=True
-        )
+        ))
+        user_email = user.email
         print(f"Full student user object: {user}")
     except ValidationError as e:
         raise ValidationError(detail=_(e.detail[0]))
     if len(password) < 8:
         raise ValidationError(detail=_("Password must be at least 8 characters long."))
     
-    student = Learner(user=user, created_by=teacher_user, account_created_by="TEACHER")
+    student = Learner(user=user, account_maintained_by="TEACHER")
     student.full_clean()
     student.save()
 
@@ -127,8 +130,8 @@ def student_signup(*, teacher_user: User, full_name: str, username: str, passwor
     if teacher is None:
         raise ValidationError(detail=_("Teacher does not exist."))
     
-    teacher.students.add(student)
-    teacher.save()
+    # Teacher.students holds the users of the students
+    teacher.students.add(user)
     
     print(f"is_verified from user: {user.is_verified}")
 
@@ -150,16 +153,15 @@ def student_update(*, user: User, student_username: str, **kwargs) -> Learner:
     """
     teacher = teacher_get_from_user(user=user)
     student = student_get_from_username(username=student_username)
-    student_user = student.user
-    student_account_creator = check_learner_account_created_by(learner=student)
     password = kwargs.get("password", None)
     kwargs_keys = kwargs.keys()
 
-
-    if not student in teacher_get_all_students(teacher=teacher):
-        raise ValidationError(detail=_("student does not belong to the teacher."))
     if student is None:
         raise ValidationError(detail=_("student does not exist."))
+    student_user = student.user
+    student_account_creator = check_learner_account_created_by(learner=student)
+    if not teacher_get_all_students(teacher=teacher).filter(pk=student_user.pk).exists():
+        raise ValidationError(detail=_("student does not belong to the teacher."))
     if student_account_creator == 'LEARNER':
         raise ValidationError(detail=_("Teacher cannot modify this student."))
     if password is not None:
@@ -184,7 +186,7 @@ def student_update(*, user: User, student_username: str, **kwargs) -> Learner:
     return user_details
 
 @transaction.atomic
-def teacher_remove_student(*, teacher: Teacher, student: Learner) -> bool:
+def teacher_remove_student(*, teacher: Teacher, student: User) -> bool:
     """
     Removes a student from a teacher's list of students.
     """
@@ -200,20 +202,19 @@ def student_delete(*, user: User, student_username: str) -> bool:
     Deletes the student user.
     """
     student = student_get_from_username(username=student_username)
-    student_user = user_get_from_username(username=student_username)
     teacher = teacher_get_from_user(user=user)
-    student_account_creator = check_learner_account_created_by(learner=student)
     if student is None:
         raise ValidationError(detail=_("student does not exist."))
     if teacher is None:
         raise ValidationError(detail=_("teacher does not exist."))
-    if not student in teacher_get_all_students(teacher=teacher):
+    student_account_creator = check_learner_account_created_by(learner=student)
+    if not teacher_get_all_students(teacher=teacher).filter(pk=student.user_id).exists():
         raise ValidationError(detail=_("student does not belong to the teacher."))
     if student_account_creator == 'LEARNER':
         raise ValidationError(detail=_("teacher cannot modify this student."))
 
-    is_removed = teacher_remove_student(teacher=teacher, student=student)
+    is_removed = teacher_remove_student(teacher=teacher, student=student.user)
+    # the learner is deleted with its user
     student.user.delete()
-    student.delete()
     return is_removed
 
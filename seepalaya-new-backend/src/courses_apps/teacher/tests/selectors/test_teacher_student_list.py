@@ -0,0 +1,79 @@
+from django.db import connection
+from django.test import TestCase
+from rest_framework.exceptions import ValidationError
+from courses_apps.account.models import PortalUser
+from courses_apps.classroom.models import ClassRoom
+from courses_apps.learner.models import Learner
+from courses_apps.teacher.models import Teacher
+from courses_apps.teacher.selectors import teacher_student_list
+
+
+class TeacherStudentListTestCase(TestCase):
+
+    def setUp(self):
+        self.teacher_user = PortalUser.objects.create_user(
+            username="teacher1", email="teacher1@example.com", password="password", full_name="John Doe",
+        )
+        self.teacher = Teacher.objects.create(user=self.teacher_user)
+        other_teacher_user = PortalUser.objects.create_user(
+            username="teacher2", email="teacher2@example.com", password="password", full_name="Jane Doe",
+        )
+        other_teacher = Teacher.objects.create(user=other_teacher_user)
+
+        self.students = PortalUser.objects.bulk_create([
+            PortalUser(username=f"student{i}", email=f"student{i}@example.com", full_name=f"Student {name}")
+            for i, name in enumerate(["Asha", "Bikash", "Chandra", "Deepa", "Esha"])
+        ])
+        Learner.objects.bulk_create([
+            Learner(user=student, account_maintained_by="TEACHER") for student in self.students
+        ])
+        self.teacher.students.add(*self.students)
+
+        classrooms = ClassRoom.objects.bulk_create([
+            ClassRoom(title=f"Class {code}", class_code=code, teacher=self.teacher) for code in ["C3", "C1", "C2"]
+        ])
+        for classroom in classrooms:
+            classroom.students.add(self.students[0])
+        classrooms[1].students.add(self.students[1])
+        # classrooms of another teacher are not listed
+        ClassRoom.objects.create(title="Other Class", class_code="X1", teacher=other_teacher).students.add(self.students[0])
+
+    def test_one_row_per_student(self):
+        # the teacher and the page, the classrooms are fetched separately without ArrayAgg
+        with self.assertNumQueries(2 if connection.vendor == "postgresql" else 3):
+            page = teacher_student_list(user=self.teacher_user)
+
+        self.assertEqual([student["student_full_name"] for student in page.students], [
+            "Student Asha", "Student Bikash", "Student Chandra", "Student Deepa", "Student Esha",
+        ])
+        self.assertEqual(page.students[0]["classes"], [
+            {"class_code": "C1", "title": "Class C1"},
+            {"class_code": "C2", "title": "Class C2"},
+            {"class_code": "C3", "title": "Class C3"},
+        ])
+        self.assertEqual(page.students[1]["classes"], [{"class_code": "C1", "title": "Class C1"}])
+        self.assertEqual(page.students[2]["classes"], [])
+        self.assertEqual(page.students[0]["student_maintained_by"], "TEACHER")
+        self.assertEqual((page.next_cursor, page.count), (None, 5))
+
+    def test_pages(self):
+        page = teacher_student_list(user=self.teacher_user, page_size=2)
+        usernames = [student["student_username"] for student in page.students]
+        while page.next_cursor:
+            page = teacher_student_list(user=self.teacher_user, page_size=2, cursor=page.next_cursor)
+            usernames += [student["student_username"] for student in page.students]
+
+        self.assertEqual(usernames, [student.username for student in self.students])
+
+    def test_class_filter_keeps_every_class_of_the_student(self):
+        page = teacher_student_list(user=self.teacher_user, class_code="C2")
+
+        self.assertEqual([student["student_username"] for student in page.students], ["student0"])
+        self.assertEqual([room["class_code"] for room in page.students[0]["classes"]], ["C1", "C2", "C3"])
+
+        page = teacher_student_list(user=self.teacher_user, class_code="X1")
+        self.assertEqual(page.students, [])
+
+    def test_not_a_teacher(self):
+        with self.assertRaises(ValidationError):
+            teacher_student_list(user=self.students[0])
@@ -260,22 +260,39 @@ class TeacherStudentCreationAPIView(APIView):
 class StudentListAPIView(APIView):
     permission_classes = [IsAuthenticated, IsTeacher]
 
+    class StudentListFilterSerializer(serializers.Serializer):
+        class_code = serializers.CharField(required=False, allow_blank=True)
+        cursor = serializers.CharField(required=False, allow_blank=True)
+        page_size = serializers.IntegerField(required=False, min_value=1, max_value=200)
+
     class StudentListOutputSerializer(serializers.Serializer):
+        class StudentClassSerializer(serializers.Serializer):
+            class_code = serializers.CharField()
+            title = serializers.CharField()
+
         student_full_name = serializers.CharField()
         student_username = serializers.CharField()
-        student_maintained_by = serializers.CharField()
-        classroom = serializers.CharField()
+        student_maintained_by = serializers.CharField(allow_null=True)
+        classes = StudentClassSerializer(many=True)
         # email = serializers.EmailField()
 
     def get(self, request, *args, **kwargs):
+        filter_serializer = self.StudentListFilterSerializer(data=request.query_params)
+        filter_serializer.is_valid(raise_exception=True)
+
         try:
-            queryset = teacher_student_list(user=request.user)
-            output_serializer = self.StudentListOutputSerializer(queryset, many=True)
+            students_page = teacher_student_list(user=request.user, **filter_serializer.validated_data)
+            output_serializer = self.StudentListOutputSerializer(students_page.students, many=True)
             return Response(
                 {
                     "success": True,
                     "message": "Students list fetched successfully",
                     "data": output_serializer.data,
+                    "pagination": {
+                        "next_cursor": students_page.next_cursor,
+                        "count": students_page.count,
+                        "count_is_estimate": students_page.count_is_estimate,
+                    },
                 },
                 status=status.HTTP_200_OK,
             )
@@ -30,6 +30,7 @@ urlpatterns = [
     # path("guardian/", include("courses_apps.guardian.urls")),
 
     path("classroom/", include("courses_apps.classroom.urls")),
+    path("epaath/", include("courses_apps.epaath.urls")),
 ]
 
 urlpatterns += [
@@ -0,0 +1,19 @@
+from django.conf import settings
+from courses_apps.core.housekeeping import housekeeping_job
+from .services import email_tokens_expired_delete, token_blacklist_prune
+
+
+@housekeeping_job("prune_expired_tokens")
+def prune_expired_tokens() -> int:
+    """
+    Deletes the expired outstanding refresh tokens and their blacklist entries.
+    """
+    return token_blacklist_prune(batch_size=settings.HOUSEKEEPING_BATCH_SIZE)
+
+
+@housekeeping_job("purge_expired_email_tokens")
+def purge_expired_email_tokens() -> int:
+    """
+    Deletes the expired email confirmation and email change tokens.
+    """
+    return email_tokens_expired_delete(batch_size=settings.HOUSEKEEPING_BATCH_SIZE)
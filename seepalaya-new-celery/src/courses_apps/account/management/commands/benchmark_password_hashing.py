@@ -0,0 +1,47 @@
+import time
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from courses_apps.account.helpers import generate_random_password, make_passwords
+
+class Command(BaseCommand):
+    """
+    This command compares serial password hashing against the hashing process pool
+    used when teachers create students in bulk. Nothing is written to the database.
+    running the command:
+        - python manage.py benchmark_password_hashing --roster-size 100 --rosters 5 --workers 4
+    """
+    help = 'Benchmark roster password hashing, serial vs process pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--roster-size', type=int, default=100, help='Passwords per roster')
+        parser.add_argument('--rosters', type=int, default=3, help='Number of rosters to hash')
+        parser.add_argument('--workers', type=int, default=settings.PASSWORD_HASHING_WORKERS, help='Pool size')
+
+    def handle(self, *args, **kwargs):
+        roster_size = kwargs['roster_size']
+        rosters = [
+            [generate_random_password() for _ in range(roster_size)]
+            for _ in range(kwargs['rosters'])
+        ]
+
+        start = time.perf_counter()
+        for roster in rosters:
+            [make_password(password) for password in roster]
+        serial_elapsed = time.perf_counter() - start
+
+        with override_settings(PASSWORD_HASHING_WORKERS=kwargs['workers']):
+            # warm up the pool so process start-up is not counted
+            make_passwords(rosters[0][:kwargs['workers']])
+            start = time.perf_counter()
+            for roster in rosters:
+                make_passwords(roster)
+            pool_elapsed = time.perf_counter() - start
+
+        self.stdout.write(f'{len(rosters)} rosters of {roster_size} passwords')
+        self.stdout.write(f'serial:            {len(rosters) / serial_elapsed:.2f} rosters/second')
+        self.stdout.write(
+            f'pool ({kwargs["workers"]} workers): {len(rosters) / pool_elapsed:.2f} rosters/second'
+        )
+        self.stdout.write(self.style.SUCCESS(f'speedup: {serial_elapsed / pool_elapsed:.2f}x'))
@@ -0,0 +1,78 @@
+import time
+import tracemalloc
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from courses_apps.account.helpers import allocate_unique_values
+
+User = get_user_model()
+
+FIRST_NAMES = ['ram', 'sita', 'hari', 'gita', 'shyam', 'rita', 'krishna', 'anita', 'bikash', 'sunita']
+
+
+class Command(BaseCommand):
+    """
+    This command measures username/email allocation for a classroom roster against
+    user tables of increasing size. The users are created inside a transaction that
+    is rolled back, so the database is left untouched.
+    running the command:
+        - python manage.py benchmark_username_allocation --sizes 10000 100000 1000000 --roster-size 50
+    """
+    help = 'Benchmark username/email allocation against large user tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000],
+                            help='Number of existing users to benchmark against')
+        parser.add_argument('--roster-size', type=int, default=50, help='Students allocated per run')
+        parser.add_argument('--namesakes', type=int, default=200,
+                            help='Existing users sharing each roster base name')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per insert while seeding')
+
+    def handle(self, *args, **kwargs):
+        roster = [FIRST_NAMES[i % len(FIRST_NAMES)] for i in range(kwargs['roster_size'])]
+
+        for size in kwargs['sizes']:
+            with transaction.atomic():
+                self.seed_users(size, kwargs['namesakes'], kwargs['batch_size'])
+
+                # allocation used to load every username and email into memory
+                tracemalloc.start()
+                start = time.perf_counter()
+                set(User.objects.values_list('username', flat=True))
+                set(User.objects.values_list('email', flat=True))
+                full_scan_elapsed = time.perf_counter() - start
+                full_scan_peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+
+                tracemalloc.start()
+                start = time.perf_counter()
+                with CaptureQueriesContext(connection) as queries:
+                    allocate_unique_values(bases=roster, fields={'username': '', 'email': '@seepalaya.com'})
+                allocation_elapsed = time.perf_counter() - start
+                allocation_peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+
+                self.stdout.write(
+                    f'{size} users: allocation {allocation_elapsed * 1000:.1f} ms, '
+                    f'{len(queries)} queries, peak {allocation_peak / 1024:.0f} KiB | '
+                    f'loading all usernames/emails {full_scan_elapsed * 1000:.1f} ms, '
+                    f'peak {full_scan_peak / 1024:.0f} KiB'
+                )
+                transaction.set_rollback(True)
+
+    def seed_users(self, size, namesakes, batch_size):
+        """
+        Creates `size` users. The first `namesakes` users of every roster base name share
+        that name, the rest get unrelated usernames.
+        """
+        shared = len(FIRST_NAMES) * namesakes
+        for offset in range(0, size, batch_size):
+            users = []
+            for i in range(offset, min(offset + batch_size, size)):
+                if i < shared:
+                    username = f'{FIRST_NAMES[i % len(FIRST_NAMES)]}{i // len(FIRST_NAMES) or ""}'
+                else:
+                    username = f'learner{i}'
+                users.append(User(username=username, email=f'{username}@seepalaya.com', password='!'))
+            User.objects.bulk_create(users)
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from courses_apps.account.models import DeadLetterEmail
+from courses_apps.account.services import dead_letter_emails_resend
+
+
+class Command(BaseCommand):
+    """
+    This command queues the emails that could not be delivered again, e.g. after an
+    SMTP outage or a credentials fix.
+    running the command:
+        - python manage.py resend_dead_letter_emails
+        - python manage.py resend_dead_letter_emails --email-to someone@example.com
+    """
+    help = 'Queue the dead-lettered emails again'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--email-to', type=str, help='Only the emails to this address')
+
+    def handle(self, *args, **kwargs):
+        dead_letter_emails = DeadLetterEmail.objects.all()
+        if kwargs['email_to']:
+            dead_letter_emails = dead_letter_emails.filter(email_to=kwargs['email_to'])
+        count = dead_letter_emails_resend(dead_letter_emails=dead_letter_emails)
+        self.stdout.write(self.style.SUCCESS(f"Queued {count} emails."))
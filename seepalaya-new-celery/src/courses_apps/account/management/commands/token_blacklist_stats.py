@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from courses_apps.account.selectors import token_blacklist_stats
+from courses_apps.account.services import token_blacklist_prune
+
+
+class Command(BaseCommand):
+    """
+    This command prints the size of the token blacklist tables, optionally after
+    deleting the expired tokens the way the prune_expired_tokens housekeeping job does.
+    running the command:
+        - python manage.py token_blacklist_stats
+        - python manage.py token_blacklist_stats --prune --batch-size 5000
+    """
+    help = 'Print the size of the token blacklist tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prune', action='store_true', help='Delete the expired tokens first')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Tokens deleted per transaction')
+
+    def handle(self, *args, **kwargs):
+        if kwargs['prune']:
+            deleted = token_blacklist_prune(batch_size=kwargs['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired tokens."))
+
+        for name, value in token_blacklist_stats().items():
+            self.stdout.write(f"{name}: {value}")
@@ -0,0 +1,28 @@
+# Generated by Django 4.2 on 2026-10-18 14:27
+
+import courses_apps.account.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0005_alter_portaluser_full_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LazyPortalUser',
+            fields=[
+            ],
+            options={
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('account.portaluser',),
+            managers=[
+                ('objects', courses_apps.account.models.UserManager()),
+            ],
+        ),
+    ]
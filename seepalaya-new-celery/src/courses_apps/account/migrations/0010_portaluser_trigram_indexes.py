@@ -0,0 +1,42 @@
+from django.db import migrations
+
+# Trigram GIN indexes serving full_name__icontains/username__icontains, which Django
+# compiles to UPPER(column::text) LIKE UPPER(%s), hence the indexed expression.
+TRIGRAM_INDEXES = {
+    'account_portaluser_full_name_trgm': 'full_name',
+    'account_portaluser_username_trgm': 'username',
+}
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            # the indexes only speed the search up, servers built without contrib do without
+            return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm;')
+    for name, column in TRIGRAM_INDEXES.items():
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON account_portaluser '
+            f'USING gin (UPPER({column}::text) gin_trgm_ops);'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name};')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0009_email_token_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
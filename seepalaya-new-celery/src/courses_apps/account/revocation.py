@@ -0,0 +1,124 @@
+import hashlib
+import math
+import threading
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+TOKEN_BLACKLIST_VERSION_KEY = "account:token_blacklist:version"
+
+# rows blacklisted this long before the last sync are read again, so a row committed
+# out of order with its blacklisted_at is still picked up
+SYNC_OVERLAP = timedelta(minutes=5)
+
+
+class BloomFilter:
+    """
+    Set membership with false positives but no false negatives, in a fraction of the
+    memory a set of the same strings takes.
+    """
+
+    def __init__(self, *, capacity: int, error_rate: float = 0.01):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, value: str):
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little")
+        return ((first + i * second) % self.size for i in range(self.hash_count))
+
+    def add(self, value: str) -> None:
+        for position in self._positions(value):
+            self.bits[position // 8] |= 1 << (position % 8)
+        self.count += 1
+
+    def __contains__(self, value: str) -> bool:
+        return all(self.bits[position // 8] & (1 << (position % 8)) for position in self._positions(value))
+
+
+def token_blacklist_version_get() -> int:
+    """
+    Returns the current version of the token blacklist, bumped whenever a token is
+    blacklisted. It is kept in the shared cache, so every process sees a bump on its next
+    check. The key also expires every TOKEN_REVOCATION_SYNC_INTERVAL seconds, which
+    catches up with tokens blacklisted without a bump, e.g. by bulk inserts.
+    """
+    shared_cache = caches["shared"]
+    version = shared_cache.get(TOKEN_BLACKLIST_VERSION_KEY)
+    if version is None:
+        shared_cache.add(TOKEN_BLACKLIST_VERSION_KEY, time.time_ns(), timeout=settings.TOKEN_REVOCATION_SYNC_INTERVAL)
+        version = shared_cache.get(TOKEN_BLACKLIST_VERSION_KEY)
+    return version if version is not None else time.time_ns()
+
+
+def token_blacklist_version_bump() -> None:
+    """
+    Tells every process that a token was blacklisted.
+    """
+    try:
+        caches["shared"].incr(TOKEN_BLACKLIST_VERSION_KEY)
+    except ValueError:
+        # no version cached, a freshly seeded one differs from every process' version
+        token_blacklist_version_get()
+
+
+class TokenRevocationFilter:
+    """
+    Answers whether a refresh token is blacklisted without a query in the common case.
+
+    Each process keeps a Bloom filter of the jtis of the blacklisted, unexpired tokens.
+    It reads the rows blacklisted since its last sync only when the blacklist version
+    in the shared cache has moved. A jti missing from the filter is not blacklisted. A jti in
+    the filter is confirmed with the database, since the filter has false positives.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._filter = None
+        self._version = None
+        self._synced_at = None
+
+    def is_blacklisted(self, jti: str) -> bool:
+        self.sync()
+        if jti not in self._filter:
+            return False
+        return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+    def add(self, jti: str) -> None:
+        """
+        Adds a token blacklisted by this process, without waiting for the next sync.
+        """
+        if self._filter is not None:
+            self._filter.add(jti)
+
+    def sync(self) -> None:
+        version = token_blacklist_version_get()
+        if version == self._version:
+            return
+        with self._lock:
+            if version == self._version:
+                return
+            now = timezone.now()
+            blacklisted = BlacklistedToken.objects.filter(token__expires_at__gt=now)
+            if self._filter is None or self._filter.count >= self._filter.capacity:
+                # (re)built from every unexpired token, which also forgets the expired ones
+                jtis = list(blacklisted.values_list("token__jti", flat=True))
+                self._filter = BloomFilter(capacity=max(settings.TOKEN_REVOCATION_FILTER_CAPACITY, 2 * len(jtis)))
+            else:
+                jtis = blacklisted.filter(
+                    blacklisted_at__gte=self._synced_at - SYNC_OVERLAP
+                ).values_list("token__jti", flat=True)
+            for jti in jtis:
+                if jti not in self._filter:
+                    self._filter.add(jti)
+            self._synced_at = now
+            self._version = version
+
+
+token_revocation_filter = TokenRevocationFilter()
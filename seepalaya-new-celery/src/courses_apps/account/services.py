@@ -2,28 +2,34 @@ import logging
 from dataclasses import dataclass
 from typing import List, Optional
 from .models import (
-    PortalUser, EmailConfirmationToken, UserRoles
+    PortalUser, EmailConfirmationToken, UserRoles, DeadLetterEmail, ChangeEmailAddressToken,
+    EMAIL_TOKEN_LIFETIME,
 )
 from django.conf import settings
 from django.db import transaction
+from django.db.models import Q
 from django.contrib.auth import get_user_model
 from django.utils.crypto import get_random_string
 from rest_framework.exceptions import APIException, ValidationError
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError as DjangoValidationError
 from django.utils.translation import gettext_lazy as _
-from rest_framework_simplejwt.tokens import RefreshToken
+from django.core.cache import caches
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+from .tokens import PortalRefreshToken
+from courses_apps.core.housekeeping import queryset_delete_in_batches
 from .helpers import (
     send_email_confirmation, identify_email_or_username, send_reset_password_link,
+    make_passwords, send_emails,
 )
 from .selectors import (
     user_get_from_username, user_get_from_email, token_get_from_user_and_incoming_token, user_email_get_from_user,
     email_confirmation_token_get_from_user, get_user_role_by_name, get_username_from_user, get_user_roles_by_user,
     check_if_email_is_taken,
     profile_picture_get_from_uid,
-    check_verification_requirement
+    check_verification_requirement, user_role_names_cache_key, user_get_for_login, get_user_role_names,
 )
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from rest_framework import status
 
 logger = logging.getLogger('django.server')
@@ -117,11 +123,13 @@ def user_login(*, username_or_email: str, password: str) -> tuple:
         superuser: bool
         verification_required: bool
     
+    # one query for the user and their profiles, one for the roles and issuing the token
+    # inserts its outstanding token row, three queries
     credential_type = identify_email_or_username(credential=username_or_email)
     if credential_type == "email":
-        user = user_get_from_email(email=username_or_email.lower())
+        user = user_get_for_login(email=username_or_email.lower())
     else:
-        user = user_get_from_username(username=username_or_email.lower())
+        user = user_get_for_login(username=username_or_email.lower())
 
     if user is None:
         raise ValidationError(detail=_("Invalid credentials."))
@@ -133,14 +141,14 @@ def user_login(*, username_or_email: str, password: str) -> tuple:
     user_email = user.email
     full_name = user.full_name
     is_verified = user.is_verified
-    user_type = get_user_roles_by_user(user=user)
+    # read from the database, the roles claim of the new token must not inherit a stale cache
+    user_type = get_user_role_names(user_id=user.pk, use_cache=False)
     staff = user.is_staff
     superuser = user.is_superuser
+    # the teacher and learner profiles are already loaded, so this runs no query
     verification_required = check_verification_requirement(user=user)
 
-    print(user_type)
-
-    token = RefreshToken.for_user(user)
+    token = PortalRefreshToken.for_user(user, role_names=user_type)
     access_token = str(token.access_token)
     refresh_token = str(token)
 
@@ -314,62 +322,140 @@ def change_email_address_token_send(*, user:PortalUser) -> EmailConfirmationToke
 @transaction.atomic
 def batch_create_users(users: List[dict]) -> List[PortalUser]:
     """
-    Batch creates users and returns a list of PortalUser objects.
+    Batch creates users and returns a list of PortalUser objects in the given order.
+    The whole batch is validated up front, then the users and their roles are
+    inserted in bulk so the number of queries does not grow with the batch size.
     """
-    created_users = []
-
-    def create_user(user_data):
-        username = user_data['username']
-        email = user_data['email']
-        password = user_data['password']
-        user_type = user_data['user_type']
-        full_name = user_data['full_name']
-
-        verification_status = True
-
-        # Check for existing user and raise a validation error.
-        existing_user = check_if_email_is_taken(email=email.lower())
-        if existing_user:
+    if not users:
+        return []
+
+    usernames = [user_data['username'].lower() for user_data in users]
+    emails = [user_data['email'].lower() for user_data in users]
+
+    # Check for duplicates within the batch itself.
+    if len(set(usernames)) != len(usernames):
+        raise DjangoValidationError(_("Usernames in the batch must be unique."))
+    if len(set(emails)) != len(emails):
+        raise DjangoValidationError(_("Emails in the batch must be unique."))
+
+    # Check for existing users with a single query and raise a validation error.
+    existing_user = (
+        User.objects.filter(Q(username__in=usernames) | Q(email__in=emails))
+        .values_list("username", "email")
+        .first()
+    )
+    if existing_user is not None:
+        existing_username, existing_email = existing_user
+        if existing_email in emails:
             raise DjangoValidationError(_("User with the email already exists."))
-        
-        existing_username = user_get_from_username(username=username.lower())
-        if existing_username is not None:
-            raise DjangoValidationError(f"User with the username `{username}` already exists.")
+        raise DjangoValidationError(f"User with the username `{existing_username}` already exists.")
+
+    # Hash all the passwords at once, spread over the hashing process pool
+    hashed_passwords = make_passwords([user_data['password'] for user_data in users])
 
+    new_users = []
+    for user_data, username, email, hashed_password in zip(users, usernames, emails, hashed_passwords):
         user = User(
-            full_name=full_name,
-            username=username.lower(),
-            email=email.lower(),
-            is_verified=verification_status,
+            full_name=user_data['full_name'],
+            username=username,
+            email=email,
+            password=hashed_password,
+            is_verified=True,
         )
-
         try:
-            user.set_password(password)
-            user.full_clean()
-            user.save()
+            # uniqueness has already been checked for the whole batch above
+            user.full_clean(validate_unique=False)
         except DjangoValidationError as e:
             raise DjangoValidationError(e.messages[0])
+        new_users.append(user)
 
-        # Assign user role
-        try:
-            user_role = get_user_role_by_name(user_type=user_type)
-            user.roles.add(user_role)
-            user.save()
-        except UserRoles.DoesNotExist:
-            raise DjangoValidationError(detail=_("User role does not exist."))
-
-        return user
-
-    # Using ThreadPoolExecutor to create users asynchronously
-    with ThreadPoolExecutor() as executor:
-        futures = [executor.submit(create_user, user_data) for user_data in users]
-
-        for future in as_completed(futures):
-            try:
-                created_user = future.result()
-                created_users.append(created_user)
-            except Exception as e:
-                # Handle exceptions raised during user creation
-                print(f"Error creating user: {str(e)}")
-
-    return created_users
\ No newline at end of file
+    created_users = User.objects.bulk_create(new_users)
+
+    # Assign user roles
+    user_roles = {
+        user_type: get_user_role_by_name(user_type=user_type)
+        for user_type in {user_data['user_type'] for user_data in users}
+    }
+    UserRolesRelation = User.roles.through
+    UserRolesRelation.objects.bulk_create([
+        UserRolesRelation(portaluser_id=user.pk, userroles_id=user_roles[user_data['user_type']].pk)
+        for user, user_data in zip(created_users, users)
+    ])
+
+    return created_users
+
+
+def user_roles_cache_refresh(*, user_ids: List[int]) -> None:
+    """
+    Rewrites the cached role names of the given users after their roles changed.
+    The fresh value is cached for the lifetime of an access token so it outlives any
+    roles claim minted before the change.
+    """
+    role_names = {user_id: [] for user_id in user_ids}
+    user_roles = User.roles.through.objects.filter(portaluser_id__in=user_ids) \
+        .values_list("portaluser_id", "userroles__name")
+    for user_id, role_name in user_roles:
+        role_names[user_id].append(role_name)
+
+    caches["shared"].set_many(
+        {user_role_names_cache_key(user_id=user_id): names for user_id, names in role_names.items()},
+        timeout=settings.USER_ROLES_CACHE_TIMEOUT,
+    )
+
+
+def token_blacklist_prune(*, batch_size: int = 1000) -> int:
+    """
+    Deletes the expired outstanding tokens together with their blacklist entries, an
+    expired token is rejected on its expiry alone. Works through batch_size tokens per
+    transaction so the tables are never locked for long. Returns the number deleted.
+    """
+    return queryset_delete_in_batches(
+        OutstandingToken.objects.filter(expires_at__lt=timezone.now()), batch_size=batch_size
+    )
+
+
+def email_tokens_expired_delete(*, batch_size: int = 1000) -> int:
+    """
+    Deletes the email confirmation and change tokens that expired more than
+    EMAIL_TOKEN_PURGE_AFTER ago, until then user_verify can still tell the user that
+    the link expired rather than that it is invalid. Returns the number deleted.
+    """
+    cutoff = timezone.now() - EMAIL_TOKEN_LIFETIME - settings.EMAIL_TOKEN_PURGE_AFTER
+    return sum(
+        queryset_delete_in_batches(model.objects.filter(created_time__lt=cutoff), batch_size=batch_size)
+        for model in (EmailConfirmationToken, ChangeEmailAddressToken)
+    )
+
+
+def dead_letter_emails_create(*, failures: list, attempts: int) -> List[DeadLetterEmail]:
+    """
+    Stores the emails that could not be delivered, failures being (payload, error) pairs.
+    """
+    return DeadLetterEmail.objects.bulk_create([
+        DeadLetterEmail(
+            subject=payload["subject"],
+            message=payload["message"],
+            email_to=payload["email_to"],
+            error=repr(error),
+            attempts=attempts,
+        )
+        for payload, error in failures
+    ])
+
+
+@transaction.atomic
+def dead_letter_emails_resend(*, dead_letter_emails) -> int:
+    """
+    Queues the given dead-lettered emails again and removes them from the store.
+    Returns the number of emails queued.
+    """
+    dead_letter_emails = list(dead_letter_emails.select_for_update())
+    if not dead_letter_emails:
+        return 0
+    payloads = [
+        {"subject": email.subject, "message": email.message, "email_to": email.email_to}
+        for email in dead_letter_emails
+    ]
+    DeadLetterEmail.objects.filter(id__in=[email.id for email in dead_letter_emails]).delete()
+    send_emails(payloads=payloads)
+    return len(payloads)
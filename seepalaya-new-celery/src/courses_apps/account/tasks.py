@@ -1,18 +1,72 @@
 import logging
+from typing import List
 from celery import shared_task
 # from celery.utils.log import get_task_logger
-from django.core.mail import send_mail
 from django.conf import settings
+from .mailer import (
+    EmailBatchAborted, EmailPayload, email_error_is_permanent, email_retry_countdown, pooled_email_connection,
+)
 
 logger = logging.getLogger('django.errors')
 
 
+def deliver_emails(task, payloads: List[EmailPayload]) -> List[EmailPayload]:
+    """
+    Sends the payloads over the worker's pooled connection. The ones refused for good,
+    or still failing on the task's last attempt, are moved to the dead-letter store.
+    When the session fails, e.g. the server is down or refused our login, the unsent
+    rest of the batch is retried as a whole. Returns the ones to retry.
+    """
+    from .services import dead_letter_emails_create
+
+    try:
+        failed = pooled_email_connection.send(payloads)
+        unsent = []
+    except EmailBatchAborted as e:
+        failed = e.failed
+        unsent = [(payload, e.error) for payload in e.unsent]
+    if not failed and not unsent:
+        return []
+    last_attempt = task.request.retries >= settings.EMAIL_MAX_RETRIES
+    dead = [(payload, e) for payload, e in failed if last_attempt or email_error_is_permanent(e)]
+    retry = [payload for payload, e in failed if not (last_attempt or email_error_is_permanent(e))]
+    if last_attempt:
+        dead += unsent
+    else:
+        retry += [payload for payload, _ in unsent]
+    if dead:
+        dead_letter_emails_create(failures=dead, attempts=task.request.retries + 1)
+    if retry:
+        logger.error(f'CELERY - Could not send {len(retry)} emails, retrying: {(unsent or failed)[0][1]!r}')
+    return retry
+
+
 @shared_task(bind=True, name='send_email_task')
 def send_email_task(self, subject, message, email_to):
-    try:
-        print('sending email')
-        print(f"email:{email_to}")
-        send_mail(subject, message, settings.EMAIL_HOST_USER, [email_to], fail_silently=False)
-    except Exception as e:
-        logger.error('CELERY - Exception raised while sending email')
-        raise self.retry(exc=e, countdown=60)
+    """
+    Sends one email. Emails are queued as send_email_batch_task, this task still
+    delivers messages queued before that.
+    """
+    payload = {"subject": subject, "message": message, "email_to": email_to}
+    if deliver_emails(self, [payload]):
+        raise self.retry(
+            countdown=email_retry_countdown(retries=self.request.retries),
+            max_retries=settings.EMAIL_MAX_RETRIES,
+        )
+
+
+@shared_task(bind=True, name='send_email_batch_task')
+def send_email_batch_task(self, payloads):
+    """
+    Sends a batch of emails in one SMTP session, only the failed ones are retried.
+    Queued by send_emails in chunks of EMAIL_BATCH_SIZE.
+    """
+    retry = deliver_emails(self, payloads)
+    if retry:
+        raise self.retry(
+            args=[retry],
+            countdown=email_retry_countdown(retries=self.request.retries),
+            max_retries=settings.EMAIL_MAX_RETRIES,
+        )
+    return len(payloads)
+
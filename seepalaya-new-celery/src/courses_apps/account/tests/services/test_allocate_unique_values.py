@@ -0,0 +1,102 @@
+from django.db import IntegrityError
+from django.test import TestCase
+from courses_apps.account.helpers import (
+    allocate_unique_values, construct_username_from_email, retry_on_unique_violation,
+)
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+FIELDS = {'username': '', 'email': '@seepalaya.com'}
+
+
+class AllocateUniqueValuesTestCase(TestCase):
+
+    def create_user(self, username, email=None):
+        return User.objects.create(username=username, email=email or f'{username}@example.com')
+
+    def test_allocate_unique_values_free_base(self):
+        allocated = allocate_unique_values(bases=['ramesh'], fields=FIELDS)
+        self.assertEqual(allocated, [{'username': 'ramesh', 'email': 'ramesh@seepalaya.com'}])
+
+    def test_allocate_unique_values_suffixes_after_highest_taken(self):
+        self.create_user('ramesh')
+        self.create_user('ramesh7')
+        self.create_user('rameshwor')
+
+        allocated = allocate_unique_values(bases=['ramesh', 'ramesh'], fields=FIELDS)
+
+        self.assertEqual([values['username'] for values in allocated], ['ramesh8', 'ramesh9'])
+        self.assertEqual([values['email'] for values in allocated], ['ramesh8@seepalaya.com', 'ramesh9@seepalaya.com'])
+
+    def test_allocate_unique_values_email_taken(self):
+        self.create_user('someone', email='sita3@seepalaya.com')
+        self.create_user('other', email='sita@seepalaya.com')
+
+        allocated = allocate_unique_values(bases=['sita'], fields=FIELDS)
+
+        self.assertEqual(allocated, [{'username': 'sita4', 'email': 'sita4@seepalaya.com'}])
+
+    def test_allocate_unique_values_avoids_batch_collisions(self):
+        self.create_user('hari')
+        allocated = allocate_unique_values(bases=['hari', 'hari1', 'hari'], fields={'username': ''})
+        usernames = [values['username'] for values in allocated]
+        self.assertEqual(len(set(usernames)), 3)
+        self.assertEqual(usernames, ['hari1', 'hari11', 'hari2'])
+
+    def test_allocate_unique_values_one_query_per_base(self):
+        for i in range(20):
+            self.create_user(f'student{i}')
+
+        with self.assertNumQueries(2):
+            allocated = allocate_unique_values(
+                bases=['student'] * 30 + ['teacher'] * 30, fields=FIELDS
+            )
+        self.assertEqual(len({values['username'] for values in allocated}), 60)
+        self.assertFalse(User.objects.filter(username__in=[values['username'] for values in allocated]).exists())
+
+    def test_construct_username_from_email(self):
+        self.create_user('gita')
+        self.assertEqual(construct_username_from_email('Gi.ta@example.com'), 'gita1')
+
+    def test_allocate_unique_values_long_suffixes_fit_max_length(self):
+        self.create_user('hari')
+        self.create_user('hari9999999999')
+        self.create_user('harikrishn')
+        self.create_user('harikrishna')
+        self.create_user('harikrishna9999')
+
+        allocated = allocate_unique_values(bases=['hari'] * 2 + ['harikrishna'] * 3, fields={'username': ''})
+
+        usernames = [values['username'] for values in allocated]
+        self.assertEqual(usernames, ['hari10000000000', 'hari10000000001',
+                                     'harikrishn1', 'harikrishn2', 'harikrishn3'])
+        self.assertFalse(User.objects.filter(username__in=usernames).exists())
+
+    def test_allocate_unique_values_no_room_left(self):
+        self.create_user('h')
+        self.create_user('h99999999999999')
+
+        with self.assertRaises(ValueError):
+            allocate_unique_values(bases=['h'], fields={'username': ''})
+
+    def test_retry_on_unique_violation_allocates_again(self):
+        self.create_user('gita')
+        attempts = []
+
+        def create():
+            # the first attempt inserts a username a concurrent signup took after it was allocated
+            username = construct_username_from_email('gita@example.com') if attempts else 'gita'
+            attempts.append(username)
+            return self.create_user(username)
+
+        user = retry_on_unique_violation(create)
+
+        self.assertEqual(attempts, ['gita', 'gita1'])
+        self.assertEqual(user.username, 'gita1')
+
+    def test_retry_on_unique_violation_gives_up(self):
+        self.create_user('gita')
+
+        with self.assertRaises(IntegrityError):
+            retry_on_unique_violation(lambda: self.create_user('gita', email='other@example.com'))
@@ -1,68 +1,72 @@
-# from django.test import TestCase
-# from django.core.exceptions import ValidationError as DjangoValidationError
-# from unittest.mock import patch
-# from concurrent.futures import ThreadPoolExecutor
-# from courses_apps.account.models import UserRoles
-# from courses_apps.account.services import batch_create_users
-# from django.contrib.auth import get_user_model
-
-# User = get_user_model()
-
-# class BatchCreateUsersTestCase(TestCase):
-
-#     @patch('courses_apps.account.selectors.check_if_email_is_taken')
-#     @patch('courses_apps.account.selectors.user_get_from_username')
-#     @patch('courses_apps.account.selectors.get_user_role_by_name')
-#     def test_batch_create_users_success(self, mock_get_user_role_by_name, mock_user_get_from_username, mock_check_if_email_is_taken):
-#         # Mock the return values for the mocked functions
-#         mock_check_if_email_is_taken.return_value = None
-#         mock_user_get_from_username.return_value = None
-#         mock_get_user_role_by_name.return_value = UserRoles.objects.create(name='student')
-
-#         users_data = [
-#             {'username': 'user1', 'email': 'user1@example.com', 'password': 'password1', 'user_type': 'student', 'full_name': 'User One'},
-#             {'username': 'user2', 'email': 'user2@example.com', 'password': 'password2', 'user_type': 'student', 'full_name': 'User Two'}
-#         ]
-
-#         created_users = batch_create_users(users_data)
-
-#         # Assert that users are created
-#         self.assertEqual(len(created_users), 2)
-#         self.assertTrue(all(isinstance(user, User) for user in created_users))
-
-#         # Assert that usernames are lowercase
-#         self.assertEqual(created_users[0].username, 'user1')
-#         self.assertEqual(created_users[1].username, 'user2')
-
-#     @patch('courses_apps.account.selectors.check_if_email_is_taken')
-#     @patch('courses_apps.account.selectors.user_get_from_username')
-#     @patch('courses_apps.account.selectors.get_user_role_by_name')
-#     def test_batch_create_users_duplicate_email(self, mock_get_user_role_by_name, mock_user_get_from_username, mock_check_if_email_is_taken):
-#         # Mock the return value for check_if_email_is_taken to simulate existing user
-#         mock_check_if_email_is_taken.return_value = User.objects.create(username='existinguser', email='user1@example.com')
-
-#         users_data = [
-#             {'username': 'user1', 'email': 'user1@example.com', 'password': 'password1', 'user_type': 'student', 'full_name': 'User One'}
-#         ]
-
-#         with self.assertRaises(DjangoValidationError) as context_manager:
-#             batch_create_users(users_data)
-
-#         self.assertIn('User with the email already exists.', str(context_manager.exception))
-
-#     @patch('courses_apps.account.selectors.check_if_email_is_taken')
-#     @patch('courses_apps.account.selectors.user_get_from_username')
-#     @patch('courses_apps.account.selectors.get_user_role_by_name')
-#     def test_batch_create_users_duplicate_username(self, mock_get_user_role_by_name, mock_user_get_from_username, mock_check_if_email_is_taken):
-#         # Mock the return value for user_get_from_username to simulate existing user
-#         mock_user_get_from_username.return_value = User.objects.create(username='user1', email='existinguser@example.com')
-
-#         users_data = [
-#             {'username': 'user1', 'email': 'user1@example.com', 'password': 'password1', 'user_type': 'student', 'full_name': 'User One'}
-#         ]
-
-#         with self.assertRaises(DjangoValidationError) as context_manager:
-#             batch_create_users(users_data)
-
-#         self.assertIn('User with the username `user1` already exists.', str(context_manager.exception))
-
+from django.test import TestCase, override_settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from courses_apps.account.services import batch_create_users
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class BatchCreateUsersTestCase(TestCase):
+
+    def build_users(self, count, prefix='user'):
+        return [
+            {
+                'username': f'{prefix}{i}',
+                'email': f'{prefix}{i}@example.com',
+                'password': f'password{i}',
+                'user_type': 'learner',
+                'full_name': 'User Full Name',
+            }
+            for i in range(count)
+        ]
+
+    def test_batch_create_users_success(self):
+        users_data = self.build_users(2)
+        users_data[1]['username'] = 'USER1'
+
+        created_users = batch_create_users(users_data)
+
+        self.assertEqual(len(created_users), 2)
+        self.assertTrue(all(isinstance(user, User) for user in created_users))
+        # users are returned in the given order with lowercase usernames
+        self.assertEqual([user.username for user in created_users], ['user0', 'user1'])
+        self.assertTrue(created_users[0].check_password('password0'))
+        self.assertTrue(all(user.is_verified for user in created_users))
+        self.assertEqual(
+            list(User.objects.filter(roles__name='learner').order_by('username').values_list('username', flat=True)),
+            ['user0', 'user1'],
+        )
+
+    def test_batch_create_users_query_count_is_constant(self):
+        batch_create_users(self.build_users(1, prefix='warm'))
+
+        with self.assertNumQueries(6):
+            batch_create_users(self.build_users(5, prefix='small'))
+        with self.assertNumQueries(6):
+            batch_create_users(self.build_users(50, prefix='large'))
+
+    def test_batch_create_users_duplicate_email(self):
+        User.objects.create_user(username='existing', email='user1@example.com', password='password')
+
+        with self.assertRaises(DjangoValidationError) as context_manager:
+            batch_create_users(self.build_users(2))
+
+        self.assertIn('User with the email already exists.', str(context_manager.exception))
+        self.assertFalse(User.objects.filter(username='user0').exists())
+
+    def test_batch_create_users_duplicate_username(self):
+        User.objects.create_user(username='user1', email='existinguser@example.com', password='password')
+
+        with self.assertRaises(DjangoValidationError) as context_manager:
+            batch_create_users(self.build_users(2))
+
+        self.assertIn('User with the username `user1` already exists.', str(context_manager.exception))
+
+    def test_batch_create_users_duplicate_within_batch(self):
+        users_data = self.build_users(2)
+        users_data[1]['username'] = 'user0'
+
+        with self.assertRaises(DjangoValidationError):
+            batch_create_users(users_data)
+        self.assertEqual(User.objects.count(), 0)
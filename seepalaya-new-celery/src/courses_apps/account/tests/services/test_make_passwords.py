@@ -0,0 +1,40 @@
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import patch
+from django.test import TestCase, override_settings
+from django.contrib.auth.hashers import check_password
+from courses_apps.account import helpers
+from courses_apps.account.helpers import make_passwords
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class MakePasswordsTestCase(TestCase):
+
+    def setUp(self):
+        self.passwords = [f"password{i}" for i in range(7)]
+
+    def test_make_passwords_serial(self):
+        with override_settings(PASSWORD_HASHING_WORKERS=1):
+            hashed_passwords = make_passwords(self.passwords)
+        self.assertEqual(len(hashed_passwords), len(self.passwords))
+        for password, hashed_password in zip(self.passwords, hashed_passwords):
+            self.assertTrue(check_password(password, hashed_password))
+
+    def test_make_passwords_pool_preserves_order(self):
+        with override_settings(PASSWORD_HASHING_WORKERS=3):
+            hashed_passwords = make_passwords(self.passwords)
+        self.assertEqual(len(hashed_passwords), len(self.passwords))
+        for password, hashed_password in zip(self.passwords, hashed_passwords):
+            self.assertTrue(check_password(password, hashed_password))
+        self.assertEqual(len(set(hashed_passwords)), len(hashed_passwords))
+
+    def test_broken_pool_is_rebuilt(self):
+        with override_settings(PASSWORD_HASHING_WORKERS=3):
+            pool = helpers._get_password_hashing_pool(3)
+            # a killed worker breaks the pool for every later call
+            with patch.object(pool, "map", side_effect=BrokenProcessPool("worker died")):
+                hashed_passwords = make_passwords(self.passwords)
+            self.assertTrue(check_password(self.passwords[0], hashed_passwords[0]))
+
+            self.assertIsNot(helpers._get_password_hashing_pool(3), pool)
+            hashed_passwords = make_passwords(self.passwords)
+        self.assertTrue(all(check_password(p, h) for p, h in zip(self.passwords, hashed_passwords)))
@@ -0,0 +1,115 @@
+from django.urls import reverse
+from django.core.cache import cache, caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient, APIRequestFactory, APITestCase
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from django.contrib.auth import get_user_model
+from courses_apps.account.models import UserRoles
+from courses_apps.account.permissions import IsTeacher
+from courses_apps.classroom.models import ClassRoom
+from courses_apps.teacher.selectors import teacher_get_from_user
+
+User = get_user_model()
+
+
+class RolePermissionQueryCountTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        teacher_signup_data = {
+            'full_name': 'Test Teacher',
+            'email': 'test_teacher@gmail.com',
+            'password': 'strongpass@123',
+            'confirm_password': 'strongpass@123'
+        }
+        response = self.client.post(reverse('teacher:teacher_signup'), teacher_signup_data)
+        self.assertEqual(response.status_code, 201)
+        self.teacher_access_token = response.data['data']['access_token']
+        self.teacher_user = User.objects.get(email='test_teacher@gmail.com')
+        ClassRoom.objects.create(
+            title="Test Classroom",
+            class_code="TC123",
+            teacher=teacher_get_from_user(user=self.teacher_user)
+        )
+
+        # the endpoints guarded by IsTeacher, with the request issued against each
+        self.teacher_endpoints = [
+            ('post', reverse('teacher:classroom_list'), None),
+            ('get', reverse('teacher:students_list'), None),
+            ('post', reverse('classroom:classroom_details'), {'class_code': 'TC123'}),
+            ('post', reverse('classroom:get_classroom_students'), {'class_code': 'TC123'}),
+        ]
+
+    def role_queries(self, access_token, method, url, data):
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + access_token)
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(url, data, format='json')
+        # reads of the roles, from their table or from the shared cache table
+        role_queries = [query for query in queries
+                        if 'account_userroles' in query['sql'] or 'account:user_roles:' in query['sql']]
+        return response, len(queries), len(role_queries)
+
+    def test_role_claim_needs_no_role_query(self):
+        legacy_access_token = str(RefreshToken.for_user(self.teacher_user).access_token)
+        for method, url, data in self.teacher_endpoints:
+            # warm up per-process lookups so both runs are measured alike
+            self.role_queries(self.teacher_access_token, method, url, data)
+            caches["shared"].clear()
+            legacy_response, legacy_count, legacy_role_count = self.role_queries(legacy_access_token, method, url, data)
+            caches["shared"].clear()
+            response, count, role_count = self.role_queries(self.teacher_access_token, method, url, data)
+
+            self.assertNotEqual(response.status_code, status.HTTP_403_FORBIDDEN, url)
+            self.assertEqual(response.status_code, legacy_response.status_code, url)
+            self.assertGreater(legacy_role_count, 0, url)
+            self.assertEqual(role_count, 0, url)
+            self.assertLessEqual(count, legacy_count - legacy_role_count, url)
+
+    def test_permission_check_needs_no_query(self):
+        request = APIRequestFactory().post(reverse('teacher:classroom_list'))
+        request.user = self.teacher_user
+        request.auth = AccessToken(self.teacher_access_token)
+
+        with self.assertNumQueries(0):
+            self.assertTrue(IsTeacher().has_permission(request, None))
+
+    def test_roles_without_claim_are_cached(self):
+        legacy_access_token = str(RefreshToken.for_user(self.teacher_user).access_token)
+        method, url, data = self.teacher_endpoints[0]
+
+        _, _, first_role_count = self.role_queries(legacy_access_token, method, url, data)
+        response, _, second_role_count = self.role_queries(legacy_access_token, method, url, data)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(first_role_count, 4)  # a cache miss, the roles, the cache write (select, insert)
+        self.assertEqual(second_role_count, 1)  # a cache hit
+
+    def test_role_change_applies_on_token_refresh(self):
+        method, url, data = self.teacher_endpoints[0]
+        teacher_role = UserRoles.objects.get(name='teacher')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.teacher_user.roles.remove(teacher_role)
+        response = self.client.get(reverse('account:refresh_token'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response, _, role_count = self.role_queries(response.data['data']['access_token'], method, url, data)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(role_count, 0)
+
+    def test_learner_denied_by_claim(self):
+        learner_signup_data = {
+            'full_name': 'Test Learner',
+            'email': 'test_learner@gmail.com',
+            'password': 'strongpass@123',
+            'confirm_password': 'strongpass@123'
+        }
+        response = self.client.post(reverse('learner:learner_signup'), learner_signup_data)
+        learner_access_token = response.data['data']['access_token']
+
+        method, url, data = self.teacher_endpoints[0]
+        response, _, role_count = self.role_queries(learner_access_token, method, url, data)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(role_count, 0)
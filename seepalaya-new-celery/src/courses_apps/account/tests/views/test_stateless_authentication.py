@@ -0,0 +1,109 @@
+from django.urls import reverse
+from django.core.cache import cache, caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient, APIRequestFactory, APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from courses_apps.account.authentication import StatelessJWTAuthentication
+from courses_apps.classroom.models import ClassRoom
+from courses_apps.teacher.selectors import teacher_get_from_user
+
+User = get_user_model()
+
+
+class StatelessJWTAuthenticationTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        caches["local"].clear()
+        self.client = APIClient()
+        teacher_signup_data = {
+            'full_name': 'Test Teacher',
+            'email': 'test_teacher@gmail.com',
+            'password': 'strongpass@123',
+            'confirm_password': 'strongpass@123'
+        }
+        response = self.client.post(reverse('teacher:teacher_signup'), teacher_signup_data)
+        self.assertEqual(response.status_code, 201)
+        self.teacher_access_token = response.data['data']['access_token']
+        self.teacher_user = User.objects.get(email='test_teacher@gmail.com')
+        ClassRoom.objects.create(
+            title="Test Classroom",
+            class_code="TC123",
+            teacher=teacher_get_from_user(user=self.teacher_user)
+        )
+
+    def authenticate(self):
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION='Bearer ' + self.teacher_access_token)
+        user, _ = StatelessJWTAuthentication().authenticate(request)
+        return user
+
+    def test_hot_endpoints_skip_user_fetch(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + self.teacher_access_token)
+        user_fetch = f'FROM "account_portaluser" WHERE "account_portaluser"."id" = {self.teacher_user.pk}'
+        # caches the active state of the user, read once per token lifetime
+        self.authenticate()
+
+        for url, data in [
+            (reverse('classroom:get_classroom_students'), {'class_code': 'TC123'}),
+            (reverse('teacher:classroom_list'), {}),
+        ]:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(url, data, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK, url)
+            self.assertFalse([query for query in queries if user_fetch in query['sql']], url)
+
+    def test_user_fields_load_in_one_query(self):
+        user = self.authenticate()
+        self.assertEqual(user.pk, self.teacher_user.pk)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(user.username, self.teacher_user.username)
+            self.assertEqual(user.email, 'test_teacher@gmail.com')
+            self.assertFalse(user.is_verified)
+
+    def test_deleted_user(self):
+        user = self.authenticate()
+        User.objects.filter(pk=self.teacher_user.pk).delete()
+
+        with self.assertRaises(AuthenticationFailed):
+            user.username
+
+    def test_deactivated_user_is_rejected(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + self.teacher_access_token)
+        url = reverse('teacher:classroom_list')
+        self.assertEqual(self.client.post(url, {}, format='json').status_code, status.HTTP_200_OK)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.teacher_user.is_active = False
+            self.teacher_user.save()
+        response = self.client.post(url, {}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response.data['code'], 'user_inactive')
+
+    def test_deleted_user_is_rejected(self):
+        self.authenticate()
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.filter(pk=self.teacher_user.pk).delete()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_active_state_is_cached(self):
+        self.authenticate()
+
+        with self.assertNumQueries(0):
+            user = self.authenticate()
+        self.assertTrue(user.is_active)
+
+    def test_active_state_is_shared_between_processes(self):
+        self.authenticate()
+        # another process, without its own copy, reads the shared cache only
+        caches["local"].clear()
+
+        with CaptureQueriesContext(connection) as queries:
+            self.authenticate()
+        self.assertEqual(len(queries), 1)
+        self.assertIn('shared_cache', queries[0]['sql'])
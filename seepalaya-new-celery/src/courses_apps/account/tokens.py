@@ -0,0 +1,35 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+ROLES_CLAIM = "roles"
+
+
+class PortalRefreshToken(RefreshToken):
+    """
+    Refresh token carrying the user's role names, which are copied into every access
+    token derived from it so role permissions can be checked without a query.
+    The blacklist is checked through the revocation filter, so a valid token is
+    verified without a query in the common case.
+    """
+
+    def check_blacklist(self):
+        from .revocation import token_revocation_filter
+
+        if token_revocation_filter.is_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    @classmethod
+    def for_user(cls, user, role_names=None):
+        """
+        Issues a token for the user. role_names saves the role query when the caller
+        already has the user's roles.
+        """
+        from .selectors import get_user_role_names
+
+        token = super().for_user(user)
+        if role_names is None:
+            role_names = get_user_role_names(user_id=user.pk, use_cache=False)
+        token[ROLES_CLAIM] = list(role_names)
+        return token
@@ -0,0 +1,17 @@
+from django.contrib import admin
+from .models import APIRequestLog
+
+class APIRequestLogAdmin(admin.ModelAdmin):
+    list_display = ('api', 'method', 'status_code', 'execution_time', 'sample_rate', 'added_on')
+    list_filter = ('method', 'status_code')
+    search_fields = ('api',)
+    date_hierarchy = 'added_on'
+    readonly_fields = [field.name for field in APIRequestLog._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+admin.site.register(APIRequestLog, APIRequestLogAdmin)
@@ -0,0 +1,10 @@
+from courses_apps.core.housekeeping import housekeeping_job
+from .services import api_log_partitions_maintain
+
+
+@housekeeping_job("maintain_api_log_partitions")
+def maintain_api_log_partitions() -> int:
+    """
+    Creates the upcoming API log partitions and drops the expired ones.
+    """
+    return len(api_log_partitions_maintain())
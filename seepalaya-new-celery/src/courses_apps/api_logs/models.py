@@ -0,0 +1,30 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class APIRequestLog(models.Model):
+    """
+    An API request kept by the sampling rules of the API log middleware.
+    On PostgreSQL the table is range partitioned by day on added_on, see services.py.
+    """
+    id = models.BigAutoField(primary_key=True)
+    added_on = models.DateTimeField()
+    api = models.CharField(max_length=1024, help_text='API URL')
+    method = models.CharField(max_length=10)
+    status_code = models.PositiveSmallIntegerField(help_text='Response status code')
+    execution_time = models.FloatField(help_text='Server execution time in seconds')
+    sample_rate = models.FloatField(help_text='Share of matching requests that were logged, 1 for errors and slow requests')
+    client_ip_address = models.CharField(max_length=50)
+    headers = models.TextField()
+    body = models.TextField()
+    response = models.TextField()
+
+    def __str__(self):
+        return self.api
+
+    class Meta:
+        db_table = 'api_request_logs'
+        ordering = ('-added_on',)
+        indexes = [models.Index(fields=['added_on'], name='api_request_logs_added_on')]
+        verbose_name = _('API Log')
+        verbose_name_plural = _('API Logs')
@@ -0,0 +1,90 @@
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from typing import Iterable, List, Optional
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+from .helpers import encode_body, encode_data, mask_sensitive_query_params
+from .models import APIRequestLog
+from .selectors import api_log_partition_list, api_log_partition_name
+
+
+def api_log_entries_create(*, entries: List[dict]) -> List[APIRequestLog]:
+    """
+    Masks and encodes the entries collected by the API log middleware and writes them
+    with a single bulk insert. The day partitions of the entries must exist.
+    """
+    keys = settings.API_LOG_SENSITIVE_KEYS
+    logs = [
+        APIRequestLog(
+            added_on=entry["added_on"],
+            api=mask_sensitive_query_params(entry["api"], keys=keys)[:1024],
+            method=entry["method"],
+            status_code=entry["status_code"],
+            execution_time=entry["execution_time"],
+            sample_rate=entry["sample_rate"],
+            client_ip_address=entry["client_ip_address"],
+            headers=encode_data(entry["headers"], keys=keys),
+            body=encode_body(entry["body"], keys=keys),
+            response=encode_body(entry["response"], keys=keys),
+        )
+        for entry in entries
+    ]
+    return APIRequestLog.objects.bulk_create(logs)
+
+
+def api_log_partitions_ensure(*, days: Iterable[date]) -> None:
+    """
+    Creates the missing daily partitions of the API log table for the given UTC days.
+    Does nothing where the table is not partitioned.
+    """
+    if connection.vendor != "postgresql":
+        return
+    table = connection.ops.quote_name(APIRequestLog._meta.db_table)
+    for day in sorted(set(days)):
+        start = datetime.combine(day, time.min, tzinfo=dt_timezone.utc)
+        partition = connection.ops.quote_name(api_log_partition_name(day=day))
+        try:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(
+                    f"CREATE TABLE IF NOT EXISTS {partition} PARTITION OF {table} FOR VALUES FROM (%s) TO (%s)",
+                    [start, start + timedelta(days=1)],
+                )
+        except DatabaseError:
+            # another process created it at the same time
+            if day not in api_log_partition_list():
+                raise
+
+
+def api_log_partitions_drop_expired(*, today: Optional[date] = None) -> List[str]:
+    """
+    Drops the daily partitions older than API_LOG_RETENTION_DAYS and returns their names.
+    Where the table is not partitioned the expired rows are deleted instead.
+    """
+    today = today or timezone.now().date()
+    cutoff = today - timedelta(days=settings.API_LOG_RETENTION_DAYS)
+    if connection.vendor != "postgresql":
+        APIRequestLog.objects.filter(
+            added_on__lt=datetime.combine(cutoff, time.min, tzinfo=dt_timezone.utc)
+        ).delete()
+        return []
+
+    dropped = []
+    with connection.cursor() as cursor:
+        for day, name in sorted(api_log_partition_list().items()):
+            if day < cutoff:
+                cursor.execute(f"DROP TABLE IF EXISTS {connection.ops.quote_name(name)}")
+                dropped.append(name)
+    return dropped
+
+
+def api_log_partitions_maintain(*, today: Optional[date] = None) -> List[str]:
+    """
+    Creates the partitions of today and the next API_LOG_PARTITION_DAYS_AHEAD days and
+    drops the expired ones, returning the names of the dropped partitions. Run hourly by
+    the maintain_api_log_partitions housekeeping job, the log writer runs no DDL.
+    """
+    today = today or timezone.now().date()
+    api_log_partitions_ensure(
+        days=[today + timedelta(days=days) for days in range(settings.API_LOG_PARTITION_DAYS_AHEAD + 1)]
+    )
+    return api_log_partitions_drop_expired(today=today)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ClassConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'courses_apps.classroom'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,11 @@
+from django.conf import settings
+from courses_apps.core.housekeeping import housekeeping_job
+from .services import classroom_student_count_deltas_fold
+
+
+@housekeeping_job("fold_classroom_student_counts")
+def fold_classroom_student_counts() -> int:
+    """
+    Folds the recorded membership changes into the student_count of their classrooms.
+    """
+    return classroom_student_count_deltas_fold(batch_size=settings.HOUSEKEEPING_BATCH_SIZE)
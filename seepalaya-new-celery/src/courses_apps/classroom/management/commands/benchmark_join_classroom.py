@@ -0,0 +1,89 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from courses_apps.classroom.models import ClassRoom
+from courses_apps.classroom.selectors import classroom_student_count_get
+from courses_apps.classroom.services import create_classroom, join_classroom
+from courses_apps.core.dataset import DatasetSpec, dataset_user_queryset
+from courses_apps.teacher.models import Teacher
+
+
+class Command(BaseCommand):
+    """
+    This command measures learners joining one classroom by its class code at increasing
+    concurrency, like a class joining a projected code. Every concurrency level creates a
+    classroom for a teacher of the generated dataset, which its learners join, and
+    joins/second should grow in step with the number of workers, since a join only
+    inserts rows and never updates the classroom (see join_classroom). The classrooms are
+    committed, since the joins run on separate connections, and deleted afterwards. Run it
+    against PostgreSQL, SQLite serializes every write.
+    running the command:
+        - python manage.py generate_dataset
+        - python manage.py benchmark_join_classroom --joins 400 --concurrency 1 2 4 8 16 32
+    """
+    help = 'Benchmark concurrent joins of a classroom by class code'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--joins', type=int, default=400, help='Learners joining per concurrency level')
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32],
+                            help='Numbers of parallel joiners')
+        parser.add_argument('--prefix', default=DatasetSpec.prefix, help='Prefix of the generated dataset')
+
+    def handle(self, *args, **kwargs):
+        joins = kwargs['joins']
+        teacher = Teacher.objects.filter(
+            user__in=dataset_user_queryset(prefix=kwargs['prefix'], kind='teacher')
+        ).order_by('pk').first()
+        learners = list(dataset_user_queryset(prefix=kwargs['prefix'], kind='learner')[:joins])
+        if teacher is None or len(learners) < joins:
+            raise CommandError(f'The benchmark needs a dataset with a teacher and {joins} learners, '
+                               f'run python manage.py generate_dataset first.')
+
+        if connection.vendor != 'postgresql':
+            self.stdout.write(self.style.WARNING(f'{connection.vendor} serializes writes, expect no scaling'))
+        classroom_pks = []
+        try:
+            baseline = None
+            for concurrency in kwargs['concurrency']:
+                classroom = create_classroom(title=f'Join Benchmark x{concurrency}', teacher=teacher)
+                classroom_pks.append(classroom.pk)
+                elapsed, latencies = self.run(classroom.class_code, learners, concurrency)
+
+                student_count = classroom_student_count_get(classroom_id=classroom.pk)
+                if student_count != joins or classroom.students.count() != joins:
+                    self.stderr.write(f'x{concurrency}: expected {joins} students, got {student_count}')
+                throughput = joins / elapsed
+                baseline = baseline or throughput / concurrency
+                latencies.sort()
+                self.stdout.write(
+                    f'{concurrency:>3} workers: {throughput:8.1f} joins/second, '
+                    f'p50 {statistics.median(latencies) * 1000:.1f} ms, '
+                    f'p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f} ms, '
+                    f'scaling {throughput / (baseline * concurrency):.0%} of linear'
+                )
+        finally:
+            ClassRoom.objects.filter(pk__in=classroom_pks).delete()
+
+    def run(self, class_code, learners, concurrency):
+        """
+        Returns the elapsed seconds and the latency of every join of the learners,
+        spread over the given number of threads, each with its own connection.
+        """
+        def join_all(learners_slice):
+            latencies = []
+            try:
+                for learner in learners_slice:
+                    start = time.perf_counter()
+                    join_classroom(class_code=class_code, user=learner)
+                    latencies.append(time.perf_counter() - start)
+            finally:
+                connection.close()
+            return latencies
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            start = time.perf_counter()
+            results = list(executor.map(join_all, [learners[i::concurrency] for i in range(concurrency)]))
+            elapsed = time.perf_counter() - start
+        return elapsed, [latency for latencies in results for latency in latencies]
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from courses_apps.classroom.services import classroom_student_counts_reconcile
+
+
+class Command(BaseCommand):
+    """
+    This command repairs the student_count of classrooms that drifted from their actual number of students.
+    running the command:
+        - python manage.py reconcile_classroom_student_counts
+        - python manage.py reconcile_classroom_student_counts --dry-run
+    """
+    help = 'Repair the maintained student counts of classrooms'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report the drifted classrooms')
+
+    def handle(self, *args, **kwargs):
+        drifted = classroom_student_counts_reconcile(dry_run=kwargs['dry_run'])
+        for class_code, recorded, actual in drifted:
+            self.stdout.write(f"{class_code}: recorded {recorded}, actual {actual}")
+        verb = 'would be repaired' if kwargs['dry_run'] else 'repaired'
+        self.stdout.write(self.style.SUCCESS(f"{len(drifted)} classroom counts {verb}."))
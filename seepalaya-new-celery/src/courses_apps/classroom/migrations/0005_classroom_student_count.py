@@ -0,0 +1,40 @@
+# Generated by Django 4.2 on 2026-10-18 15:27
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_student_count(apps, schema_editor):
+    ClassRoom = apps.get_model('classroom', 'ClassRoom')
+    ClassRoomStudents = ClassRoom.students.through
+    counts = (
+        ClassRoomStudents.objects.filter(classroom_id=OuterRef('pk'))
+        .order_by().values('classroom_id').annotate(count=Count('pk')).values('count')
+    )
+    ClassRoom.objects.update(student_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('classroom', '0004_alter_classroom_title'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='classroom',
+            name='last_activity',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='classroom',
+            name='student_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_student_count, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='classroom',
+            index=models.Index(fields=['teacher', '-student_count'], name='classroom_teacher_count'),
+        ),
+    ]
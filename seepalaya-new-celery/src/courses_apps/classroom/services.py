@@ -1,19 +1,34 @@
 from django.db import transaction
 from rest_framework.exceptions import ValidationError
 from django.core.exceptions import ValidationError as DjangoValidationError
+import base64
+import json
+import secrets
+import zlib
+from collections import defaultdict
+from cryptography.fernet import Fernet, InvalidToken
 from dataclasses import dataclass
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
+from django.conf import settings
+from django.core import signing
+from django.core.cache import caches
+from django.db.models import Count, Exists, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+from django.utils.crypto import salted_hmac
 from .helpers import generate_usernames_emails_and_passwords
-from courses_apps.classroom.models import ClassRoom
+from courses_apps.classroom.models import ClassRoom, ClassRoomStudentCountDelta
 from courses_apps.teacher.models import Teacher
 from courses_apps.learner.models import Learner
 from courses_apps.account.services import user_signup, batch_create_users
-from courses_apps.account.selectors import user_get_from_username
+from courses_apps.account.helpers import retry_on_unique_violation
 from courses_apps.teacher.selectors import teacher_get_from_username
-from .selectors import get_classroom_from_code
-from .helpers import generate_class_code
+from .selectors import (
+    classroom_student_count_expression, get_classroom_from_code, get_classroom_id_and_title_from_code,
+)
+from .helpers import CLASS_CODE_LENGTH, generate_class_code
 
-from django.db import transaction, IntegrityError
+from django.db import connection, transaction, IntegrityError
 from django.core.exceptions import ValidationError
 import logging
 from gettext import gettext as _
@@ -24,20 +39,38 @@ User = get_user_model()
 # Set up logging
 logger = logging.getLogger(__name__)
 
+CREDENTIAL_SHEET_SALT = "classroom.credential_sheet"
+# a collision of 9 random characters is already unlikely for millions of classrooms
+CLASS_CODE_ATTEMPTS = 5
+
 @transaction.atomic
-def create_classroom(*, title: str, teacher: Teacher) -> ClassRoom:
+def create_classroom(*, title: str, teacher: Teacher, code_length: int = CLASS_CODE_LENGTH) -> ClassRoom:
     """
-    Creates a class with the provided name and teacher.
+    Creates a class with the provided name and teacher under a new random class code of
+    code_length characters. The code is not checked beforehand: a collision fails the
+    insert on the unique constraint and the classroom is inserted again with another code.
+    Any other integrity error is raised.
     """
+    classroom = ClassRoom(title=title, teacher=teacher)
     try:
-        class_code = generate_class_code()
-        classroom = ClassRoom(title=title, teacher=teacher, class_code=class_code)
-        classroom.full_clean()
-        classroom.save()
-        return classroom
+        # class_code uniqueness is left to the insert
+        classroom.full_clean(exclude=["class_code"], validate_unique=False)
     except DjangoValidationError as e:
         raise DjangoValidationError(e.messages[0])
 
+    for attempt in range(1, CLASS_CODE_ATTEMPTS + 1):
+        classroom.class_code = generate_class_code(length=code_length)
+        try:
+            with transaction.atomic():
+                classroom.save()
+            return classroom
+        except IntegrityError:
+            # only a taken class code is worth another attempt
+            if not ClassRoom.objects.filter(class_code=classroom.class_code).exists():
+                raise
+            logger.warning("Class code %s is taken, attempt %d of %d", classroom.class_code, attempt, CLASS_CODE_ATTEMPTS)
+    raise DjangoValidationError(_("Could not allocate a class code, please try again."))
+
 
 @transaction.atomic
 def update_classroom(*, class_code: str, title: str, teacher_user: str) -> dict:
@@ -78,6 +111,8 @@ def delete_classroom(*, class_code: str, teacher_user: str) -> bool:
 def student_create(class_code: str, students: List[str], teacher_user: str) -> List[Dict[str, str]]:
     """
     Signs up students and returns a list of StudentSignupDetails dictionaries.
+    The users, learner profiles and the classroom/teacher memberships are created
+    with bulk inserts, so the number of queries stays constant for any roster size.
     """
     @dataclass
     class StudentSignupDetails:
@@ -87,117 +122,322 @@ def student_create(class_code: str, students: List[str], teacher_user: str) -> L
         password: str
 
     user_type = "learner"
-    created_students = []
-    created_users = []
-
-    # Generate usernames, emails, and passwords
-    student_details = generate_usernames_emails_and_passwords(students)
-
-    # Collect user details for batch creation
-    for details in student_details:
-        created_users.append({
-            'username': details['username'],
-            'full_name': details['full_name'],
-            'email': details['email'],
-            'password': details['password'],
-            'user_type': user_type,
-            # 'bypass_flag': True  # Assuming we bypass validation for simplicity
-        })
-
-    # Batch create users asynchronously
-    created_users_objects = batch_create_users(created_users)
+
+    classroom = get_classroom_from_code(class_code=class_code)
+    if classroom is None:
+        raise ValidationError(_("Classroom does not exist."))
+
+    teacher = teacher_get_from_username(username=teacher_user)
+    if teacher is None:
+        raise ValidationError(detail=_("Teacher does not exist."))
+
+    def create_users():
+        # Generate usernames, emails, and passwords
+        student_details = generate_usernames_emails_and_passwords(students)
+
+        # Validate and create all the users at once
+        return student_details, batch_create_users([
+            {
+                'username': details['username'],
+                'full_name': details['full_name'],
+                'email': details['email'],
+                'password': details['password'],
+                'user_type': user_type,
+            }
+            for details in student_details
+        ])
+
+    # the names are allocated again if a concurrent request takes one first
+    student_details, created_users = retry_on_unique_violation(create_users)
 
     # Create students and associate with classroom and teacher
-    for user_obj, details in zip(created_users_objects, student_details):
-        user = user_obj
-
-        student = Learner(user=user, account_maintained_by="TEACHER")
-        student.full_clean()
-        student.save()
-
-        classroom = get_classroom_from_code(class_code=class_code)
-        if classroom is None:
-            raise ValidationError(_("Classroom does not exist."))
-        classroom.students.add(user)
-        classroom.save()
-
-        teacher = teacher_get_from_username(username=teacher_user)
-        if teacher is None:
-            raise ValidationError(detail=_("Teacher does not exist."))
-        teacher.students.add(user)
-        teacher.save()
-
-        created_students.append(StudentSignupDetails(
+    learners = []
+    for user in created_users:
+        learner = Learner(user=user, account_maintained_by="TEACHER")
+        learner.full_clean(exclude=["user"], validate_unique=False)
+        learners.append(learner)
+    Learner.objects.bulk_create(learners)
+
+    ClassRoomStudents = ClassRoom.students.through
+    ClassRoomStudents.objects.bulk_create([
+        ClassRoomStudents(classroom_id=classroom.pk, portaluser_id=user.pk)
+        for user in created_users
+    ])
+    # bulk_create sends no m2m_changed
+    classroom_student_count_adjust(deltas={classroom.pk: len(created_users)})
+
+    TeacherStudents = Teacher.students.through
+    TeacherStudents.objects.bulk_create([
+        TeacherStudents(teacher_id=teacher.pk, portaluser_id=user.pk)
+        for user in created_users
+    ])
+
+    return [
+        StudentSignupDetails(
             full_name=details['full_name'],
             username=details['username'],
             email=details['email'],
             password=details['password']
-        ))
+        )
+        for details in student_details
+    ]
 
-    return created_students
-
-@transaction.atomic
-def join_classroom(*, class_code: str, username: str):
+def join_classroom(*, class_code: str, user: User) -> str:
     """
-    Adds a student to a classroom with the provided class code and username.
+    Adds the user to the classroom with the provided class code and returns its title.
+    The class code is resolved from the cache and the membership insert relies on the
+    unique constraint instead of a prior check. The count is recorded as a row of its
+    own rather than an update of the classroom, so concurrent joins of a projected class
+    code only insert and never wait on each other.
     """
-    classroom = get_classroom_from_code(class_code=class_code)
-    if classroom is None:
+    classroom_details = get_classroom_id_and_title_from_code(class_code=class_code)
+    if classroom_details is None:
+        raise ValidationError(_("Classroom does not exist."))
+    classroom_id, title = classroom_details
+
+    ClassRoomStudents = ClassRoom.students.through
+    try:
+        with transaction.atomic():
+            ClassRoomStudents.objects.create(classroom_id=classroom_id, portaluser_id=user.pk)
+            # objects.create sends no m2m_changed
+            classroom_student_count_adjust(deltas={classroom_id: 1})
+    except IntegrityError:
+        if ClassRoom.objects.filter(pk=classroom_id).exists():
+            raise ValidationError(_("Student is already in the classroom."))
+        # deleted since it was cached
         raise ValidationError(_("Classroom does not exist."))
-    student = user_get_from_username(username=username)
-    check_user = classroom.students.filter(username=username)
-    if check_user.exists():
-        raise ValidationError(_("Student is already in the classroom."))
-    classroom.students.add(student)
-    classroom.save()
-    return classroom.title
+    return title
+
+
+def _classroom_students_resolve(*, classroom: ClassRoom, teacher: Teacher, usernames: List[str]) -> List[Tuple[int, str, bool]]:
+    """
+    Returns (pk, username, in the classroom) of the given students of the teacher in one
+    query, in the order of the usernames. Raises if any of them is unknown or is not a
+    student of the teacher, so nothing is changed for a partly foreign list.
+    """
+    TeacherStudents = Teacher.students.through
+    ClassRoomStudents = ClassRoom.students.through
+    usernames = list(dict.fromkeys(usernames))
+    students = {
+        username: (pk, in_classroom)
+        for pk, username, in_classroom in (
+            User.objects.filter(username__in=usernames)
+            .filter(Exists(TeacherStudents.objects.filter(teacher_id=teacher.pk, portaluser_id=OuterRef("pk"))))
+            .annotate(in_classroom=Exists(
+                ClassRoomStudents.objects.filter(classroom_id=classroom.pk, portaluser_id=OuterRef("pk"))
+            ))
+            .values_list("pk", "username", "in_classroom")
+        )
+    }
+    if len(students) != len(usernames):
+        raise ValidationError(_("The user is not a student of the teacher."))
+    return [(students[username][0], username, students[username][1]) for username in usernames]
 
 
 @transaction.atomic
-def add_students_to_classroom(*, class_code: str, students: list, teacher_user: str) -> bool:
+def add_students_to_classroom(*, class_code: str, students: list, teacher_user: str) -> Dict[str, str]:
     """
-    Adds students to a classroom with the provided class code.
+    Adds students of the teacher to a classroom with the provided class code and returns
+    whether each username was "added" or "already_in_classroom". The memberships are
+    inserted at once, so the number of queries stays constant for any number of students.
     """
     classroom = get_classroom_from_code(class_code=class_code)
     if classroom is None:
         raise ValidationError(_("Classroom does not exist."))
     teacher = teacher_get_from_username(username=teacher_user)
-    if not classroom.teacher == teacher:
+    if teacher is None or classroom.teacher_id != teacher.pk:
         raise ValidationError(_("Teacher is not the owner of the classroom."))
-    for student in students:
-        student = user_get_from_username(username=student)
-        check_teacher_student_relation = teacher.students.filter(username=student)
-        if not check_teacher_student_relation.exists():
-            raise ValidationError(_("The user is not a student of the teacher."))
-        # no need to check if student is already in the classroom causes failure of the bulk add
-        # check_user = classroom.students.filter(username=student)
-        # if check_user.exists():
-        #     raise ValidationError(_("Student is already in the classroom."))
-        classroom.students.add(student)
-        teacher.students.add(student)
-    classroom.save()
-    teacher.save()
-    return True
+
+    resolved = _classroom_students_resolve(classroom=classroom, teacher=teacher, usernames=students)
+    added_ids = set(_classroom_students_insert(
+        classroom_id=classroom.pk, student_ids=[pk for pk, _username, in_classroom in resolved if not in_classroom],
+    ))
+    # the raw insert sends no m2m_changed
+    classroom_student_count_adjust(deltas={classroom.pk: len(added_ids)})
+
+    return {
+        username: "added" if pk in added_ids else "already_in_classroom"
+        for pk, username, _in_classroom in resolved
+    }
+
+
+def _classroom_students_insert(*, classroom_id: int, student_ids: List[int]) -> List[int]:
+    """
+    Inserts the memberships of the students in the classroom and returns the ids of those
+    actually inserted. Memberships that exist, e.g. added by a concurrent request since
+    they were resolved, are skipped by the unique constraint and not returned.
+    """
+    ClassRoomStudents = ClassRoom.students.through
+    quote_name = connection.ops.quote_name
+    classroom_column = quote_name(ClassRoomStudents._meta.get_field("classroom").column)
+    student_column = quote_name(ClassRoomStudents._meta.get_field("portaluser").column)
+    batch_size = connection.ops.bulk_batch_size([classroom_column, student_column], student_ids) or 1
+    inserted_ids = []
+    with connection.cursor() as cursor:
+        for start in range(0, len(student_ids), batch_size):
+            batch = student_ids[start:start + batch_size]
+            cursor.execute(
+                f"INSERT INTO {quote_name(ClassRoomStudents._meta.db_table)} ({classroom_column}, {student_column}) "
+                f"VALUES {', '.join(['(%s, %s)'] * len(batch))} "
+                f"ON CONFLICT DO NOTHING RETURNING {student_column}",
+                [value for pk in batch for value in (classroom_id, pk)],
+            )
+            inserted_ids += [row[0] for row in cursor.fetchall()]
+    return inserted_ids
 
 @transaction.atomic
-def remove_students_from_classroom(*, class_code: str, students: list, teacher_user: str) -> bool:
+def remove_students_from_classroom(*, class_code: str, students: list, teacher_user: str) -> Dict[str, str]:
     """
-    Removes students from a classroom with the provided class code.
+    Removes students of the teacher from a classroom with the provided class code and
+    returns whether each username was "removed" or "not_in_classroom". The memberships
+    are deleted at once, so the number of queries stays constant for any number of students.
     """
     classroom = get_classroom_from_code(class_code=class_code)
     if classroom is None:
         raise ValidationError(_("Classroom does not exist."))
     teacher = teacher_get_from_username(username=teacher_user)
-    if not classroom.teacher == teacher:
+    if teacher is None or classroom.teacher_id != teacher.pk:
         raise ValidationError(_("Teacher is not the owner of the classroom."))
-    for student in students:
-        student = user_get_from_username(username=student)
-        check_teacher_student_relation = teacher.students.filter(username=student)
-        if not check_teacher_student_relation.exists():
-            raise ValidationError(_("The user is not a student of the teacher."))
-        # check_user = classroom.students.filter(username=student)
-        # if not check_user.exists():
-        #     raise ValidationError(_("Student is not in the classroom."))
-        classroom.students.remove(student)
-    classroom.save()
-    return True
+
+    resolved = _classroom_students_resolve(classroom=classroom, teacher=teacher, usernames=students)
+    member_ids = [pk for pk, _username, in_classroom in resolved if in_classroom]
+
+    if member_ids:
+        ClassRoomStudents = ClassRoom.students.through
+        # QuerySet.delete() sends no m2m_changed, the deleted rows are counted instead
+        deleted, _deleted_per_model = ClassRoomStudents.objects.filter(
+            classroom_id=classroom.pk, portaluser_id__in=member_ids
+        ).delete()
+        classroom_student_count_adjust(deltas={classroom.pk: -deleted})
+
+    return {
+        username: "removed" if in_classroom else "not_in_classroom"
+        for _pk, username, in_classroom in resolved
+    }
+
+
+def classroom_student_count_adjust(*, deltas: Dict[int, int]) -> None:
+    """
+    Records the given number of students, negative for removals, joining or leaving each
+    classroom keyed by primary key. The changes are inserted as ClassRoomStudentCountDelta
+    rows instead of updating the classrooms, so concurrent membership changes of a
+    classroom never lose an update nor wait on each other. Read the number of students
+    with classroom_student_count_expression.
+    """
+    ClassRoomStudentCountDelta.objects.bulk_create([
+        ClassRoomStudentCountDelta(classroom_id=classroom_id, delta=delta)
+        for classroom_id, delta in deltas.items() if delta
+    ])
+
+
+def classroom_student_count_deltas_fold(*, batch_size: int) -> int:
+    """
+    Adds the recorded student count deltas to the student_count of their classrooms,
+    stamps last_activity with the latest of them and deletes them, batch_size rows per
+    transaction. Rows locked by another fold are skipped. Returns how many were folded.
+    """
+    folded = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                ClassRoomStudentCountDelta.objects.select_for_update(skip_locked=True)
+                .order_by("id").values_list("id", "classroom_id", "delta", "created_date")[:batch_size]
+            )
+            if not rows:
+                break
+            totals = defaultdict(int)
+            last_activity = {}
+            for _id, classroom_id, delta, created_date in rows:
+                totals[classroom_id] += delta
+                last_activity[classroom_id] = max(created_date, last_activity.get(classroom_id, created_date))
+            for classroom_id, total in totals.items():
+                ClassRoom.objects.filter(pk=classroom_id).update(
+                    student_count=Greatest(F("student_count") + total, Value(0)),
+                    last_activity=last_activity[classroom_id],
+                )
+            ClassRoomStudentCountDelta.objects.filter(id__in=[row[0] for row in rows]).delete()
+        folded += len(rows)
+        if len(rows) < batch_size:
+            break
+    return folded
+
+
+def classroom_student_counts_reconcile(*, dry_run: bool = False) -> List[Tuple[str, int, int]]:
+    """
+    Finds the classrooms whose number of students (see classroom_student_count_expression)
+    drifted from their actual number of students, e.g. after memberships were written with
+    raw SQL or bulk operations, and repairs them unless dry_run. Returns (class_code,
+    recorded count, actual count) of each of them.
+    """
+    ClassRoomStudents = ClassRoom.students.through
+    counts = (
+        ClassRoomStudents.objects.filter(classroom_id=OuterRef("pk"))
+        .order_by().values("classroom_id").annotate(count=Count("pk")).values("count")
+    )
+    drifted = list(
+        ClassRoom.objects.annotate(
+            recorded_count=classroom_student_count_expression(), actual_count=Coalesce(Subquery(counts), 0),
+        )
+        .exclude(recorded_count=F("actual_count"))
+        .order_by("class_code")
+        .values_list("pk", "class_code", "recorded_count", "actual_count")
+    )
+    if drifted and not dry_run:
+        # counted again in the UPDATE, so memberships changed since the scan are not undone,
+        # the deltas not folded yet are left out as the fold adds them
+        pending = classroom_student_count_expression() - F("student_count")
+        ClassRoom.objects.filter(pk__in=[row[0] for row in drifted]).update(
+            student_count=Greatest(Coalesce(Subquery(counts), 0) - pending, Value(0))
+        )
+    return [(class_code, recorded, actual) for _pk, class_code, recorded, actual in drifted]
+
+
+def credential_sheet_cache_key(*, sheet_id: str) -> str:
+    return f"classroom:credential_sheet:{sheet_id}"
+
+
+def credential_sheet_key(*, sheet_id: str) -> bytes:
+    """
+    Returns the Fernet key of a credential sheet, derived from SECRET_KEY so it never
+    leaves the server.
+    """
+    digest = salted_hmac(CREDENTIAL_SHEET_SALT, sheet_id, algorithm="sha256").digest()
+    return base64.urlsafe_b64encode(digest)
+
+
+def credential_sheet_create(*, students: List[Dict[str, str]]) -> str:
+    """
+    Stores the usernames and passwords of newly created students for a single download
+    within CREDENTIAL_SHEET_TIMEOUT seconds and returns the signed token to fetch them
+    with. The record is encrypted with a key kept on the server (see credential_sheet_key),
+    so neither the cache nor a logged download link holds the passwords in readable form.
+    """
+    sheet_id = secrets.token_urlsafe(16)
+    rows = [[student['username'], student['full_name'], student['password']] for student in students]
+    record = Fernet(credential_sheet_key(sheet_id=sheet_id)).encrypt(zlib.compress(json.dumps(rows).encode()))
+    caches['credentials'].set(
+        credential_sheet_cache_key(sheet_id=sheet_id), record, timeout=settings.CREDENTIAL_SHEET_TIMEOUT
+    )
+    return signing.dumps({"id": sheet_id}, salt=CREDENTIAL_SHEET_SALT)
+
+
+def credential_sheet_pop(*, token: str) -> Optional[List[List[str]]]:
+    """
+    Returns the [username, full_name, password] rows of the credential sheet and removes
+    it, so a token works once. Returns None for a tampered, expired or used token.
+    """
+    try:
+        payload = signing.loads(token, salt=CREDENTIAL_SHEET_SALT, max_age=settings.CREDENTIAL_SHEET_TIMEOUT)
+    except signing.BadSignature:
+        return None
+
+    cache = caches['credentials']
+    cache_key = credential_sheet_cache_key(sheet_id=payload["id"])
+    record = cache.get(cache_key)
+    # of concurrent downloads only the one whose delete removed the record gets it
+    if record is None or not cache.delete(cache_key):
+        return None
+    try:
+        return json.loads(zlib.decompress(Fernet(credential_sheet_key(sheet_id=payload["id"])).decrypt(record)))
+    except InvalidToken:
+        return None
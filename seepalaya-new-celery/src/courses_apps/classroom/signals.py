@@ -0,0 +1,57 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from .models import ClassRoom
+from .selectors import classroom_code_cache_key
+from .services import classroom_student_count_adjust
+
+User = get_user_model()
+ClassRoomStudents = ClassRoom.students.through
+
+
+@receiver(m2m_changed, sender=ClassRoomStudents)
+def maintain_classroom_student_count(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Records the changes of classroom.students and user.classes to the number of students
+    of their classrooms (see classroom_student_count_adjust).
+    Added rows are counted once inserted, pk_set then only holds the new ones. Removed
+    rows are counted before the delete, since pk_set may name rows that do not exist.
+    """
+    if action == "post_add":
+        deltas = dict.fromkeys(pk_set, 1) if reverse else {instance.pk: len(pk_set)}
+    elif action in ("pre_remove", "pre_clear"):
+        owner, other = ("portaluser_id", "classroom_id") if reverse else ("classroom_id", "portaluser_id")
+        memberships = sender.objects.filter(**{owner: instance.pk})
+        if action == "pre_remove":
+            memberships = memberships.filter(**{f"{other}__in": pk_set})
+        if reverse:
+            deltas = dict.fromkeys(memberships.values_list("classroom_id", flat=True), -1)
+        else:
+            deltas = {instance.pk: -memberships.count()}
+    else:
+        return
+
+    classroom_student_count_adjust(deltas=deltas)
+
+
+@receiver(pre_delete, sender=User)
+def release_deleted_user_memberships(sender, instance, **kwargs):
+    """
+    Takes a deleted user out of the number of students of their classrooms. Their memberships
+    are deleted by the cascade, which sends no m2m_changed.
+    """
+    classroom_ids = ClassRoomStudents.objects.filter(portaluser_id=instance.pk).values_list("classroom_id", flat=True)
+    classroom_student_count_adjust(deltas=dict.fromkeys(classroom_ids, -1))
+
+
+@receiver(post_save, sender=ClassRoom)
+@receiver(post_delete, sender=ClassRoom)
+def delete_classroom_code_cache(sender, instance, **kwargs):
+    """
+    Drops the cached primary key and title of a renamed or deleted classroom once the
+    change is committed.
+    """
+    cache_key = classroom_code_cache_key(class_code=instance.class_code)
+    transaction.on_commit(lambda: caches["shared"].delete(cache_key))
@@ -0,0 +1,93 @@
+from unittest.mock import patch
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from courses_apps.account.models import PortalUser
+from courses_apps.classroom.models import ClassRoom
+from courses_apps.classroom import services
+from courses_apps.classroom.selectors import classroom_student_count_get
+from courses_apps.classroom.services import add_students_to_classroom, remove_students_from_classroom
+from courses_apps.teacher.models import Teacher
+
+
+class ClassroomMembershipServicesTestCase(TestCase):
+
+    def setUp(self):
+        self.teacher_user = PortalUser.objects.create_user(
+            username="teacher1", email="teacher1@example.com", password="password", full_name="John Doe",
+        )
+        self.teacher = Teacher.objects.create(user=self.teacher_user)
+        self.classroom = ClassRoom.objects.create(title="Test Classroom", class_code="TC123", teacher=self.teacher)
+        self.students = PortalUser.objects.bulk_create([
+            PortalUser(username=f"student{i}", email=f"student{i}@example.com") for i in range(20)
+        ])
+        self.teacher.students.add(*self.students)
+        self.usernames = [student.username for student in self.students]
+
+    def assertStudentCount(self, expected):
+        self.assertEqual(classroom_student_count_get(classroom_id=self.classroom.pk), expected)
+        self.assertEqual(self.classroom.students.count(), expected)
+
+    def test_add_reports_each_student(self):
+        self.classroom.students.add(self.students[0])
+
+        outcomes = add_students_to_classroom(
+            class_code="TC123", students=["student1", "student0", "student1"], teacher_user="teacher1"
+        )
+
+        self.assertEqual(outcomes, {"student1": "added", "student0": "already_in_classroom"})
+        self.assertStudentCount(2)
+
+    def test_add_counts_only_inserted_memberships(self):
+        resolve = services._classroom_students_resolve
+
+        def resolve_then_add_concurrently(**kwargs):
+            resolved = resolve(**kwargs)
+            # another request adds student0 between the resolve and the insert
+            self.classroom.students.through.objects.create(classroom=self.classroom, portaluser=self.students[0])
+            return resolved
+
+        with patch.object(services, "_classroom_students_resolve", side_effect=resolve_then_add_concurrently):
+            outcomes = add_students_to_classroom(
+                class_code="TC123", students=["student0", "student1"], teacher_user="teacher1"
+            )
+
+        self.assertEqual(outcomes, {"student0": "already_in_classroom", "student1": "added"})
+        # the concurrent request adjusts the count for its own membership
+        self.assertEqual(classroom_student_count_get(classroom_id=self.classroom.pk), 1)
+        self.assertEqual(self.classroom.students.count(), 2)
+
+    def test_remove_reports_each_student(self):
+        self.classroom.students.add(self.students[0])
+
+        outcomes = remove_students_from_classroom(
+            class_code="TC123", students=["student0", "student1"], teacher_user="teacher1"
+        )
+
+        self.assertEqual(outcomes, {"student0": "removed", "student1": "not_in_classroom"})
+        self.assertStudentCount(0)
+
+    def test_query_count_does_not_grow_with_students(self):
+        with self.assertNumQueries(7):
+            add_students_to_classroom(class_code="TC123", students=self.usernames[:2], teacher_user="teacher1")
+        with self.assertNumQueries(7):
+            add_students_to_classroom(class_code="TC123", students=self.usernames[2:], teacher_user="teacher1")
+        self.assertStudentCount(20)
+
+        with self.assertNumQueries(7):
+            remove_students_from_classroom(class_code="TC123", students=self.usernames[:2], teacher_user="teacher1")
+        with self.assertNumQueries(7):
+            remove_students_from_classroom(class_code="TC123", students=self.usernames[2:], teacher_user="teacher1")
+        self.assertStudentCount(0)
+
+    def test_foreign_or_unknown_student_changes_nothing(self):
+        outsider = PortalUser.objects.create_user(username="outsider", email="outsider@example.com", password="password")
+
+        for usernames in (["student0", "outsider"], ["student0", "missing"]):
+            with self.assertRaises(ValidationError):
+                add_students_to_classroom(class_code="TC123", students=usernames, teacher_user="teacher1")
+        self.assertStudentCount(0)
+
+        self.classroom.students.add(self.students[0], outsider)
+        with self.assertRaises(ValidationError):
+            remove_students_from_classroom(class_code="TC123", students=["student0", "outsider"], teacher_user="teacher1")
+        self.assertStudentCount(2)
@@ -0,0 +1,77 @@
+from unittest.mock import patch
+from django.test import TestCase, override_settings
+from django.core.exceptions import ValidationError
+from courses_apps.account.models import PortalUser, UserRoles
+from courses_apps.classroom.models import ClassRoom
+from courses_apps.classroom.services import student_create
+from courses_apps.learner.models import Learner
+from courses_apps.teacher.models import Teacher
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class StudentCreateServiceTestCase(TestCase):
+
+    def setUp(self):
+        self.teacher_user = PortalUser.objects.create_user(
+            username="teacher1",
+            email="teacher1@example.com",
+            password="password",
+            full_name="John Doe",
+        )
+        self.teacher = Teacher.objects.create(user=self.teacher_user)
+        UserRoles.objects.create(name="learner")
+        self.classroom = ClassRoom.objects.create(
+            title="Test Classroom",
+            class_code="TC123",
+            teacher=self.teacher,
+        )
+
+    def test_student_create_success(self):
+        created_students = student_create(
+            class_code="TC123",
+            students=["Student One", "Student Two"],
+            teacher_user="teacher1",
+        )
+
+        self.assertEqual([student.full_name for student in created_students], ["Student One", "Student Two"])
+        usernames = [student.username for student in created_students]
+        for student in created_students:
+            user = User.objects.get(username=student.username)
+            self.assertTrue(user.check_password(student.password))
+            self.assertEqual(user.learner.account_maintained_by, "TEACHER")
+            self.assertTrue(user.roles.filter(name="learner").exists())
+        self.assertCountEqual(self.classroom.students.values_list("username", flat=True), usernames)
+        self.assertCountEqual(self.teacher.students.values_list("username", flat=True), usernames)
+
+    def test_student_create_query_count_does_not_grow_with_roster(self):
+        def generated_details(full_names):
+            return [
+                {
+                    'full_name': full_name,
+                    'username': f'pupil{i}',
+                    'email': f'pupil{i}@seepalaya.com',
+                    'password': 'password',
+                }
+                for i, full_name in enumerate(full_names)
+            ]
+
+        with patch(
+            'courses_apps.classroom.services.generate_usernames_emails_and_passwords',
+            side_effect=generated_details,
+        ):
+            with self.assertNumQueries(16):
+                student_create(class_code="TC123", students=["Student One"] * 3, teacher_user="teacher1")
+            User.objects.filter(username__startswith="pupil").delete()
+            # 50 students fit in one insert of users on SQLite, whose 999 query parameters
+            # make bulk_create split a roster of more than 71 users into several inserts
+            with self.assertNumQueries(16):
+                student_create(class_code="TC123", students=["Student One"] * 50, teacher_user="teacher1")
+        self.assertEqual(self.classroom.students.count(), 50)
+
+    def test_student_create_missing_classroom(self):
+        with self.assertRaises(ValidationError):
+            student_create(class_code="MISSING", students=["Student One"], teacher_user="teacher1")
+        self.assertFalse(Learner.objects.exists())
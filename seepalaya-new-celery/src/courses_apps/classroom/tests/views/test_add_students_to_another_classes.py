@@ -103,6 +103,10 @@ class AddStudentsToClassRoomAPIViewTestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['success'], True)
         self.assertIn('Students added successfully', response.data['message'])
+        self.assertEqual(response.data['data'], {
+            self.learner1_user.username: 'added',
+            self.learner2_user.username: 'added',
+        })
 
     def test_add_students_to_classroom_missing_fields(self):
         data = {
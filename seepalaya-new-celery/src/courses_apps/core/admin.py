@@ -1,7 +1,18 @@
 from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
-from .models import Language, Subject, Grade
+from .models import Language, Subject, Grade, HousekeepingRun
 
 admin.site.register(Language)
 admin.site.register(Subject)
-admin.site.register(Grade)
\ No newline at end of file
+admin.site.register(Grade)
+
+
+class HousekeepingRunAdmin(admin.ModelAdmin):
+    list_display = ('job', 'started_at', 'duration', 'rows', 'error')
+    list_filter = ('job',)
+    readonly_fields = [field.name for field in HousekeepingRun._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+admin.site.register(HousekeepingRun, HousekeepingRunAdmin)
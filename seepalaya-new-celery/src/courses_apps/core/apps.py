@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'courses_apps.core'
+
+    def ready(self):
+        from django.utils.module_loading import autodiscover_modules
+        from . import checks  # noqa: F401
+
+        # registers the housekeeping jobs of every app
+        autodiscover_modules('housekeeping')
@@ -0,0 +1,48 @@
+from django.core.checks import Error, Tags, Warning, register
+from django.db import DatabaseError, connections
+
+
+@register(Tags.database)
+def database_connection_check(app_configs=None, databases=None, **kwargs):
+    """
+    Connects to each database and makes sure the connection survives the end of a request
+    when CONN_MAX_AGE asks for persistent connections, so requests and celery tasks do not
+    pay for a new connection each time.
+    Database checks only run with `python manage.py check --database <alias>`, which the
+    entrypoint does before starting the server.
+    """
+    messages = []
+    for alias in databases or []:
+        connection = connections[alias]
+        conn_max_age = connection.settings_dict["CONN_MAX_AGE"]
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+        except DatabaseError as error:
+            messages.append(Error(
+                f"Could not connect to the '{alias}' database: {error}",
+                id="core.E001",
+            ))
+            continue
+
+        if conn_max_age == 0:
+            messages.append(Warning(
+                f"The '{alias}' database reconnects on every request and celery task.",
+                hint="Set DB_CONN_MAX_AGE to the number of seconds a connection may be reused.",
+                id="core.W001",
+            ))
+            continue
+
+        # closing an atomic block's connection would break it, e.g. inside a test case
+        if connection.in_atomic_block:
+            continue
+        # what django and celery run at the end of every request and task
+        connection.close_if_unusable_or_obsolete()
+        if connection.connection is None:
+            messages.append(Error(
+                f"The '{alias}' database connection was closed at the end of a request "
+                f"although CONN_MAX_AGE is {conn_max_age}.",
+                hint="DB_CONN_MAX_AGE must be positive and AUTOCOMMIT enabled for the database.",
+                id="core.E002",
+            ))
+    return messages
@@ -0,0 +1,105 @@
+import logging
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable, Dict, Iterable, List, Optional
+from django.conf import settings
+from django.db import transaction
+from django.db.models import OuterRef, QuerySet, Subquery
+from django.utils import timezone
+from .models import HousekeepingRun
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class HousekeepingJob:
+    name: str
+    func: Callable[[], int]
+    description: str
+
+
+_jobs: Dict[str, HousekeepingJob] = {}
+
+
+def housekeeping_job(name: str):
+    """
+    Registers the decorated function as a housekeeping job run by run_housekeeping_task.
+    The function takes no arguments and returns the number of rows it touched. Jobs are
+    kept in the housekeeping.py module of their app, which is imported on startup.
+    """
+    def register(func):
+        description = (func.__doc__ or "").strip().split("\n")[0]
+        _jobs[name] = HousekeepingJob(name=name, func=func, description=description)
+        return func
+    return register
+
+
+def housekeeping_job_list() -> Dict[str, HousekeepingJob]:
+    return dict(sorted(_jobs.items()))
+
+
+def housekeeping_jobs_run(*, names: Optional[Iterable[str]] = None) -> List[HousekeepingRun]:
+    """
+    Runs the given jobs, all of them by default, and records the run time, rows touched
+    and error of each. A failing job is logged and does not stop the others.
+    """
+    jobs = housekeeping_job_list()
+    unknown = set(names or ()) - set(jobs)
+    if unknown:
+        raise ValueError(f"Unknown housekeeping jobs: {', '.join(sorted(unknown))}")
+
+    runs = []
+    for job in jobs.values():
+        if names is not None and job.name not in names:
+            continue
+        run = HousekeepingRun(job=job.name, started_at=timezone.now())
+        started = time.perf_counter()
+        try:
+            run.rows = job.func()
+        except Exception as e:
+            logger.exception(f"Housekeeping job {job.name} failed")
+            run.error = repr(e)
+        run.duration = time.perf_counter() - started
+        run.save()
+        logger.info(f"Housekeeping job {job.name} touched {run.rows} rows in {run.duration:.3f}s")
+        runs.append(run)
+    return runs
+
+
+def housekeeping_last_runs() -> Dict[str, HousekeepingRun]:
+    """
+    Returns the latest run of every job that has run, by job name.
+    """
+    latest = HousekeepingRun.objects.filter(job=OuterRef("job")).order_by("-started_at").values("id")[:1]
+    return {run.job: run for run in HousekeepingRun.objects.filter(id=Subquery(latest))}
+
+
+def queryset_delete_in_batches(queryset: QuerySet, *, batch_size: int) -> int:
+    """
+    Deletes the rows of the queryset batch_size at a time, each batch in its own
+    transaction so locks are held briefly and the deletes do not pile up WAL in one
+    commit. Returns the number of rows deleted, not counting cascades.
+    """
+    deleted = 0
+    while True:
+        with transaction.atomic():
+            ids = list(queryset.order_by().values_list("pk", flat=True)[:batch_size])
+            if not ids:
+                break
+            queryset.model.objects.filter(pk__in=ids).delete()
+        deleted += len(ids)
+        if len(ids) < batch_size:
+            break
+    return deleted
+
+
+@housekeeping_job("purge_housekeeping_runs")
+def housekeeping_runs_purge() -> int:
+    """
+    Deletes the housekeeping runs older than HOUSEKEEPING_RUN_RETENTION_DAYS.
+    """
+    cutoff = timezone.now() - timedelta(days=settings.HOUSEKEEPING_RUN_RETENTION_DAYS)
+    return queryset_delete_in_batches(
+        HousekeepingRun.objects.filter(started_at__lt=cutoff), batch_size=settings.HOUSEKEEPING_BATCH_SIZE
+    )
@@ -0,0 +1,63 @@
+import dataclasses
+import time
+from django.core.management.base import BaseCommand, CommandError
+from courses_apps.core.dataset import (
+    DATASET_EMAIL_DOMAIN, DATASET_PASSWORD, DatasetSpec, dataset_delete, dataset_generate, dataset_spec_validate,
+    dataset_username,
+)
+
+
+class Command(BaseCommand):
+    """
+    This command generates a synthetic dataset for load tests and benchmarks: teachers with
+    their classrooms, learners in those classrooms, guardians with their children, E-Paath
+    modules, refresh tokens (some blacklisted or expired) and API log rows. The rows are
+    written with COPY on PostgreSQL and bulk inserts elsewhere, in one transaction. The same
+    --prefix, --seed and sizes generate the same rows, timestamps are relative to the day of
+    the run. Every user logs in with the password of DATASET_PASSWORD.
+    running the command:
+        - python manage.py generate_dataset
+        - python manage.py generate_dataset --learners 1000000 --classrooms 50000 --teachers 10000 --guardians 50000
+        - python manage.py generate_dataset --delete
+    """
+    help = 'Generate a synthetic dataset of teachers, classrooms, learners, tokens and logs'
+
+    def add_arguments(self, parser):
+        defaults = DatasetSpec()
+        parser.add_argument('--prefix', default=defaults.prefix,
+                            help='Username prefix identifying the dataset, lowercase letters')
+        parser.add_argument('--seed', type=int, default=defaults.seed, help='Seed of the random generator')
+        for field in dataclasses.fields(DatasetSpec):
+            if field.name not in ('prefix', 'seed'):
+                parser.add_argument(f"--{field.name.replace('_', '-')}", type=field.type, default=field.default)
+        parser.add_argument('--delete', action='store_true', help='Delete the dataset with the prefix and exit')
+
+    def handle(self, *args, **kwargs):
+        if kwargs['delete']:
+            start = time.perf_counter()
+            deleted = dataset_delete(prefix=kwargs['prefix'])
+            self.stdout.write(self.style.SUCCESS(
+                f"Deleted {deleted} users of the dataset {kwargs['prefix']!r} in {time.perf_counter() - start:.1f} s."
+            ))
+            return
+
+        spec = DatasetSpec(**{field.name: kwargs[field.name] for field in dataclasses.fields(DatasetSpec)})
+        errors = dataset_spec_validate(spec=spec)
+        if errors:
+            raise CommandError(' '.join(errors))
+
+        start = time.perf_counter()
+        counts = dataset_generate(spec=spec, log=lambda message: self.stdout.write(
+            f'{time.perf_counter() - start:7.1f} s  {message}'
+        ))
+        elapsed = time.perf_counter() - start
+
+        rows = sum(counts.values())
+        for table, count in counts.items():
+            self.stdout.write(f'{table:<45} {count:>10}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {rows} rows in {elapsed:.1f} s ({rows / elapsed:.0f}/second). Log in as e.g. '
+            f"{dataset_username(prefix=spec.prefix, kind='teacher', number=0)} or "
+            f"{dataset_username(prefix=spec.prefix, kind='learner', number=0)}@{DATASET_EMAIL_DOMAIN} "
+            f'with the password {DATASET_PASSWORD}.'
+        ))
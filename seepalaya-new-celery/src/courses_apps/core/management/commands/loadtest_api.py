@@ -0,0 +1,108 @@
+import json
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand, CommandError
+from courses_apps.core.dataset import DATASET_PASSWORD, DatasetSpec, dataset_user_queryset
+
+
+class Command(BaseCommand):
+    """
+    This command load tests a running server with the teacher login and classroom list flow,
+    so serving setups can be compared, e.g. runserver against gunicorn. Each virtual user logs
+    in once as a different teacher of the generated dataset and then lists that teacher's
+    classrooms repeatedly.
+    running the command:
+        - python manage.py generate_dataset
+        - python manage.py loadtest_api --base-url http://localhost:8000 --users 16 --iterations 20
+    """
+    help = 'Load test the login and classroom list endpoints of a running server'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://localhost:8000', help='Server to load test')
+        parser.add_argument('--users', type=int, default=16, help='Concurrent virtual users')
+        parser.add_argument('--iterations', type=int, default=20, help='Classroom list requests per user')
+        parser.add_argument('--prefix', default=DatasetSpec.prefix, help='Prefix of the generated dataset')
+
+    def handle(self, *args, **kwargs):
+        usernames = list(
+            dataset_user_queryset(prefix=kwargs['prefix'], kind='teacher')
+            .values_list('username', flat=True)[:kwargs['users']]
+        )
+        if not usernames:
+            raise CommandError('No dataset teachers found, run python manage.py generate_dataset first.')
+
+        self.base_url = kwargs['base_url'].rstrip('/')
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=kwargs['users']) as executor:
+            results = list(executor.map(
+                lambda number: self.virtual_user(usernames[number % len(usernames)], kwargs['iterations']),
+                range(kwargs['users']),
+            ))
+        elapsed = time.perf_counter() - start
+
+        latencies = {'login': [], 'classroom_list': []}
+        errors = 0
+        for user_latencies, user_errors in results:
+            for endpoint, values in user_latencies.items():
+                latencies[endpoint].extend(values)
+            errors += user_errors
+
+        total = sum(len(values) for values in latencies.values()) + errors
+        self.stdout.write(f'{kwargs["users"]} users x (1 login + {kwargs["iterations"]} classroom lists) '
+                          f'against {self.base_url}')
+        for endpoint, values in latencies.items():
+            if not values:
+                continue
+            values.sort()
+            self.stdout.write(
+                f'{endpoint:<15} {len(values):6d} requests, '
+                f'p50 {statistics.median(values) * 1000:7.1f} ms, '
+                f'p95 {values[int(len(values) * 0.95) - 1] * 1000:7.1f} ms'
+            )
+        if errors:
+            self.stdout.write(self.style.ERROR(f'{errors} requests failed'))
+        self.stdout.write(self.style.SUCCESS(f'throughput: {total / elapsed:.1f} requests/second'))
+
+    def virtual_user(self, username, iterations):
+        """
+        Logs in as the teacher and lists their classrooms, returning the latencies per
+        endpoint and the error count.
+        """
+        latencies = {'login': [], 'classroom_list': []}
+        errors = 0
+        response, elapsed = self.request(
+            '/account/login/', {'username_or_email': username, 'password': DATASET_PASSWORD}
+        )
+        if response is None:
+            return latencies, iterations + 1
+        latencies['login'].append(elapsed)
+
+        access_token = response['data']['access_token']
+        for _ in range(iterations):
+            response, elapsed = self.request('/teacher/classroom/list/', {}, access_token=access_token)
+            if response is None:
+                errors += 1
+            else:
+                latencies['classroom_list'].append(elapsed)
+        return latencies, errors
+
+    def request(self, path, data, access_token=None):
+        """
+        POSTs json to the server, returning the decoded body (None on failure) and the latency.
+        """
+        headers = {'Content-Type': 'application/json'}
+        if access_token:
+            headers['Authorization'] = f'Bearer {access_token}'
+        request = urllib.request.Request(
+            self.base_url + path, data=json.dumps(data).encode(), headers=headers, method='POST'
+        )
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response:
+                body = json.loads(response.read())
+        except (urllib.error.URLError, OSError, ValueError):
+            body = None
+        return body, time.perf_counter() - start
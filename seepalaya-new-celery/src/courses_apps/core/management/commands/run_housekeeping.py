@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+from courses_apps.core.housekeeping import housekeeping_job_list, housekeeping_jobs_run, housekeeping_last_runs
+
+
+class Command(BaseCommand):
+    """
+    This command runs the registered housekeeping jobs, or lists them with their last run.
+    running the command:
+        - python manage.py run_housekeeping
+        - python manage.py run_housekeeping purge_expired_email_tokens
+        - python manage.py run_housekeeping --list
+    """
+    help = 'Run the housekeeping jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('jobs', nargs='*', help='Jobs to run, all by default')
+        parser.add_argument('--list', action='store_true', help='List the jobs and their last run')
+
+    def handle(self, *args, **kwargs):
+        if kwargs['list']:
+            last_runs = housekeeping_last_runs()
+            for name, job in housekeeping_job_list().items():
+                run = last_runs.get(name)
+                last_run = (
+                    f"last run {run.started_at:%Y-%m-%d %H:%M}, {run.rows} rows in {run.duration:.3f}s"
+                    f"{', failed' if run.error else ''}" if run else "never run"
+                )
+                self.stdout.write(f"{name}: {job.description} ({last_run})")
+            return
+
+        try:
+            runs = housekeeping_jobs_run(names=kwargs['jobs'] or None)
+        except ValueError as e:
+            raise CommandError(e)
+        for run in runs:
+            if run.error:
+                self.stdout.write(self.style.ERROR(f"{run.job}: failed after {run.duration:.3f}s: {run.error}"))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"{run.job}: {run.rows} rows in {run.duration:.3f}s"))
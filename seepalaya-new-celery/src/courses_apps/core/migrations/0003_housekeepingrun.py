@@ -0,0 +1,33 @@
+# Generated by Django 4.2 on 2026-10-18 15:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_grade_grade_en_language_language_en_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HousekeepingRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job', models.CharField(max_length=100)),
+                ('started_at', models.DateTimeField()),
+                ('duration', models.FloatField(default=0, help_text='Run time in seconds')),
+                ('rows', models.PositiveIntegerField(default=0, help_text='Rows touched')),
+                ('error', models.TextField(blank=True)),
+            ],
+            options={
+                'verbose_name': 'Housekeeping Run',
+                'verbose_name_plural': 'Housekeeping Runs',
+                'ordering': ['-started_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='housekeepingrun',
+            index=models.Index(fields=['job', 'started_at'], name='core_housekeeping_job_started'),
+        ),
+    ]
@@ -32,4 +32,23 @@ class Grade(IdentifierTimeStampAbstractModel):
         verbose_name_plural = _("Grade")
 
     def __str__(self):
-        return self.grade + " (" + self.in_symbol + ")"
\ No newline at end of file
+        return self.grade + " (" + self.in_symbol + ")"
+
+class HousekeepingRun(models.Model):
+    """
+    One run of a housekeeping job, see housekeeping.py.
+    """
+    job = models.CharField(max_length=100)
+    started_at = models.DateTimeField()
+    duration = models.FloatField(default=0, help_text=_("Run time in seconds"))
+    rows = models.PositiveIntegerField(default=0, help_text=_("Rows touched"))
+    error = models.TextField(blank=True)
+
+    class Meta:
+        verbose_name = _("Housekeeping Run")
+        verbose_name_plural = _("Housekeeping Runs")
+        ordering = ["-started_at"]
+        indexes = [models.Index(fields=["job", "started_at"], name="core_housekeeping_job_started")]
+
+    def __str__(self):
+        return f"{self.job} {self.started_at}"
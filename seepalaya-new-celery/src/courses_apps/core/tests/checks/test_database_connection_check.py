@@ -0,0 +1,38 @@
+from django.db import connection
+from django.test import TransactionTestCase
+from courses_apps.core.checks import database_connection_check
+
+
+class DatabaseConnectionCheckTests(TransactionTestCase):
+
+    def setUp(self):
+        settings_dict = dict(connection.settings_dict)
+        self.addCleanup(connection.settings_dict.update, settings_dict)
+        self.addCleanup(connection.close)
+        connection.close()
+
+    def test_persistent_connection_is_reused(self):
+        connection.settings_dict["CONN_MAX_AGE"] = 60
+
+        self.assertEqual(database_connection_check(databases=["default"]), [])
+        self.assertIsNotNone(connection.connection)
+
+    def test_warns_when_reconnecting_on_every_request(self):
+        connection.settings_dict["CONN_MAX_AGE"] = 0
+
+        messages = database_connection_check(databases=["default"])
+
+        self.assertEqual([message.id for message in messages], ["core.W001"])
+
+    def test_errors_when_persistent_connection_is_closed(self):
+        if connection.vendor == "sqlite" and connection.is_in_memory_db():
+            self.skipTest("in-memory sqlite connections are never closed")
+        # a negative age expires the connection as soon as it is opened
+        connection.settings_dict["CONN_MAX_AGE"] = -1
+
+        messages = database_connection_check(databases=["default"])
+
+        self.assertEqual([message.id for message in messages], ["core.E002"])
+
+    def test_skipped_without_database_argument(self):
+        self.assertEqual(database_connection_check(), [])
@@ -0,0 +1,241 @@
+import dataclasses
+import json
+import os
+import time
+from pathlib import Path
+from django.core.cache import cache, caches
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, get_resolver
+from django.utils import timezone
+from rest_framework.test import APIClient
+from courses_apps.account.models import EmailConfirmationToken, PortalUser, ProfilePicture
+from courses_apps.account.revocation import token_blacklist_version_get
+from courses_apps.account.selectors import user_is_active
+from courses_apps.account.tokens import PortalRefreshToken
+from courses_apps.classroom.models import ClassRoom
+from courses_apps.classroom.services import credential_sheet_create
+from courses_apps.core.dataset import DATASET_PASSWORD, DatasetSpec, dataset_generate, dataset_username
+from courses_apps.learner.models import Learner
+
+BUDGETS_PATH = Path(__file__).with_name("budgets.json")
+NAMESPACES = ("account", "teacher", "learner", "classroom")
+PASSWORD = "strongpass@123"
+
+# large enough that an N+1 query blows the budget
+DATASET = DatasetSpec(
+    prefix="ep", seed=0, teachers=3, classrooms=30, learners=150, guardians=10, classes_per_learner=3,
+    modules=0, tokens=100, api_logs=0,
+)
+
+
+def letters(number):
+    """
+    Returns a name part for the number, full names may not contain digits.
+    """
+    return "".join(chr(ord("a") + int(digit)) for digit in f"{number:04d}").capitalize()
+
+
+def app_routes():
+    """
+    Returns the routes of every URL of the benchmarked apps, e.g. "classroom/students/add/".
+    """
+    routes = []
+    for resolver in get_resolver().url_patterns:
+        if isinstance(resolver, URLResolver) and resolver.namespace in NAMESPACES:
+            routes += [f"{resolver.pattern}{pattern.pattern}" for pattern in resolver.url_patterns]
+    return routes
+
+
+class SQLTimer:
+    """
+    Database execute wrapper summing the time spent in SQL. The "time" of captured
+    queries is rounded to milliseconds, which sums most of these queries up to nothing.
+    """
+
+    def __init__(self):
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+
+
+# route: (method, user, data), data may be a callable taking the test case, run before measuring
+SCENARIOS = {
+    "account/login/": ("post", None, lambda test: {
+        "username_or_email": test.teacher_user.username, "password": DATASET_PASSWORD,
+    }),
+    "account/logout/": ("post", "teacher", {}),
+    "account/token/refresh/": ("get", "teacher", {}),
+    "account/user-details/": ("get", "teacher", {}),
+    "account/profile-pictures/all/": ("get", "teacher", {}),
+    "account/profile-picture/update/": ("post", "teacher", lambda test: {"uid": str(test.picture.uid)}),
+    "account/email/confirmation/": ("post", "learner", lambda test: {"token": test.confirmation_token()}),
+    "account/resend-email-confirmation/": ("post", "learner", {}),
+    "account/forgot-password/": ("post", None, lambda test: {"email": test.learner_user.email}),
+    "account/reset-password/": ("post", None, lambda test: {
+        "username": test.learner_user.username, "token": test.reset_token(),
+        "password": "newpass@123", "confirm_password": "newpass@123",
+    }),
+    "account/password/change/": ("post", "teacher", {"old_password": DATASET_PASSWORD, "new_password": "newpass@123"}),
+    "teacher/signup/": ("post", None, {
+        "full_name": "New Teacher", "email": "new_teacher@example.com", "password": PASSWORD, "confirm_password": PASSWORD,
+    }),
+    "teacher/classroom/list/": ("post", "teacher", {}),
+    "teacher/student/create/": ("post", "teacher", {"students": [
+        {"full_name": f"New Student {letters(i)}", "username": f"newstudent{i}", "password": PASSWORD} for i in range(5)
+    ]}),
+    "teacher/students/list/": ("get", "teacher", {"page_size": 50}),
+    "teacher/student/update/": ("post", "teacher", lambda test: {
+        "student_username": test.students[0], "full_name": "Renamed Student",
+    }),
+    "teacher/student/delete/": ("post", "teacher", lambda test: {"student_username": test.students[0]}),
+    "learner/signup/": ("post", None, {
+        "full_name": "New Learner", "email": "new_learner@example.com", "password": PASSWORD, "confirm_password": PASSWORD,
+    }),
+    "learner/teacher/list/": ("get", "student", {}),
+    "classroom/create/": ("post", "teacher", {"title": "New Classroom"}),
+    "classroom/details/": ("post", "teacher", lambda test: {"class_code": test.class_codes[0]}),
+    "classroom/update/": ("post", "teacher", lambda test: {"class_code": test.class_codes[0], "title": "Renamed Classroom"}),
+    "classroom/delete/": ("post", "teacher", lambda test: {"class_code": test.class_codes[0]}),
+    "classroom/student/create/": ("post", "teacher", lambda test: {
+        "class_code": test.class_codes[0], "students": [f"New Student {letters(i)}" for i in range(5)],
+    }),
+    "classroom/student/credentials/<str:token>/": ("get", None, lambda test: {"token": test.credential_sheet_token()}),
+    "classroom/join-class/": ("post", "joiner", lambda test: {"class_code": test.class_codes[0]}),
+    "classroom/students/": ("post", "teacher", lambda test: {"class_code": test.class_codes[0], "page_size": 50}),
+    "classroom/students/add/": ("post", "teacher", lambda test: {"class_code": test.class_codes[1], "students": test.students}),
+    "classroom/students/remove/": ("post", "teacher", lambda test: {"class_code": test.class_codes[0], "students": test.students}),
+}
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class EndpointBudgetTestCase(TestCase):
+    """
+    Requests every URL of the account, teacher, learner and classroom apps against a
+    generated dataset and fails when one of them issues more queries or takes longer than
+    its budget in budgets.json. With ENDPOINT_BENCHMARK_RESULTS set, the measurements are
+    written there as JSON:
+        ENDPOINT_BENCHMARK_RESULTS=endpoints.json python manage.py test courses_apps.core.tests.endpoints
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.picture = ProfilePicture.objects.create(name="Picture", link="https://example.com/picture.png")
+        dataset_generate(spec=DATASET)
+
+        cls.teacher_user = PortalUser.objects.get(username=dataset_username(prefix=DATASET.prefix, kind="teacher", number=0))
+        classrooms = ClassRoom.objects.filter(teacher__user=cls.teacher_user).order_by("pk")
+        cls.class_codes = list(classrooms.values_list("class_code", flat=True))
+        cls.students = list(
+            cls.teacher_user.teacher.students.order_by("pk").values_list("username", flat=True)
+        )
+        # a learner whose account the teacher maintains
+        cls.student_user = PortalUser.objects.get(username=cls.students[0])
+        cls.learner_user = Learner.objects.filter(
+            account_maintained_by="LEARNER", user__is_verified=False,
+        ).order_by("pk").first().user
+        # a learner of another teacher, who has not joined the classroom yet
+        cls.joiner_user = PortalUser.objects.filter(learner__isnull=False).exclude(classes=classrooms[0]).order_by("pk").first()
+
+    def setUp(self):
+        cache.clear()
+        # a failing endpoint is measured like any other, its status is part of the budget
+        self.client = APIClient(raise_request_exception=False)
+        self.results = {}
+
+    def confirmation_token(self):
+        return EmailConfirmationToken.objects.create(user=self.learner_user, token="t" * 64, email=self.learner_user.email).token
+
+    def reset_token(self):
+        PortalUser.objects.filter(pk=self.learner_user.pk).update(password="r" * 64)
+        return "r" * 64
+
+    def credential_sheet_token(self):
+        return credential_sheet_create(students=[
+            {"username": username, "full_name": f"Student {letters(i)}", "password": PASSWORD}
+            for i, username in enumerate(self.students)
+        ])
+
+    def request(self, route, method, user, data):
+        """
+        Sends the request of a scenario and returns its response, number of queries,
+        total SQL time and wall time. The cache is cold, apart from the token blacklist version and
+        the active state of the user, and the database changes are rolled back.
+        """
+        self.client.credentials()
+        self.client.cookies.clear()
+        if user is not None:
+            user = getattr(self, f"{user}_user")
+            refresh = PortalRefreshToken.for_user(user)
+            self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+            self.client.cookies["refresh_token"] = str(refresh)
+
+        with transaction.atomic():
+            if callable(data):
+                data = data(self)
+            path = "/" + route
+            if "<str:token>" in route:
+                path = path.replace("<str:token>", data.pop("token"))
+            cache.clear()
+            caches["shared"].clear()
+            caches["local"].clear()
+            # seeded once per TOKEN_REVOCATION_SYNC_INTERVAL for all users
+            token_blacklist_version_get()
+            if user is not None:
+                # a logged in user sends their requests with it cached in the process
+                user_is_active(user_id=user.pk)
+            sql_timer = SQLTimer()
+            with CaptureQueriesContext(connection) as queries, connection.execute_wrapper(sql_timer):
+                start = time.perf_counter()
+                if method == "get":
+                    response = getattr(self.client, method)(path, data)
+                else:
+                    response = getattr(self.client, method)(path, data, format="json")
+                if response.streaming:
+                    b"".join(response.streaming_content)
+                wall_time = time.perf_counter() - start
+            transaction.set_rollback(True)
+
+        return response, {
+            "method": method.upper(),
+            "status": response.status_code,
+            "queries": len(queries),
+            "sql_ms": round(sql_timer.seconds * 1000, 2),
+            "wall_ms": round(wall_time * 1000, 2),
+        }
+
+    def test_every_route_has_a_scenario_and_a_budget(self):
+        budgets = json.loads(BUDGETS_PATH.read_text())
+
+        self.assertCountEqual(SCENARIOS, app_routes())
+        self.assertCountEqual(budgets, SCENARIOS)
+        # a server error is fixed, not budgeted
+        self.assertEqual([route for route, budget in budgets.items() if budget["status"] >= 500], [])
+
+    def test_endpoints_stay_within_budget(self):
+        budgets = json.loads(BUDGETS_PATH.read_text())
+
+        for route, (method, user, data) in SCENARIOS.items():
+            response, measured = self.request(route, method, user, data)
+            self.results[route] = dict(measured, budget=budgets.get(route))
+            with self.subTest(route=route):
+                self.assertEqual(measured["status"], budgets[route]["status"], getattr(response, "data", None))
+                self.assertLessEqual(measured["queries"], budgets[route]["queries"])
+                self.assertLessEqual(measured["sql_ms"], budgets[route]["sql_ms"])
+                self.assertLessEqual(measured["wall_ms"], budgets[route]["wall_ms"])
+
+        output = os.environ.get("ENDPOINT_BENCHMARK_RESULTS")
+        if output:
+            Path(output).write_text(json.dumps({
+                "created": timezone.now().isoformat(),
+                "commit": os.environ.get("GIT_COMMIT"),
+                "database": connection.vendor,
+                "dataset": dataclasses.asdict(DATASET),
+                "endpoints": self.results,
+            }, indent=2) + "\n")
@@ -0,0 +1,84 @@
+from datetime import timedelta
+from unittest.mock import patch
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from courses_apps.core.housekeeping import (
+    housekeeping_job, housekeeping_job_list, housekeeping_jobs_run, housekeeping_last_runs,
+    queryset_delete_in_batches, _jobs,
+)
+from courses_apps.core.models import HousekeepingRun, Language
+
+
+class TestHousekeeping(TestCase):
+    def setUp(self):
+        patcher = patch.dict(_jobs, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        @housekeeping_job("delete_languages")
+        def delete_languages():
+            """
+            Deletes every language.
+            """
+            return queryset_delete_in_batches(Language.objects.all(), batch_size=2)
+
+        @housekeeping_job("broken")
+        def broken():
+            raise RuntimeError("broken")
+
+    def test_jobs_are_registered(self):
+        jobs = housekeeping_job_list()
+
+        self.assertEqual(list(jobs), ["broken", "delete_languages"])
+        self.assertEqual(jobs["delete_languages"].description, "Deletes every language.")
+
+    def test_run_records_metrics_and_failures(self):
+        Language.objects.bulk_create([Language(language=f"L{i}", abbreviation=f"l{i}") for i in range(5)])
+
+        runs = {run.job: run for run in housekeeping_jobs_run()}
+
+        self.assertFalse(Language.objects.exists())
+        self.assertEqual(runs["delete_languages"].rows, 5)
+        self.assertEqual(runs["delete_languages"].error, "")
+        self.assertGreater(runs["delete_languages"].duration, 0)
+        self.assertIn("broken", runs["broken"].error)
+        self.assertEqual(HousekeepingRun.objects.count(), 2)
+
+    def test_run_selected_jobs(self):
+        runs = housekeeping_jobs_run(names=["delete_languages"])
+
+        self.assertEqual([run.job for run in runs], ["delete_languages"])
+        with self.assertRaises(ValueError):
+            housekeeping_jobs_run(names=["missing"])
+
+    def test_last_runs(self):
+        housekeeping_jobs_run(names=["delete_languages"])
+        latest = housekeeping_jobs_run(names=["delete_languages"])[0]
+
+        self.assertEqual(housekeeping_last_runs(), {"delete_languages": latest})
+
+    def test_delete_in_batches(self):
+        HousekeepingRun.objects.bulk_create(
+            [HousekeepingRun(job=f"job{i}", started_at=timezone.now()) for i in range(5)]
+        )
+
+        # per batch: savepoint, ids, delete, release, the short third batch ends the loop
+        with self.assertNumQueries(3 * 4):
+            deleted = queryset_delete_in_batches(HousekeepingRun.objects.filter(job__startswith="job"), batch_size=2)
+
+        self.assertEqual(deleted, 5)
+        self.assertFalse(HousekeepingRun.objects.exists())
+
+
+class TestHousekeepingRunsPurge(TestCase):
+    @override_settings(HOUSEKEEPING_RUN_RETENTION_DAYS=30)
+    def test_old_runs_are_purged(self):
+        now = timezone.now()
+        HousekeepingRun.objects.create(job="old", started_at=now - timedelta(days=31))
+        recent = HousekeepingRun.objects.create(job="recent", started_at=now - timedelta(days=29))
+
+        housekeeping_jobs_run(names=["purge_housekeeping_runs"])
+
+        self.assertEqual(
+            set(HousekeepingRun.objects.exclude(job="purge_housekeeping_runs")), {recent}
+        )
@@ -0,0 +1,15 @@
+from django.core.cache import caches
+from .selectors import EPAATH_CATALOG_VERSION_KEY, epaath_catalog_version_get
+
+
+def epaath_catalog_cache_invalidate() -> None:
+    """
+    Invalidates every cached E-Paath catalog page by bumping the catalog version. This
+    process sees the new version at once, the others once their copy expires.
+    """
+    caches["local"].delete(EPAATH_CATALOG_VERSION_KEY)
+    try:
+        caches["shared"].incr(EPAATH_CATALOG_VERSION_KEY)
+    except ValueError:
+        # no version cached yet, a fresh one already differs from any cached page
+        epaath_catalog_version_get()
@@ -0,0 +1,83 @@
+import csv
+import os
+import tempfile
+from io import StringIO
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase
+from courses_apps.core.models import Grade, Language, Subject
+from courses_apps.epaath.models import EpaathModules
+
+FIELDNAMES = ['title', 'grade', 'grade_in_symbol', 'subject', 'language', 'language_code', 'chapter_id', 'link', 'thumbnail']
+
+
+class ImportEpaathCommandTests(TestCase):
+
+    def setUp(self):
+        self.rows = [
+            {
+                'title': 'Measurement', 'grade': 'one', 'grade_in_symbol': '1', 'subject': 'math',
+                'language': 'English', 'language_code': 'en', 'chapter_id': 'matmea01',
+                'link': 'start.html?id=matmea01&lang=en&grade=1', 'thumbnail': 'images/measurement1.png',
+            },
+            {
+                'title': 'Statistics', 'grade': 'eight', 'grade_in_symbol': '8', 'subject': 'math',
+                'language': 'English', 'language_code': 'en', 'chapter_id': 'matmea01',
+                'link': 'start.html?id=matmea01&lang=en&grade=8', 'thumbnail': 'images/statistics8.png',
+            },
+            {
+                'title': 'लम्बाईको नाप', 'grade': 'one', 'grade_in_symbol': '1', 'subject': 'math',
+                'language': 'Nepali', 'language_code': 'ne', 'chapter_id': 'matmea01',
+                'link': 'start.html?id=matmea01&lang=np&grade=1', 'thumbnail': 'images/measurement1.png',
+            },
+        ]
+
+    def import_rows(self, rows):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', newline='', encoding='utf-8', delete=False) as csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=FIELDNAMES)
+            writer.writeheader()
+            writer.writerows(rows)
+        self.addCleanup(os.remove, csv_file.name)
+        out = StringIO()
+        call_command('import_epaath', csv_file.name, stdout=out)
+        return out.getvalue()
+
+    def test_import_creates_chapters_and_lookups(self):
+        output = self.import_rows(self.rows)
+
+        self.assertIn('3 inserted, 0 updated, 0 unchanged', output)
+        self.assertEqual(EpaathModules.objects.count(), 3)
+        self.assertEqual(Language.objects.count(), 2)
+        self.assertEqual(Grade.objects.count(), 2)
+        self.assertEqual(Subject.objects.count(), 1)
+
+    def test_import_is_idempotent(self):
+        self.import_rows(self.rows)
+        uids = set(EpaathModules.objects.values_list('uid', flat=True))
+
+        output = self.import_rows(self.rows)
+
+        self.assertIn('0 inserted, 0 updated, 3 unchanged', output)
+        self.assertEqual(set(EpaathModules.objects.values_list('uid', flat=True)), uids)
+
+    def test_import_updates_changed_chapters(self):
+        self.import_rows(self.rows)
+        self.rows[1]['title'] = 'Statistics and Probability'
+        self.rows[0]['language_code'] = self.rows[1]['language_code'] = 'eng'
+
+        output = self.import_rows(self.rows)
+
+        self.assertIn('0 inserted, 1 updated, 2 unchanged', output)
+        self.assertTrue(EpaathModules.objects.filter(title='Statistics and Probability').exists())
+        self.assertEqual(Language.objects.get(abbreviation='eng').language, 'English')
+
+    def test_import_chapters_csv(self):
+        csv_path = os.path.join(settings.BASE_DIR, 'chapters.csv')
+        out = StringIO()
+
+        call_command('import_epaath', csv_path, stdout=out)
+        call_command('import_epaath', csv_path, stdout=out)
+
+        self.assertIn('860 inserted, 0 updated, 0 unchanged', out.getvalue())
+        self.assertIn('0 inserted, 0 updated, 860 unchanged', out.getvalue())
+        self.assertEqual(EpaathModules.objects.count(), 860)
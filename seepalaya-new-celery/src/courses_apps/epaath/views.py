@@ -1,3 +1,106 @@
-from django.shortcuts import render
+import hashlib
+import json
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.translation import get_language, gettext as _
+from rest_framework import serializers, status
+from rest_framework.pagination import CursorPagination
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from .selectors import epaath_catalog_version_get, epaath_module_list
 
-# Create your views here.
+# query parameters that change the response, any others are left out of the cache key
+CACHE_KEY_QUERY_PARAMS = ("grade", "subject", "language", "cursor", "page_size")
+
+
+class EpaathModuleCursorPagination(CursorPagination):
+    ordering = "id"
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+
+
+class EpaathModuleListAPIView(APIView):
+    """
+    Lists the published E-Paath modules, filterable by grade, subject and language uid.
+    The catalog is the same for every user, so pages are served from a versioned cache and
+    carry an ETag for conditional requests.
+
+    Methods:
+    - get: Returns a cursor paginated page of modules.
+    """
+
+    # public and identical for everyone, so a stale or missing token must not fail the request
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    class EpaathModuleListFilterSerializer(serializers.Serializer):
+        grade = serializers.UUIDField(required=False)
+        subject = serializers.UUIDField(required=False)
+        language = serializers.UUIDField(required=False)
+
+    class EpaathModuleListOutputSerializer(serializers.Serializer):
+        uid = serializers.UUIDField()
+        title = serializers.CharField()
+        chapter_id = serializers.CharField()
+        abstract = serializers.CharField(allow_null=True)
+        thumbnail = serializers.CharField()
+        link = serializers.CharField()
+        grade_uid = serializers.UUIDField(source="grade.uid", allow_null=True)
+        grade = serializers.CharField(source="grade.grade", allow_null=True)
+        grade_in_symbol = serializers.CharField(source="grade.in_symbol", allow_null=True)
+        subject_uid = serializers.UUIDField(source="subject.uid", allow_null=True)
+        subject = serializers.CharField(source="subject.subject", allow_null=True)
+        language_uid = serializers.UUIDField(source="language.uid", allow_null=True)
+        language = serializers.CharField(source="language.language", allow_null=True)
+        language_code = serializers.CharField(source="language.abbreviation", allow_null=True)
+
+    def get(self, request, *args, **kwargs):
+        """
+        Returns a page of modules, or 304 Not Modified when the client's ETag still matches.
+        """
+        filter_serializer = self.EpaathModuleListFilterSerializer(data=request.query_params)
+        filter_serializer.is_valid(raise_exception=True)
+
+        cache_key = self.get_cache_key(request)
+        cached = cache.get(cache_key)
+        if cached is None:
+            paginator = EpaathModuleCursorPagination()
+            queryset = epaath_module_list(**filter_serializer.validated_data)
+            page = paginator.paginate_queryset(queryset, request, view=self)
+            body = {
+                "success": True,
+                "message": _("E-Paath modules fetched successfully."),
+                "data": {
+                    "next": paginator.get_next_link(),
+                    "previous": paginator.get_previous_link(),
+                    "results": self.EpaathModuleListOutputSerializer(page, many=True).data,
+                },
+            }
+            encoded_body = json.dumps(body, cls=DjangoJSONEncoder, sort_keys=True).encode()
+            etag = f'"{hashlib.md5(encoded_body).hexdigest()}"'
+            cached = (body, etag)
+            cache.set(cache_key, cached, timeout=settings.EPAATH_CATALOG_CACHE_TIMEOUT)
+
+        body, etag = cached
+        if etag in request.headers.get("If-None-Match", ""):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(body, status=status.HTTP_200_OK)
+        response["ETag"] = etag
+        response["Cache-Control"] = "public, no-cache"
+        return response
+
+    def get_cache_key(self, request) -> str:
+        """
+        Returns the cache key of the requested page. Pages differ by query, host (the
+        pagination links are absolute) and active language (taxonomy names are translated).
+        """
+        query = "&".join(
+            f"{key}={request.query_params[key]}"
+            for key in sorted(CACHE_KEY_QUERY_PARAMS) if key in request.query_params
+        )
+        query_hash = hashlib.md5(f"{request.get_host()}?{query}".encode()).hexdigest()
+        return f"epaath:catalog:{epaath_catalog_version_get()}:{get_language()}:{query_hash}"
@@ -3,17 +3,18 @@ from django.core.exceptions import ValidationError as DjangoValidationError
 from django.db import transaction
 from django.utils.translation import gettext as _
 from rest_framework.exceptions import ValidationError
-from rest_framework_simplejwt.tokens import RefreshToken
+from courses_apps.account.tokens import PortalRefreshToken
 from courses_apps.account.services import user_signup
 from .models import Guardian
-from courses_apps.account.helpers import construct_username_from_email
+from courses_apps.account.helpers import (
+    construct_email_for_child, construct_username_from_email, retry_on_unique_violation,
+)
 from django.contrib.auth import get_user_model
 from courses_apps.guardian.selectors import (
     guardian_get_from_email, guardian_get_all_children, child_get_from_username, 
     check_learner_account_created_by, check_child_belongs_to_guardian, get_user_detail_for_child, 
     user_email_get_from_user, guardian_get_from_user, user_get_from_username, child_get_from_email
 )
-from .helpers import construct_email_for_child
 from courses_apps.learner.models import Learner
 from datetime import date
 
@@ -43,18 +44,19 @@ def guardian_signup(
         access_token: str
 
     user_type = "guardian"
-    username = construct_username_from_email(email=email)
     try:
-        user = user_signup(
+        # the username is allocated again if a concurrent signup takes it first
+        user = retry_on_unique_violation(lambda: user_signup(
             # full_name=full_name,
-            username=username,
+            username=construct_username_from_email(email=email),
             email=email,
             password=password,
             confirm_password=confirm_password,
             user_type=user_type,
-        )
+        ))
     except ValidationError as e:
         raise ValidationError(detail=_(e.detail[0]))
+    username = user.username
     
     try:
         guardian = Guardian(user=user)
@@ -64,7 +66,7 @@ def guardian_signup(
     
     guardian.save()
 
-    token = RefreshToken.for_user(user)
+    token = PortalRefreshToken.for_user(user)
     refresh_token = str(token)
     access_token = str(token.access_token)
 
@@ -97,18 +99,19 @@ def child_signup(*, guardian_user: User, full_name:str, username: str, pin: str,
     user_type = "learner"
     guardian_email = user_email_get_from_user(user=guardian_user) 
     username = username.lower()
-    user_email = construct_email_for_child(username=username, email=guardian_email)
     print(pin)
     try:
-        user = user_signup(
+        # the email is allocated again if a concurrent signup takes it first
+        user = retry_on_unique_violation(lambda: user_signup(
             username=username,
             full_name=full_name,
-            email=user_email,
+            email=construct_email_for_child(username=username, email=guardian_email),
             password=pin,
             confirm_password=pin,
             user_type=user_type,
             bypass_flag = True
-        )
+        ))
+        user_email = user.email
         print(f"Full user object: {user}")
     except ValidationError as e:
         raise ValidationError(detail=_(e.detail[0]))
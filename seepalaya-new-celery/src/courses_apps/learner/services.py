@@ -3,10 +3,10 @@ from django.core.exceptions import ValidationError as DjangoValidationError
 from django.db import transaction
 from django.utils.translation import gettext as _
 from rest_framework.exceptions import ValidationError
-from rest_framework_simplejwt.tokens import RefreshToken
+from courses_apps.account.tokens import PortalRefreshToken
 from courses_apps.account.services import user_signup
 from .models import Learner
-from courses_apps.account.helpers import construct_username_from_email
+from courses_apps.account.helpers import construct_username_from_email, retry_on_unique_violation
 from datetime import date
 from courses_apps.account.selectors import check_verification_requirement, get_user_roles_by_user
 
@@ -38,18 +38,19 @@ def learner_signup(
 
     user_type = "learner"
     created_by="LEARNER"
-    username = construct_username_from_email(email=email)
     try:
-        user = user_signup(
+        # the username is allocated again if a concurrent signup takes it first
+        user = retry_on_unique_violation(lambda: user_signup(
             full_name=full_name,
-            username=username,
+            username=construct_username_from_email(email=email),
             email=email,
             password=password,
             confirm_password=confirm_password,
             user_type=user_type,
-        )
+        ))
     except ValidationError as e:
         raise ValidationError(detail=_(e.detail[0]))
+    username = user.username
     
     try:
         learner = Learner(user=user,)
@@ -59,7 +60,7 @@ def learner_signup(
     
     learner.save()
 
-    token = RefreshToken.for_user(user)
+    token = PortalRefreshToken.for_user(user)
     refresh_token = str(token)
     access_token = str(token.access_token)
 
@@ -0,0 +1,15 @@
+from django.contrib import admin
+from .models import OutboxTask
+
+class OutboxTaskAdmin(admin.ModelAdmin):
+    list_display = ('task_name', 'dedup_key', 'eta', 'created_date')
+    list_filter = ('task_name',)
+    readonly_fields = [field.name for field in OutboxTask._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+admin.site.register(OutboxTask, OutboxTaskAdmin)
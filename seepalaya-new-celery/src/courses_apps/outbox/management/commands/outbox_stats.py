@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from courses_apps.outbox.selectors import outbox_stats
+from courses_apps.outbox.services import outbox_dispatch
+
+
+class Command(BaseCommand):
+    """
+    This command prints the number of outbox tasks waiting to be published and the
+    dispatch lag, optionally after publishing them.
+    running the command:
+        - python manage.py outbox_stats
+        - python manage.py outbox_stats --dispatch
+    """
+    help = 'Print the outbox backlog and dispatch lag'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dispatch', action='store_true', help='Publish the pending tasks first')
+
+    def handle(self, *args, **kwargs):
+        if kwargs['dispatch']:
+            self.stdout.write(self.style.SUCCESS(f"Dispatched {outbox_dispatch()} tasks."))
+
+        for name, value in outbox_stats().items():
+            self.stdout.write(f"{name}: {value}")
@@ -0,0 +1,32 @@
+# Generated by Django 4.2 on 2026-10-18 15:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxTask',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('task_name', models.CharField(max_length=255)),
+                ('args', models.JSONField(default=list)),
+                ('kwargs', models.JSONField(default=dict)),
+                ('eta', models.DateTimeField(blank=True, help_text='Earliest time the task may run', null=True)),
+                ('dedup_key', models.CharField(blank=True, help_text='A pending task with the same key is replaced rather than queued twice', max_length=255, null=True, unique=True)),
+                ('created_date', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Outbox Task',
+                'verbose_name_plural': 'Outbox Tasks',
+                'db_table': 'outbox_tasks',
+                'ordering': ('id',),
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class OutboxTask(models.Model):
+    """
+    A celery task recorded in the transaction that asked for it. The dispatcher publishes
+    it once that transaction has committed and deletes the row, so a task is never
+    consumed before its data is visible nor published for a rolled back transaction.
+    """
+    id = models.BigAutoField(primary_key=True)
+    task_name = models.CharField(max_length=255)
+    args = models.JSONField(default=list)
+    kwargs = models.JSONField(default=dict)
+    eta = models.DateTimeField(null=True, blank=True, help_text='Earliest time the task may run')
+    dedup_key = models.CharField(
+        max_length=255, unique=True, null=True, blank=True,
+        help_text='A pending task with the same key is replaced rather than queued twice',
+    )
+    created_date = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.task_name
+
+    class Meta:
+        db_table = 'outbox_tasks'
+        ordering = ('id',)
+        verbose_name = _('Outbox Task')
+        verbose_name_plural = _('Outbox Tasks')
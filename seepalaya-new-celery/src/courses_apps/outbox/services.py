@@ -0,0 +1,195 @@
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from celery import current_app
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from .models import OutboxTask
+
+logger = logging.getLogger(__name__)
+
+
+def outbox_task_enqueue(
+    *,
+    task_name: str,
+    args: Optional[list] = None,
+    kwargs: Optional[dict] = None,
+    countdown: Optional[int] = None,
+    dedup_key: Optional[str] = None,
+) -> None:
+    """
+    Records the task in the current transaction and publishes it once that commits,
+    use it instead of task.delay/apply_async inside atomic blocks. Arguments must be
+    JSON serializable. The tasks of one transaction are published together.
+
+    A task with a dedup_key is left to dispatch_outbox_task, which runs every
+    OUTBOX_DISPATCH_INTERVAL seconds: one enqueued with the key of a task still pending
+    replaces it, so repeats within that window are published once, and the beat dispatch
+    merges it with the other pending batches (OUTBOX_MERGED_TASKS). A task already
+    published is not recalled.
+    """
+    task = OutboxTask(
+        task_name=task_name,
+        args=list(args or []),
+        kwargs=kwargs or {},
+        eta=timezone.now() + timedelta(seconds=countdown) if countdown else None,
+        dedup_key=dedup_key,
+    )
+    if dedup_key is not None:
+        OutboxTask.objects.bulk_create(
+            [task], update_conflicts=True, unique_fields=['dedup_key'],
+            update_fields=['task_name', 'args', 'kwargs', 'eta'],
+        )
+        return
+
+    task.save()
+    connection = transaction.get_connection()
+    if connection.in_atomic_block:
+        # join the dispatch already registered by an earlier task of this transaction
+        for *_, callback, _ in connection.run_on_commit:
+            if isinstance(callback, OutboxCommitDispatch) and not callback.called:
+                callback.task_ids.append(task.id)
+                return
+    transaction.on_commit(OutboxCommitDispatch(task_ids=[task.id]))
+
+
+class OutboxCommitDispatch:
+    """
+    The on_commit callback publishing the tasks a transaction enqueued, right away and
+    over the process' broker connection (see outbox_connection), giving up on the broker
+    after OUTBOX_PUBLISH_TIMEOUT seconds so the request is not held up. Tasks that cannot
+    be published now are left to dispatch_outbox_task.
+    """
+
+    def __init__(self, *, task_ids: List[int]):
+        self.task_ids = task_ids
+        self.called = False
+
+    def __call__(self) -> None:
+        self.called = True
+        try:
+            outbox_dispatch(lookup={'id__in': self.task_ids}, connect_timeout=settings.OUTBOX_PUBLISH_TIMEOUT)
+        except Exception:
+            logger.exception('Could not dispatch the outbox tasks, dispatch_outbox_task will retry')
+
+
+def outbox_dispatch(
+    *,
+    batch_size: Optional[int] = None,
+    lookup: Optional[dict] = None,
+    connect_timeout: Optional[float] = None,
+) -> int:
+    """
+    Publishes the pending tasks, or those matching the lookup, in batches of OUTBOX_BATCH_SIZE,
+    one broker connection and one delete per batch, and returns how many were published. The
+    tasks of a batch named in OUTBOX_MERGED_TASKS are merged (see outbox_messages_build). Rows
+    locked by another dispatcher are skipped. A task may be published twice if the delete
+    fails, never zero times.
+    """
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    dispatched = 0
+    while True:
+        with transaction.atomic():
+            tasks = list(
+                OutboxTask.objects.select_for_update(skip_locked=True).filter(**(lookup or {})).order_by('id')[:batch_size]
+            )
+            if not tasks:
+                break
+            with outbox_producer(connect_timeout=connect_timeout) as producer:
+                for task_name, args, kwargs, eta in outbox_messages_build(tasks=tasks):
+                    current_app.send_task(
+                        task_name, args=args, kwargs=kwargs, eta=eta, producer=producer, retry=False,
+                    )
+            OutboxTask.objects.filter(id__in=[task.id for task in tasks]).delete()
+        dispatched += len(tasks)
+        lag = max(timezone.now() - task.created_date for task in tasks)
+        logger.info(f'Dispatched {len(tasks)} outbox tasks, dispatch lag {lag.total_seconds():.3f}s')
+        if len(tasks) < batch_size:
+            break
+    return dispatched
+
+
+class OutboxConnection:
+    """
+    A broker connection kept open per process for the after-commit publishes, so a
+    committing request does not connect to the broker. It fails after connect_timeout
+    seconds instead of the broker's connection timeout, and is reopened after a fork and
+    after a failed publish.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._connection = None
+        self._producer = None
+        self._pid = None
+
+    @contextmanager
+    def producer(self, *, connect_timeout: float):
+        with self._lock:
+            if self._pid != os.getpid():
+                # inherited from the parent process, releasing it would end the parent's session
+                self._connection = self._producer = None
+            try:
+                if self._connection is None:
+                    self._connection = current_app.connection_for_write(connect_timeout=connect_timeout)
+                    self._pid = os.getpid()
+                self._connection.ensure_connection(max_retries=0)
+                if self._producer is None:
+                    self._producer = current_app.amqp.Producer(self._connection)
+                yield self._producer
+            except Exception:
+                self._close()
+                raise
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+    def _close(self) -> None:
+        if self._connection is not None:
+            try:
+                self._connection.release()
+            except Exception:
+                logger.warning('Could not close the outbox broker connection cleanly', exc_info=True)
+        self._connection = self._producer = None
+
+
+outbox_connection = OutboxConnection()
+
+
+@contextmanager
+def outbox_producer(*, connect_timeout: Optional[float] = None):
+    """
+    Yields a producer of the broker connection pool, or of the process' outbox connection
+    failing after connect_timeout seconds instead of the broker's connection timeout.
+    """
+    if connect_timeout is None:
+        with current_app.producer_or_acquire() as producer:
+            yield producer
+    else:
+        with outbox_connection.producer(connect_timeout=connect_timeout) as producer:
+            yield producer
+
+
+def outbox_messages_build(*, tasks: List[OutboxTask]) -> List[Tuple[str, list, dict, Optional[datetime]]]:
+    """
+    Returns the (task_name, args, kwargs, eta) messages publishing the given tasks, in order.
+    The tasks named in OUTBOX_MERGED_TASKS take a single list argument. Those without an
+    eta or kwargs are merged into messages of up to the configured number of items, sent
+    after the other tasks.
+    """
+    messages = []
+    merged = {}
+    for task in tasks:
+        if task.task_name in settings.OUTBOX_MERGED_TASKS and not (task.eta or task.kwargs) and len(task.args) == 1:
+            merged.setdefault(task.task_name, []).extend(task.args[0])
+        else:
+            messages.append((task.task_name, task.args, task.kwargs, task.eta))
+    for task_name, items in merged.items():
+        size = settings.OUTBOX_MERGED_TASKS[task_name]
+        messages += [(task_name, [items[start:start + size]], {}, None) for start in range(0, len(items), size)]
+    return messages
@@ -0,0 +1,132 @@
+from datetime import timedelta
+from unittest.mock import ANY, patch
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from courses_apps.outbox.models import OutboxTask
+from courses_apps.outbox.selectors import outbox_stats
+from courses_apps.outbox.services import outbox_connection, outbox_dispatch, outbox_task_enqueue
+
+
+@patch('courses_apps.outbox.services.current_app.send_task')
+class TestOutbox(TestCase):
+    def setUp(self):
+        outbox_connection.close()
+
+    def tearDown(self):
+        outbox_connection.close()
+
+    def test_task_is_published_after_commit(self, mocked_send_task):
+        with self.captureOnCommitCallbacks(execute=True):
+            outbox_task_enqueue(task_name='send_email_task', args=['Subject', 'Message', 'user@example.com'])
+            mocked_send_task.assert_not_called()
+
+        mocked_send_task.assert_called_once_with(
+            'send_email_task', args=['Subject', 'Message', 'user@example.com'], kwargs={}, eta=None,
+            producer=ANY, retry=False,
+        )
+        self.assertFalse(OutboxTask.objects.exists())
+
+    @override_settings(OUTBOX_PUBLISH_TIMEOUT=0.5)
+    def test_commit_publishes_its_tasks_together(self, mocked_send_task):
+        OutboxTask.objects.create(task_name='send_email_task', args=['left pending'])
+
+        with patch('courses_apps.outbox.services.current_app.connection_for_write') as mocked_connection:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                for index in range(3):
+                    outbox_task_enqueue(task_name='send_email_task', args=[index])
+            with self.captureOnCommitCallbacks(execute=True):
+                outbox_task_enqueue(task_name='send_email_task', args=['next commit'])
+
+        self.assertEqual(len(callbacks), 1)
+        # the connection is kept for the next commit
+        mocked_connection.assert_called_once_with(connect_timeout=0.5)
+        self.assertEqual(
+            [call.kwargs['args'] for call in mocked_send_task.call_args_list], [[0], [1], [2], ['next commit']]
+        )
+        self.assertEqual(list(OutboxTask.objects.values_list('args', flat=True)), [['left pending']])
+
+    def test_failed_publish_is_left_to_dispatch(self, mocked_send_task):
+        mocked_send_task.side_effect = [ConnectionError, None, None]
+
+        with patch('courses_apps.outbox.services.current_app.connection_for_write') as mocked_connection:
+            with self.captureOnCommitCallbacks(execute=True):
+                outbox_task_enqueue(task_name='send_email_task', args=['failed'])
+            with self.captureOnCommitCallbacks(execute=True):
+                outbox_task_enqueue(task_name='send_email_task', args=['next commit'])
+
+        # reconnected after the failure
+        self.assertEqual(mocked_connection.call_count, 2)
+        self.assertEqual(list(OutboxTask.objects.values_list('args', flat=True)), [['failed']])
+        self.assertEqual(outbox_dispatch(), 1)
+
+    def test_deduplicated_task_waits_for_dispatch(self, mocked_send_task):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            outbox_task_enqueue(task_name='send_email_task', args=['first'], dedup_key='email_confirmation:user')
+        with self.captureOnCommitCallbacks(execute=True):
+            outbox_task_enqueue(task_name='send_email_task', args=['second'], dedup_key='email_confirmation:user')
+
+        self.assertEqual(callbacks, [])
+        mocked_send_task.assert_not_called()
+        self.assertEqual(outbox_dispatch(), 1)
+        self.assertEqual([call.kwargs['args'] for call in mocked_send_task.call_args_list], [['second']])
+
+    def test_task_is_not_published_on_rollback(self, mocked_send_task):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    outbox_task_enqueue(task_name='send_email_task', args=['Subject', 'Message', 'user@example.com'])
+                    raise ValueError
+            except ValueError:
+                pass
+
+        mocked_send_task.assert_not_called()
+        self.assertFalse(OutboxTask.objects.exists())
+
+    def test_duplicate_tasks_are_coalesced(self, mocked_send_task):
+        for token in ['first', 'second', 'third']:
+            outbox_task_enqueue(task_name='send_email_task', args=[token], dedup_key='email_confirmation:user')
+        outbox_task_enqueue(task_name='send_email_task', args=['other'], dedup_key='email_confirmation:other')
+
+        self.assertEqual(outbox_dispatch(), 2)
+        self.assertEqual(
+            [call.kwargs['args'] for call in mocked_send_task.call_args_list], [['third'], ['other']]
+        )
+
+    @override_settings(OUTBOX_MERGED_TASKS={'send_email_batch_task': 2})
+    def test_merged_tasks(self, mocked_send_task):
+        for index in range(3):
+            outbox_task_enqueue(task_name='send_email_batch_task', args=[[f'email {index}']], dedup_key=f'email:{index}')
+        outbox_task_enqueue(task_name='send_email_task', args=['Subject', 'Message', 'user@example.com'])
+
+        self.assertEqual(outbox_dispatch(), 4)
+
+        self.assertEqual(
+            [(call.args[0], call.kwargs['args']) for call in mocked_send_task.call_args_list],
+            [
+                ('send_email_task', ['Subject', 'Message', 'user@example.com']),
+                ('send_email_batch_task', [['email 0', 'email 1']]),
+                ('send_email_batch_task', [['email 2']]),
+            ],
+        )
+
+    def test_dispatch_in_batches(self, mocked_send_task):
+        for index in range(5):
+            outbox_task_enqueue(task_name='delete_student_detail_csv', args=[f'{index}.csv'], countdown=900)
+
+        # per batch: savepoint, locked select, delete, release, the short batch ends the loop
+        with self.assertNumQueries(3 * 4):
+            self.assertEqual(outbox_dispatch(batch_size=2), 5)
+
+        self.assertEqual(mocked_send_task.call_count, 5)
+        self.assertGreater(mocked_send_task.call_args.kwargs['eta'], timezone.now() + timedelta(seconds=890))
+
+    def test_stats(self, mocked_send_task):
+        self.assertEqual(outbox_stats(), {'pending_tasks': 0, 'dispatch_lag': None})
+
+        outbox_task_enqueue(task_name='send_email_task', args=[])
+        OutboxTask.objects.update(created_date=timezone.now() - timedelta(seconds=30))
+
+        stats = outbox_stats()
+        self.assertEqual(stats['pending_tasks'], 1)
+        self.assertGreaterEqual(stats['dispatch_lag'], 30)
@@ -0,0 +1,62 @@
+from django.urls import reverse
+from rest_framework.test import APIClient, APITestCase
+from rest_framework import status
+from courses_apps.classroom.models import ClassRoom
+from courses_apps.learner.models import Learner
+from django.contrib.auth import get_user_model
+from courses_apps.teacher.selectors import teacher_get_from_user
+
+User = get_user_model()
+
+
+class StudentListAPIViewTestCase(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.students_list_uri = reverse('teacher:students_list')
+
+        teacher_signup_data = {
+            'full_name': 'Test Teacher',
+            'email': 'test_teacher@gmail.com',
+            'password': 'strongpass@123',
+            'confirm_password': 'strongpass@123'
+        }
+        teacher_signup_response = self.client.post(reverse('teacher:teacher_signup'), teacher_signup_data)
+        self.assertEqual(teacher_signup_response.status_code, 201)
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + teacher_signup_response.data['data']['access_token'])
+
+        teacher = teacher_get_from_user(user=User.objects.get(email='test_teacher@gmail.com'))
+        students = User.objects.bulk_create([
+            User(username=f'student{i}', email=f'student{i}@example.com', full_name=f'Student {i}') for i in range(3)
+        ])
+        Learner.objects.bulk_create([Learner(user=student, account_maintained_by='TEACHER') for student in students])
+        teacher.students.add(*students)
+        for code in ['TC1', 'TC2']:
+            ClassRoom.objects.create(title=f'Test Classroom {code}', class_code=code, teacher=teacher).students.add(*students[:2])
+
+    def test_student_list_one_row_per_student(self):
+        response = self.client.get(self.students_list_uri, {'page_size': 2})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([student['student_username'] for student in response.data['data']], ['student0', 'student1'])
+        self.assertEqual(response.data['data'][0]['classes'], [
+            {'class_code': 'TC1', 'title': 'Test Classroom TC1'},
+            {'class_code': 'TC2', 'title': 'Test Classroom TC2'},
+        ])
+        self.assertEqual(response.data['pagination']['count'], 3)
+
+        response = self.client.get(self.students_list_uri, {'page_size': 2, 'cursor': response.data['pagination']['next_cursor']})
+
+        self.assertEqual([student['student_username'] for student in response.data['data']], ['student2'])
+        self.assertEqual(response.data['data'][0]['classes'], [])
+        self.assertIsNone(response.data['pagination']['next_cursor'])
+
+    def test_student_list_class_filter(self):
+        response = self.client.get(self.students_list_uri, {'class_code': 'TC2'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([student['student_username'] for student in response.data['data']], ['student0', 'student1'])
+
+    def test_student_list_invalid_page_size(self):
+        response = self.client.get(self.students_list_uri, {'page_size': 0})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -1,17 +1,32 @@
+import argparse
+from datetime import datetime, timezone
+
 import psycopg2
-from elasticsearch import Elasticsearch
+from elasticsearch import Elasticsearch, NotFoundError
+from elasticsearch.helpers import parallel_bulk, streaming_bulk
 from decouple import config
 
 DB_HOST = config("POSTGRES_HOST")
 DB_PORT = config("POSTGRES_PORT")
 DB_USER = config("POSTGRES_USER")
 DB_PASSWORD = config("POSTGRES_PASSWORD")
-DB_NAME = "pustakalaya" 
+DB_NAME = "pustakalaya"
 
 ES_HOST = config("ES_HOST")
 ES_PORT = config("ES_PORT")
+# ES_INDEX is an alias pointing at the concrete index currently being served
 ES_INDEX = "pustakalaya"
 
+TABLES_TO_INDEX = {
+    "document_document": ["id", "title", "created_date", "updated_date", "type", "thumbnail", "abstract"],
+    "audio": ["id", "title", "created_date", "updated_date", "type", "thumbnail", "abstract"],
+    "video_video": ["id", "title", "created_date", "updated_date", "type", "thumbnail", "abstract"]
+}
+
+# rows fetched from the server-side cursor per round trip
+CURSOR_ITERSIZE = 2000
+
+
 def connect_to_postgres():
     """Establishes a connection to the PostgreSQL database."""
     try:
@@ -36,70 +51,147 @@ def connect_to_elasticsearch():
         print("Error while connecting to Elasticsearch:", error)
         return None
 
-def recreate_index():
-    """Drops the existing index if it exists and creates a new one."""
-    es = connect_to_elasticsearch()
-    if es:
-        try:
-            if es.indices.exists(index=ES_INDEX):
-                es.indices.delete(index=ES_INDEX)
-                print(f"Deleted existing index: {ES_INDEX}")
-            
-            es.indices.create(index=ES_INDEX)
-            print(f"Created new index: {ES_INDEX}")
-        except Exception as error:
-            print("Error while recreating Elasticsearch index:", error)
-
-def index_data(data):
-    """Indexes data to the specified Elasticsearch index."""
-    es = connect_to_elasticsearch()
-    if es:
-        try:
-            response = es.index(index=ES_INDEX, id=data["id"], body=data)
-            print("Document indexed successfully:", response)
-        except Exception as error:
-            print("Error while indexing data:", error)
+def get_alias_indices(es):
+    """Returns the concrete indices behind the ES_INDEX alias."""
+    try:
+        return list(es.indices.get_alias(name=ES_INDEX).keys())
+    except NotFoundError:
+        return []
+
+def get_high_water_marks(es, index):
+    """Returns the per table updated_date high-water marks stored in the index mapping."""
+    mapping = es.indices.get_mapping(index=index)
+    return mapping[index]["mappings"].get("_meta", {}).get("high_water_marks", {})
+
+def save_high_water_mark(es, index, table, high_water_mark):
+    """Stores the updated_date high-water mark of a table in the index mapping."""
+    high_water_marks = get_high_water_marks(es, index)
+    high_water_marks[table] = high_water_mark.isoformat()
+    es.indices.put_mapping(index=index, body={"_meta": {"high_water_marks": high_water_marks}})
+
+def stream_rows(connection, table, columns, since):
+    """
+    Streams the rows of a table changed since the given high-water mark, oldest first,
+    through a server-side cursor so only CURSOR_ITERSIZE rows are held in memory.
+    """
+    cursor = connection.cursor(name=f"es_index_{table}")
+    cursor.itersize = CURSOR_ITERSIZE
+    column_list = ", ".join(columns)
+    query = f"SELECT {column_list}, published = 'yes' FROM {table}"
+    if since is not None:
+        # rows sharing the high-water mark are reindexed, which is idempotent
+        cursor.execute(f"{query} WHERE updated_date >= %s ORDER BY updated_date, id", (since,))
+    else:
+        cursor.execute(f"{query} WHERE published = 'yes' ORDER BY updated_date, id")
+    try:
+        for row in cursor:
+            yield dict(zip(columns, row[:-1])), row[-1]
+    finally:
+        cursor.close()
+
+def generate_actions(rows, index, progress):
+    """
+    Turns rows into bulk actions. Published rows are indexed, unpublished ones removed.
+    Keeps track of the newest updated_date seen in `progress`.
+    """
+    for data, published in rows:
+        progress["high_water_mark"] = data["updated_date"]
+        if published:
+            yield {"_op_type": "index", "_index": index, "_id": data["id"], "_source": data}
+        else:
+            yield {"_op_type": "delete", "_index": index, "_id": data["id"]}
+
+def index_table(es, connection, index, table, columns, since, batch_size, threads):
+    """
+    Indexes the changed rows of a table into the given index and returns the new
+    high-water mark, or None if the table had no changes.
+    """
+    progress = {"high_water_mark": None}
+    actions = generate_actions(stream_rows(connection, table, columns, since), index, progress)
+    if threads > 1:
+        results = parallel_bulk(
+            es, actions, thread_count=threads, chunk_size=batch_size, raise_on_error=False
+        )
+    else:
+        results = streaming_bulk(es, actions, chunk_size=batch_size, raise_on_error=False)
+
+    indexed, failed = 0, 0
+    for ok, item in results:
+        if ok:
+            indexed += 1
+            continue
+        operation, details = next(iter(item.items()))
+        # unpublished rows that were never indexed have nothing to delete
+        if operation == "delete" and details.get("status") == 404:
+            continue
+        failed += 1
+        print(f"Error indexing document from table {table}:", item)
+
+    print(f"Indexed {indexed} documents from table {table}, {failed} failed.")
+    if failed:
+        return None
+    return progress["high_water_mark"]
+
+def index_tables(es, connection, index, batch_size, threads, full):
+    """Indexes every table, advancing each table's high-water mark as it completes."""
+    high_water_marks = {} if full else get_high_water_marks(es, index)
+    for table, columns in TABLES_TO_INDEX.items():
+        since = high_water_marks.get(table)
+        high_water_mark = index_table(es, connection, index, table, columns, since, batch_size, threads)
+        if high_water_mark is not None:
+            save_high_water_mark(es, index, table, high_water_mark)
+
+def rebuild_index(es, connection, batch_size, threads):
+    """
+    Builds a fresh index next to the one being served and swaps the ES_INDEX alias to it
+    once it is complete, so searches keep working during the rebuild.
+    """
+    new_index = f"{ES_INDEX}_{datetime.now(timezone.utc):%Y%m%d%H%M%S}"
+    es.indices.create(index=new_index)
+    print(f"Created new index: {new_index}")
+
+    index_tables(es, connection, new_index, batch_size, threads, full=True)
+    es.indices.refresh(index=new_index)
+
+    old_indices = get_alias_indices(es)
+    actions = [{"remove": {"index": old_index, "alias": ES_INDEX}} for old_index in old_indices]
+    if not old_indices and es.indices.exists(index=ES_INDEX):
+        # an index created before aliases were used has to make room for the alias
+        actions.append({"remove_index": {"index": ES_INDEX}})
+    actions.append({"add": {"index": new_index, "alias": ES_INDEX}})
+    es.indices.update_aliases(body={"actions": actions})
+    print(f"Alias {ES_INDEX} now points to {new_index}")
+
+    for old_index in old_indices:
+        es.indices.delete(index=old_index)
+        print(f"Deleted old index: {old_index}")
 
 def main():
     """
-    Fetches specific columns from multiple PostgreSQL tables and indexes them to Elasticsearch in batches.
+    Streams published rows from the pustakalaya PostgreSQL tables into Elasticsearch.
+    By default only rows updated since the last run are indexed. --rebuild builds a new
+    index and swaps the alias to it.
     """
-    recreate_index()
+    parser = argparse.ArgumentParser(description="Index the pustakalaya library into Elasticsearch.")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild the index from scratch")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Documents per bulk request")
+    parser.add_argument("--threads", type=int, default=1, help="Concurrent bulk requests")
+    args = parser.parse_args()
 
+    es = connect_to_elasticsearch()
     connection = connect_to_postgres()
-    if connection:
-        tables_to_index = {
-            "document_document": ["id", "title", "created_date", "updated_date", "type", "thumbnail", "abstract"],
-            "audio": ["id", "title", "created_date", "updated_date", "type", "thumbnail", "abstract"],
-            "video_video": ["id", "title", "created_date", "updated_date", "type", "thumbnail", "abstract"]
-        }
-        for table, columns in tables_to_index.items():
-            cursor = connection.cursor()
-            column_list = ", ".join(columns)
-            query = f"SELECT {column_list} FROM {table} where published='yes'"
-            cursor.execute(query)
-
-            data_to_index = []
-            for row in cursor.fetchall():
-                # Use 'id' column as _id and create a dictionary with other columns
-                data = {col: value for col, value in zip(columns + ["id"], row)}
-                data_to_index.append(data)
-
-            # Batch indexing using a list comprehension
-            batch_size = 1000
-            data_chunks = [data_to_index[i:i + batch_size] for i in range(0, len(data_to_index), batch_size)]
-            for data_batch in data_chunks:
-                bulk_actions = [{"index": {"_index": ES_INDEX, "_id": doc["id"]}} | doc for doc in data_batch]
-                es = connect_to_elasticsearch()
-                response = es.bulk(body=bulk_actions)
-                if response["errors"]:
-                    print(f"Error indexing some documents from table {table}:", response)
-                else:
-                    print(f"Successfully indexed {len(data_batch)} documents from table {table}.")
+    if es is None or connection is None:
+        print("Failed to connect to PostgreSQL or Elasticsearch")
+        return
 
+    try:
+        alias_indices = get_alias_indices(es)
+        if args.rebuild or len(alias_indices) != 1:
+            rebuild_index(es, connection, args.batch_size, args.threads)
+        else:
+            index_tables(es, connection, alias_indices[0], args.batch_size, args.threads, full=False)
+    finally:
         connection.close()
-    else:
-        print("Failed to connect to PostgreSQL")
 
 if __name__ == "__main__":
     main()